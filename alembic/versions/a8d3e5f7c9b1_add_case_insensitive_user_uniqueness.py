@@ -0,0 +1,34 @@
+"""Add case-insensitive unique indexes on users.username and users.email
+
+Revision ID: a8d3e5f7c9b1
+Revises: f4c2d8e9a1b6
+Create Date: 2026-10-18 14:00:00.000000
+
+Fails if existing rows already differ only in case; merge those accounts
+before upgrading.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d3e5f7c9b1'
+down_revision: Union[str, Sequence[str], None] = 'f4c2d8e9a1b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UNIQUE_COLUMNS = ('username', 'email')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in UNIQUE_COLUMNS:
+        op.create_index(f'uq_users_{column}_lower', 'users', [sa.text(f'lower({column})')], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in UNIQUE_COLUMNS:
+        op.drop_index(f'uq_users_{column}_lower', table_name='users')
@@ -0,0 +1,71 @@
+"""Add full-text search over cast_and_crew
+
+Revision ID: b2c4e6f8a0d1
+Revises: a8d3e5f7c9b1
+Create Date: 2026-10-18 15:00:00.000000
+
+Postgres: a generated, weighted search_vector tsvector column with a GIN
+index, and a pg_trgm GIN index over the lowercased names. SQLite: an
+external-content FTS5 table kept in sync by triggers. Mirrors
+app.db.search.FullTextSearch.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2c4e6f8a0d1'
+down_revision: Union[str, Sequence[str], None] = 'a8d3e5f7c9b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NAMES = "lower(coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(stage_name, ''))"
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(first_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(last_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(stage_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'D')"
+)
+COLUMNS = "first_name, last_name, stage_name, description"
+REMOVE_OLD = (
+    "INSERT INTO cast_and_crew_fts(cast_and_crew_fts, rowid, first_name, last_name, stage_name, description) "
+    "VALUES ('delete', old.id, old.first_name, old.last_name, old.stage_name, old.description);"
+)
+ADD_NEW = (
+    "INSERT INTO cast_and_crew_fts(rowid, first_name, last_name, stage_name, description) "
+    "VALUES (new.id, new.first_name, new.last_name, new.stage_name, new.description);"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(
+            f"CREATE VIRTUAL TABLE cast_and_crew_fts USING fts5({COLUMNS}, content='cast_and_crew', "
+            "content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='1 2 3')"
+        )
+        op.execute(f"CREATE TRIGGER cast_and_crew_fts_ai AFTER INSERT ON cast_and_crew BEGIN {ADD_NEW} END")
+        op.execute(f"CREATE TRIGGER cast_and_crew_fts_ad AFTER DELETE ON cast_and_crew BEGIN {REMOVE_OLD} END")
+        op.execute(
+            f"CREATE TRIGGER cast_and_crew_fts_au AFTER UPDATE OF {COLUMNS} ON cast_and_crew "
+            f"BEGIN {REMOVE_OLD} {ADD_NEW} END"
+        )
+        op.execute("INSERT INTO cast_and_crew_fts(cast_and_crew_fts) VALUES ('rebuild')")
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(f"ALTER TABLE cast_and_crew ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED")
+    op.execute("CREATE INDEX ix_cast_and_crew_search_vector ON cast_and_crew USING gin (search_vector)")
+    op.execute(f"CREATE INDEX ix_cast_and_crew_search_names_trgm ON cast_and_crew USING gin (({NAMES}) gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        for trigger in ('ai', 'ad', 'au'):
+            op.execute(f"DROP TRIGGER IF EXISTS cast_and_crew_fts_{trigger}")
+        op.execute("DROP TABLE IF EXISTS cast_and_crew_fts")
+        return
+    op.drop_index('ix_cast_and_crew_search_names_trgm', table_name='cast_and_crew')
+    op.drop_index('ix_cast_and_crew_search_vector', table_name='cast_and_crew')
+    op.drop_column('cast_and_crew', 'search_vector')
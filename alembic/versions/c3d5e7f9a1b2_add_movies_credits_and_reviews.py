@@ -0,0 +1,144 @@
+"""Add movies, movie_genres, movie_credits and reviews tables
+
+Revision ID: c3d5e7f9a1b2
+Revises: b2c4e6f8a0d1
+Create Date: 2026-10-18 16:00:00.000000
+
+Movies carry their review aggregates (count, sum, mean and a histogram of
+ratings 1 to 5), kept up to date by row triggers on reviews. Mirrors
+app.db.aggregates.RatingAggregates.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d5e7f9a1b2'
+down_revision: Union[str, Sequence[str], None] = 'b2c4e6f8a0d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RATING_VALUES = range(1, 6)
+TRIGGER = 'reviews_rating_aggregates'
+
+
+def apply_row(row: str, sign: str) -> str:
+    rating = f"{row}.rating"
+    assignments = [
+        f"rating_count = rating_count {sign} 1",
+        f"rating_sum = rating_sum {sign} {rating}",
+        f"rating_mean = CAST(rating_sum {sign} {rating} AS FLOAT) / NULLIF(rating_count {sign} 1, 0)",
+        *(f"rating_{value} = rating_{value} {sign} CASE WHEN {rating} = {value} THEN 1 ELSE 0 END"
+          for value in RATING_VALUES),
+        "version = version + 1",
+        "updated_at = CURRENT_TIMESTAMP",
+    ]
+    return f"UPDATE movies SET {', '.join(assignments)} WHERE id = {row}.movie_id"
+
+
+def versioned_columns():
+    return [
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('movies',
+        *versioned_columns(),
+        sa.Column('title', sa.String(length=256), nullable=False),
+        sa.Column('original_title', sa.String(length=256), nullable=True),
+        sa.Column('release_date', sa.Date(), nullable=True),
+        sa.Column('runtime_minutes', sa.Integer(), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('poster_url', sa.String(length=2048), nullable=True),
+        sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('rating_mean', sa.Float(), nullable=True),
+        *(sa.Column(f'rating_{value}', sa.Integer(), server_default='0', nullable=False) for value in RATING_VALUES),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_movies_id'), 'movies', ['id'], unique=False)
+    for column in ('title', 'release_date', 'rating_mean', 'rating_count'):
+        op.create_index(f'ix_movies_{column}_id', 'movies', [column, 'id'], unique=False)
+
+    op.create_table('movie_genres',
+        sa.Column('movie_id', sa.Integer(), nullable=False),
+        sa.Column('genre_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['movie_id'], ['movies.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['genre_id'], ['genres.id'], ),
+        sa.PrimaryKeyConstraint('movie_id', 'genre_id'),
+    )
+    op.create_index(op.f('ix_movie_genres_genre_id'), 'movie_genres', ['genre_id'], unique=False)
+
+    op.create_table('movie_credits',
+        *versioned_columns(),
+        sa.Column('movie_id', sa.Integer(), nullable=False),
+        sa.Column('cast_and_crew_id', sa.Integer(), nullable=False),
+        sa.Column('position_id', sa.Integer(), nullable=False),
+        sa.Column('character_name', sa.String(length=256), nullable=True),
+        sa.Column('billing_order', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['movie_id'], ['movies.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['cast_and_crew_id'], ['cast_and_crew.id'], ),
+        sa.ForeignKeyConstraint(['position_id'], ['positions.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('movie_id', 'cast_and_crew_id', 'position_id', name='uq_movie_credits_movie_person_position'),
+    )
+    op.create_index(op.f('ix_movie_credits_id'), 'movie_credits', ['id'], unique=False)
+    op.create_index('ix_movie_credits_cast_and_crew_id', 'movie_credits', ['cast_and_crew_id'], unique=False)
+    op.create_index('ix_movie_credits_position_id', 'movie_credits', ['position_id'], unique=False)
+    op.create_index('ix_movie_credits_billing_order_id', 'movie_credits', ['billing_order', 'id'], unique=False)
+
+    op.create_table('reviews',
+        *versioned_columns(),
+        sa.Column('movie_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('rating', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=256), nullable=True),
+        sa.Column('body', sa.Text(), nullable=True),
+        sa.CheckConstraint('rating BETWEEN 1 AND 5', name='ck_reviews_rating_range'),
+        sa.ForeignKeyConstraint(['movie_id'], ['movies.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_reviews_id'), 'reviews', ['id'], unique=False)
+    op.create_index('ix_reviews_movie_id_id', 'reviews', ['movie_id', 'id'], unique=False)
+    op.create_index('ix_reviews_rating_id', 'reviews', ['rating', 'id'], unique=False)
+    op.create_index('uq_reviews_user_id_movie_id', 'reviews', ['user_id', 'movie_id'], unique=True)
+
+    remove_old, add_new = apply_row('OLD', '-'), apply_row('NEW', '+')
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(f"CREATE TRIGGER {TRIGGER}_ai AFTER INSERT ON reviews BEGIN {add_new}; END")
+        op.execute(f"CREATE TRIGGER {TRIGGER}_ad AFTER DELETE ON reviews BEGIN {remove_old}; END")
+        op.execute(
+            f"CREATE TRIGGER {TRIGGER}_au AFTER UPDATE OF rating, movie_id ON reviews "
+            f"BEGIN {remove_old}; {add_new}; END"
+        )
+        return
+    op.execute(
+        f"CREATE OR REPLACE FUNCTION {TRIGGER}() RETURNS trigger LANGUAGE plpgsql AS $$\n"
+        "BEGIN\n"
+        f"    IF TG_OP <> 'INSERT' THEN {remove_old}; END IF;\n"
+        f"    IF TG_OP <> 'DELETE' THEN {add_new}; END IF;\n"
+        "    RETURN NULL;\n"
+        "END $$"
+    )
+    op.execute(
+        f"CREATE TRIGGER {TRIGGER} AFTER INSERT OR DELETE OR UPDATE OF rating, movie_id "
+        f"ON reviews FOR EACH ROW EXECUTE FUNCTION {TRIGGER}()"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Dropping reviews drops its triggers; the Postgres function goes separately.
+    op.drop_table('reviews')
+    if op.get_bind().dialect.name != 'sqlite':
+        op.execute(f"DROP FUNCTION IF EXISTS {TRIGGER}()")
+    op.drop_table('movie_credits')
+    op.drop_table('movie_genres')
+    op.drop_table('movies')
@@ -0,0 +1,31 @@
+"""Add (column, id) indexes for keyset pagination on cast_and_crew
+
+Revision ID: e7a1c2d3f4b5
+Revises: add_countries_cast_crew
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a1c2d3f4b5'
+down_revision: Union[str, Sequence[str], None] = 'add_countries_cast_crew'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+KEYSET_COLUMNS = ('last_name', 'first_name', 'stage_name', 'birth_date')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in KEYSET_COLUMNS:
+        op.create_index(f'ix_cast_and_crew_{column}_id', 'cast_and_crew', [column, 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in KEYSET_COLUMNS:
+        op.drop_index(f'ix_cast_and_crew_{column}_id', table_name='cast_and_crew')
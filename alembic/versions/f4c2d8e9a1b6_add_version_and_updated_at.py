@@ -0,0 +1,36 @@
+"""Add version and updated_at to every entity table
+
+Revision ID: f4c2d8e9a1b6
+Revises: e7a1c2d3f4b5
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c2d8e9a1b6'
+down_revision: Union[str, Sequence[str], None] = 'e7a1c2d3f4b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ENTITY_TABLES = ('users', 'genres', 'positions', 'cast_and_crew', 'countries')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ENTITY_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ENTITY_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('updated_at')
+            batch_op.drop_column('version')
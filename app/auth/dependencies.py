@@ -0,0 +1,108 @@
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import jwt
+from dotenv import load_dotenv
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.orm import Session
+
+from app.auth.jwt import decode_access_token
+from app.db.pool import WaitHistogram
+from app.db.session import get_db
+from app.services.cache import ExpiringLRU
+from app.services.user import get_user_by_id
+
+load_dotenv()
+
+AUTH_CLAIMS_CACHE_SIZE = int(os.getenv("AUTH_CLAIMS_CACHE_SIZE", "10000"))
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "10000"))
+AUTH_USER_CACHE_SECONDS = float(os.getenv("AUTH_USER_CACHE_SECONDS", "30"))
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+# Decoded claims by SHA-256 of the token, each kept until the token expires.
+claims_cache = ExpiringLRU(AUTH_CLAIMS_CACHE_SIZE)
+# Users by id for a short while, so a burst of requests costs one lookup.
+# Holds AuthenticatedUser snapshots: an ORM instance would be expired by the
+# commit of the request that loaded it, and then detached.
+user_cache = ExpiringLRU(AUTH_USER_CACHE_SIZE)
+# Time spent in get_current_user per authenticated request, cache hits included.
+verification_latency = WaitHistogram()
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """The user of a bearer token, copied out of the session that loaded it."""
+    id: int
+    username: str
+    email: str
+
+
+def credentials_exception(detail: str = "Could not validate credentials") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def verify_token(token: str) -> Dict[str, Any]:
+    """Claims of ``token``, decoded once and then served from the claims cache."""
+    key = hashlib.sha256(token.encode()).digest()
+    claims = claims_cache.get(key)
+    if claims is None:
+        try:
+            claims = decode_access_token(token)
+        except jwt.PyJWTError:
+            raise credentials_exception()
+        claims_cache.set(key, claims, claims["exp"] - time.time())
+    return claims
+
+
+def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    db: Session = Depends(get_db),
+) -> Optional[AuthenticatedUser]:
+    """The user of the bearer token, or None when the request carries none."""
+    if credentials is None:
+        return None
+    started = time.perf_counter()
+    try:
+        claims = verify_token(credentials.credentials)
+        try:
+            user_id = int(claims["sub"])
+        except ValueError:
+            raise credentials_exception()
+        user = user_cache.get(user_id)
+        if user is None:
+            found = get_user_by_id(db, user_id)
+            if found is None:
+                raise credentials_exception()
+            user = AuthenticatedUser(id=found.id, username=found.username, email=found.email)
+            user_cache.set(user_id, user, AUTH_USER_CACHE_SECONDS)
+        return user
+    finally:
+        verification_latency.observe((time.perf_counter() - started) * 1000)
+
+
+def require_user(user: Optional[AuthenticatedUser] = Depends(get_current_user)) -> AuthenticatedUser:
+    if user is None:
+        raise credentials_exception("Not authenticated")
+    return user
+
+
+def auth_status() -> Dict[str, Any]:
+    return {
+        "claims_cache": claims_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "verification_latency": verification_latency.snapshot(),
+    }
+
+
+def clear_auth_caches() -> None:
+    claims_cache.clear()
+    user_cache.clear()
@@ -1,5 +1,7 @@
 import jwt
 from datetime import datetime, timedelta, UTC
+from functools import lru_cache
+from typing import Any, Dict
 from dotenv import load_dotenv
 import os
 
@@ -15,3 +17,12 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
+
+@lru_cache(maxsize=None)
+def verification_key() -> Any:
+    """The key in the form the algorithm verifies with, prepared once instead of per decode."""
+    return jwt.get_algorithm_by_name(ALGORITHM).prepare_key(SECRET_KEY)
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """Verified claims of an access token. Raises jwt.PyJWTError when invalid or expired."""
+    return jwt.decode(token, verification_key(), algorithms=[ALGORITHM], options={"require": ["exp", "sub"]})
@@ -0,0 +1,82 @@
+from typing import List, Sequence
+
+from sqlalchemy import DDL, Table, event
+
+
+class RatingAggregates:
+    """Count, sum, mean and histogram of a child table's rating column,
+    stored on the parent row and maintained by row triggers.
+
+    The parent carries ``rating_count``, ``rating_sum``, ``rating_mean`` and
+    one ``rating_<value>`` column per allowed rating. Each child insert,
+    delete, or update of the rating or the parent key applies its delta to
+    the parent row in the same statement, so the aggregates commit or roll
+    back with the review itself, whatever write path made the change. The
+    parent's version is bumped too, since the aggregates are part of its
+    representation.
+
+    ``install`` attaches the triggers to ``create_all``; the Alembic
+    migration runs the same statements on existing databases.
+    """
+
+    def __init__(self, parent: Table, child: Table, parent_key: str, rating: str, values: Sequence[int]):
+        self.parent = parent
+        self.child = child
+        self.parent_key = parent_key
+        self.rating = rating
+        self.values = list(values)
+        self.name = f"{child.name}_rating_aggregates"
+
+    @property
+    def histogram_columns(self) -> List[str]:
+        return [f"rating_{value}" for value in self.values]
+
+    def apply_row(self, row: str, sign: str) -> str:
+        """UPDATE adding (``+``) or removing (``-``) the trigger's NEW or OLD row."""
+        rating = f"{row}.{self.rating}"
+        assignments = [
+            f"rating_count = rating_count {sign} 1",
+            f"rating_sum = rating_sum {sign} {rating}",
+            # The right-hand sides all see the row as it was before the UPDATE.
+            f"rating_mean = CAST(rating_sum {sign} {rating} AS FLOAT) / NULLIF(rating_count {sign} 1, 0)",
+            *(
+                f"{column} = {column} {sign} CASE WHEN {rating} = {value} THEN 1 ELSE 0 END"
+                for column, value in zip(self.histogram_columns, self.values)
+            ),
+            "version = version + 1",
+            "updated_at = CURRENT_TIMESTAMP",
+        ]
+        return f"UPDATE {self.parent.name} SET {', '.join(assignments)} WHERE id = {row}.{self.parent_key}"
+
+    def postgresql_ddl(self) -> List[str]:
+        return [
+            f"CREATE OR REPLACE FUNCTION {self.name}() RETURNS trigger LANGUAGE plpgsql AS $$\n"
+            "BEGIN\n"
+            f"    IF TG_OP <> 'INSERT' THEN {self.apply_row('OLD', '-')}; END IF;\n"
+            f"    IF TG_OP <> 'DELETE' THEN {self.apply_row('NEW', '+')}; END IF;\n"
+            "    RETURN NULL;\n"
+            "END $$",
+            f"CREATE TRIGGER {self.name} AFTER INSERT OR DELETE OR UPDATE OF {self.rating}, {self.parent_key} "
+            f"ON {self.child.name} FOR EACH ROW EXECUTE FUNCTION {self.name}()",
+        ]
+
+    def sqlite_ddl(self) -> List[str]:
+        child = self.child.name
+        remove_old, add_new = self.apply_row("old", "-"), self.apply_row("new", "+")
+        return [
+            f"CREATE TRIGGER IF NOT EXISTS {self.name}_ai AFTER INSERT ON {child} BEGIN {add_new}; END",
+            f"CREATE TRIGGER IF NOT EXISTS {self.name}_ad AFTER DELETE ON {child} BEGIN {remove_old}; END",
+            f"CREATE TRIGGER IF NOT EXISTS {self.name}_au AFTER UPDATE OF {self.rating}, {self.parent_key} "
+            f"ON {child} BEGIN {remove_old}; {add_new}; END",
+        ]
+
+    def install(self) -> None:
+        """Create the triggers with the child table."""
+        for statement in self.postgresql_ddl():
+            event.listen(self.child, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+        for statement in self.sqlite_ddl():
+            event.listen(self.child, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+        event.listen(
+            self.child, "before_drop",
+            DDL(f"DROP FUNCTION IF EXISTS {self.name}() CASCADE").execute_if(dialect="postgresql"),
+        )
@@ -0,0 +1,180 @@
+import bisect
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_POOL_USE_LIFO = os.getenv("DB_POOL_USE_LIFO", "false").lower() in ("1", "true", "yes")
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", str(DB_POOL_SIZE)))
+
+# Upper bounds of the connection-acquire wait histogram, in milliseconds.
+WAIT_BUCKETS_MS = (0.1, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class WaitHistogram:
+    """Thread-safe fixed-bucket histogram of connection-acquire wait times."""
+
+    def __init__(self, buckets_ms: tuple = WAIT_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts = [0] * (len(self.buckets_ms) + 1)
+            self.count = 0
+            self.total_ms = 0.0
+            self.max_ms = 0.0
+            self.timeouts = 0
+
+    def observe(self, wait_ms: float) -> None:
+        index = bisect.bisect_left(self.buckets_ms, wait_ms)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ms += wait_ms
+            self.max_ms = max(self.max_ms, wait_ms)
+
+    def observe_timeout(self, wait_ms: float) -> None:
+        self.observe(wait_ms)
+        with self._lock:
+            self.timeouts += 1
+
+    def percentile(self, fraction: float) -> float | None:
+        """Upper bucket bound below which ``fraction`` of the waits fall."""
+        with self._lock:
+            if not self.count:
+                return None
+            target = fraction * self.count
+            running = 0
+            for index, bucket_count in enumerate(self.counts):
+                running += bucket_count
+                if running >= target:
+                    return self.buckets_ms[index] if index < len(self.buckets_ms) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        percentiles = {
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+        }
+        with self._lock:
+            buckets = {f"le_{bound:g}ms": count for bound, count in zip(self.buckets_ms, self.counts)}
+            buckets["le_inf"] = self.counts[-1]
+            return {
+                "count": self.count,
+                "timeouts": self.timeouts,
+                "mean_ms": self.total_ms / self.count if self.count else None,
+                "max_ms": self.max_ms,
+                **percentiles,
+                "buckets": buckets,
+            }
+
+
+class _WaitTimingMixin:
+    """Times every pool checkout so queueing on an exhausted pool is visible."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_histogram = WaitHistogram()
+
+    def recreate(self):
+        new_pool = super().recreate()
+        new_pool.wait_histogram = self.wait_histogram
+        return new_pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_histogram.observe_timeout((time.perf_counter() - started) * 1000)
+            raise
+        self.wait_histogram.observe((time.perf_counter() - started) * 1000)
+        return connection
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options(url: str | None, is_async: bool = False) -> Dict[str, Any]:
+    """Engine keyword arguments for the configured pool.
+
+    SQLite keeps its dialect defaults since its pools are per-thread or
+    single-connection and the sizing knobs do not apply.
+    """
+    if url is None or make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_use_lifo": DB_POOL_USE_LIFO,
+    }
+
+
+def warm_up_pool(engine: Engine, connections: int = DB_POOL_WARMUP) -> int:
+    """Open ``connections`` connections at once so they sit idle in the pool.
+
+    The connections are held concurrently, otherwise the pool would hand the
+    same connection back on every checkout.
+    """
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        connections = min(connections, pool.size())
+    else:
+        connections = min(connections, 1)
+    if connections <= 0:
+        return 0
+
+    barrier = threading.Barrier(connections)
+
+    def hold_connection():
+        with engine.connect():
+            barrier.wait(timeout=DB_POOL_TIMEOUT)
+
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        futures = [executor.submit(hold_connection) for _ in range(connections)]
+        for future in futures:
+            future.result()
+    return connections
+
+
+def pool_status(engine: Engine) -> Dict[str, Any]:
+    pool = engine.pool
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout_s": pool.timeout(),
+        })
+    wait_histogram = getattr(pool, "wait_histogram", None)
+    if wait_histogram is not None:
+        status["wait"] = wait_histogram.snapshot()
+    return status
@@ -0,0 +1,213 @@
+import hashlib
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncGenerator, Generator, Iterator, List, Optional
+
+from fastapi import Depends, Request
+from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from dotenv import load_dotenv
+
+from app.db.pool import pool_options
+from app.db.session import get_async_db, get_db, to_async_url
+
+load_dotenv()
+
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+DB_REPLICA_RETRY_AFTER = float(os.getenv("DB_REPLICA_RETRY_AFTER", "30"))
+DB_READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+DB_WRITE_TRACKER_MAX_CLIENTS = int(os.getenv("DB_WRITE_TRACKER_MAX_CLIENTS", "10000"))
+
+
+class ReplicaSet:
+    """Round-robin over read replicas, skipping ones that recently failed."""
+
+    def __init__(self, urls: List[str], retry_after: float = DB_REPLICA_RETRY_AFTER):
+        self.urls = urls
+        self.retry_after = retry_after
+        self.engines = [create_engine(url, **pool_options(url)) for url in urls]
+        self.session_factories = [
+            sessionmaker(autocommit=False, autoflush=False, bind=engine) for engine in self.engines
+        ]
+        # Async engines are created on first use, like the primary's, so the
+        # async driver is only required in async mode.
+        self.async_engines: List[AsyncEngine] = []
+        self.async_session_factories: List[async_sessionmaker] = []
+        self._down_until = [0.0] * len(urls)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def mark_down(self, index: int) -> None:
+        with self._lock:
+            self._down_until[index] = time.monotonic() + self.retry_after
+
+    def is_down(self, index: int) -> bool:
+        return self._down_until[index] > time.monotonic()
+
+    def _healthy_indexes(self) -> Iterator[int]:
+        """Replicas to try, in round-robin order from the next one."""
+        start = next(self._counter)
+        for offset in range(len(self.urls)):
+            index = (start + offset) % len(self.urls)
+            if not self.is_down(index):
+                yield index
+
+    def open_session(self) -> Optional[Session]:
+        """Return a session on the next healthy replica, or None if all are down."""
+        for index in self._healthy_indexes():
+            session = self.session_factories[index]()
+            session.info["replica"] = True
+            try:
+                # Check out the connection now so a dead replica is detected
+                # here rather than halfway through the request.
+                session.connection()
+                return session
+            except DBAPIError:
+                session.close()
+                self.mark_down(index)
+        return None
+
+    def _async_factories(self) -> List[async_sessionmaker]:
+        with self._lock:
+            if not self.async_session_factories:
+                for url in self.urls:
+                    async_url = to_async_url(url)
+                    engine = create_async_engine(async_url, **pool_options(async_url, is_async=True))
+                    self.async_engines.append(engine)
+                    self.async_session_factories.append(
+                        async_sessionmaker(engine, autoflush=False, expire_on_commit=False, class_=AsyncSession)
+                    )
+            return self.async_session_factories
+
+    async def open_async_session(self) -> Optional[AsyncSession]:
+        """Async counterpart of ``open_session``."""
+        factories = self._async_factories()
+        for index in self._healthy_indexes():
+            session = factories[index]()
+            session.info["replica"] = True
+            try:
+                await session.connection()
+                return session
+            except DBAPIError:
+                await session.close()
+                self.mark_down(index)
+        return None
+
+    def dispose(self) -> None:
+        for engine in self.engines:
+            engine.dispose()
+
+    async def dispose_async(self) -> None:
+        for engine in self.async_engines:
+            await engine.dispose()
+
+
+class WriteTracker:
+    """Remembers which clients wrote recently so their reads stay on the primary."""
+
+    def __init__(self, window_seconds: float = DB_READ_YOUR_WRITES_SECONDS, max_clients: int = DB_WRITE_TRACKER_MAX_CLIENTS):
+        self.window_seconds = window_seconds
+        self.max_clients = max_clients
+        self._last_write: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def mark(self, client_key: str) -> None:
+        with self._lock:
+            self._last_write[client_key] = time.monotonic()
+            self._last_write.move_to_end(client_key)
+            while len(self._last_write) > self.max_clients:
+                self._last_write.popitem(last=False)
+
+    def wrote_recently(self, client_key: str) -> bool:
+        last_write = self._last_write.get(client_key)
+        return last_write is not None and time.monotonic() - last_write < self.window_seconds
+
+
+replica_set = ReplicaSet(DATABASE_REPLICA_URLS) if DATABASE_REPLICA_URLS else None
+write_tracker = WriteTracker()
+
+
+def client_key(request: Request) -> str:
+    authorization = request.headers.get("authorization")
+    if authorization:
+        # Hashed, so live tokens are not kept around as tracker keys.
+        return hashlib.sha256(authorization.encode()).hexdigest()
+    return request.client.host if request.client else "anonymous"
+
+
+def is_replica_session(db: Any) -> bool:
+    return bool(db.info.get("replica"))
+
+
+def may_cache_read(db: Any, cache: Any) -> bool:
+    """Whether a result read from ``db`` may be stored in ``cache``.
+
+    A replica may not have applied the write that last invalidated the cache
+    yet, so its results are only cached once the read-your-writes window
+    since that write has passed.
+    """
+    return not is_replica_session(db) or not cache.invalidated_within(DB_READ_YOUR_WRITES_SECONDS)
+
+
+def get_read_db(request: Request, primary: Session = Depends(get_db)) -> Generator[Session, Any, None]:
+    """Session for read-only endpoints.
+
+    Reads go to a replica unless none is configured or healthy, or the client
+    wrote within the read-your-writes window. The primary session is only
+    connected when it is actually used.
+    """
+    if replica_set is None or write_tracker.wrote_recently(client_key(request)):
+        yield primary
+        return
+
+    replica = replica_set.open_session()
+    if replica is None:
+        yield primary
+        return
+
+    try:
+        yield replica
+    finally:
+        replica.close()
+
+
+def get_write_db(request: Request, db: Session = Depends(get_db)) -> Generator[Session, Any, None]:
+    try:
+        yield db
+    finally:
+        if replica_set is not None:
+            write_tracker.mark(client_key(request))
+
+
+async def get_async_read_db(
+    request: Request, primary: AsyncSession = Depends(get_async_db),
+) -> AsyncGenerator[AsyncSession, None]:
+    """``get_read_db`` for async endpoints."""
+    if replica_set is None or write_tracker.wrote_recently(client_key(request)):
+        yield primary
+        return
+
+    replica = await replica_set.open_async_session()
+    if replica is None:
+        yield primary
+        return
+
+    try:
+        yield replica
+    finally:
+        await replica.close()
+
+
+async def get_async_write_db(
+    request: Request, db: AsyncSession = Depends(get_async_db),
+) -> AsyncGenerator[AsyncSession, None]:
+    try:
+        yield db
+    finally:
+        if replica_set is not None:
+            write_tracker.mark(client_key(request))
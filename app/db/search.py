@@ -0,0 +1,155 @@
+import os
+import re
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import DDL, Float, Integer, Table, event, text
+from sqlalchemy.sql import Subquery
+
+load_dotenv()
+
+# Relative weight of each Postgres tsvector class; SQLite's bm25() takes the
+# same numbers as per-column weights.
+WEIGHTS = {"A": 10.0, "B": 4.0, "C": 2.0, "D": 1.0}
+MAX_QUERY_TERMS = 8
+# Matches taken from the index before any of them is ranked.
+SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "500"))
+
+
+def query_terms(query: str) -> List[str]:
+    """Word tokens of a user query. Anything else is dropped, so the terms
+    can be put into an FTS5 or tsquery expression without escaping."""
+    return re.findall(r"\w+", query.lower())[:MAX_QUERY_TERMS]
+
+
+class FullTextSearch:
+    """Database-maintained full-text index over some text columns of a table.
+
+    On Postgres a generated ``search_vector`` tsvector column (weighted per
+    column) with a GIN index serves word and prefix matches, and a pg_trgm
+    GIN index over the ``name_columns`` adds typo-tolerant matching. On
+    SQLite an external-content FTS5 table kept up to date by triggers
+    serves word and prefix matches only.
+
+    The database maintains both in the same statement as the row change, so
+    every write path (single, bulk or raw SQL) keeps the index in sync.
+    ``install`` attaches the DDL to ``create_all``; the Alembic migration
+    runs the same statements on existing databases.
+    """
+
+    def __init__(self, table: Table, weights: Dict[str, str], name_columns: List[str]):
+        self.table = table
+        self.weights = weights
+        self.name_columns = name_columns
+        self.fts_table = f"{table.name}_fts"
+
+    @property
+    def names_expression(self) -> str:
+        # Plain || with coalesce, because concat_ws is not immutable and so
+        # cannot be indexed on Postgres.
+        return "lower(" + " || ' ' || ".join(f"coalesce({column}, '')" for column in self.name_columns) + ")"
+
+    def postgresql_ddl(self) -> List[str]:
+        vector = " || ".join(
+            f"setweight(to_tsvector('simple', coalesce({column}, '')), '{weight}')"
+            for column, weight in self.weights.items()
+        )
+        return [
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            f"ALTER TABLE {self.table.name} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({vector}) STORED",
+            f"CREATE INDEX ix_{self.table.name}_search_vector ON {self.table.name} USING gin (search_vector)",
+            f"CREATE INDEX ix_{self.table.name}_search_names_trgm ON {self.table.name} "
+            f"USING gin (({self.names_expression}) gin_trgm_ops)",
+        ]
+
+    def sqlite_ddl(self) -> List[str]:
+        table, fts = self.table.name, self.fts_table
+        columns = ", ".join(self.weights)
+        new_values = ", ".join(f"new.{column}" for column in self.weights)
+        old_values = ", ".join(f"old.{column}" for column in self.weights)
+        remove_old = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+        add_new = f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});"
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, content='{table}', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='1 2 3')",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {add_new} END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {remove_old} END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} ON {table} "
+            f"BEGIN {remove_old} {add_new} END",
+            # Index rows that existed before the FTS table did.
+            f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        ]
+
+    def install(self) -> None:
+        """Create the index with the table, and drop the FTS table with it."""
+        for statement in self.postgresql_ddl():
+            event.listen(self.table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+        for statement in self.sqlite_ddl():
+            event.listen(self.table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+        event.listen(
+            self.table, "before_drop", DDL(f"DROP TABLE IF EXISTS {self.fts_table}").execute_if(dialect="sqlite"),
+        )
+
+    def ranked(self, dialect: str, query: str, limit: int, candidates: int = SEARCH_MAX_CANDIDATES) -> Optional[Subquery]:
+        """Ids of the best ``limit`` matches with a ``rank`` (higher is better),
+        or None when the query has no searchable terms.
+
+        Only a bounded set of candidates is ranked, so a short prefix
+        matching much of the table costs the same as a rare word. It is
+        taken by relevance tier: up to ``candidates`` matches in the
+        ``name_columns``, which outweigh the rest, plus up to ``candidates``
+        matches anywhere. A name match is only left out when more than
+        ``candidates`` rows match in names; queries with fewer matches than
+        that are ranked exactly.
+        """
+        terms = query_terms(query)
+        if not terms:
+            return None
+        if dialect == "postgresql":
+            table, names = self.table.name, self.names_expression
+            name_weights = "".join(sorted({self.weights[column] for column in self.name_columns}))
+            # Each arm is a GIN lookup cut off at ``candidates`` rows: names
+            # by their weight labels, names by trigrams, then any column.
+            # Only their union is read and scored.
+            stmt = text(
+                f"SELECT {table}.id, ts_rank_cd(search_vector, query) + word_similarity(:raw, {names}) AS rank "
+                "FROM ("
+                f"(SELECT id FROM {table} WHERE search_vector @@ to_tsquery('simple', :name_tsquery) "
+                "LIMIT :candidates) "
+                f"UNION (SELECT id FROM {table} WHERE :raw <% {names} LIMIT :candidates) "
+                f"UNION (SELECT id FROM {table} WHERE search_vector @@ to_tsquery('simple', :tsquery) "
+                "LIMIT :candidates)"
+                f") AS candidates JOIN {table} ON {table}.id = candidates.id, "
+                "to_tsquery('simple', :tsquery) AS query "
+                "ORDER BY rank DESC LIMIT :limit"
+            ).bindparams(
+                raw=" ".join(terms),
+                tsquery=" & ".join(f"{term}:*" for term in terms),
+                name_tsquery=" & ".join(f"{term}:*{name_weights}" for term in terms),
+                candidates=candidates, limit=limit,
+            )
+        elif dialect == "sqlite":
+            fts = self.fts_table
+            weights = ", ".join(str(WEIGHTS[weight]) for weight in self.weights.values())
+            match = " ".join(f'"{term}"*' for term in terms)
+            # FTS5 yields matches in rowid order, so the first ``candidates``
+            # of an expression are its matches up to a rowid, which it can
+            # seek to. The name arm keeps the whole query in its expression,
+            # so bm25() still counts every column. bm25() is lower for
+            # better matches, hence the minus sign.
+            arm = (
+                f"SELECT rowid AS id, -bm25({fts}, {weights}) AS rank FROM {fts} "
+                f"WHERE {fts} MATCH :{{0}} AND rowid <= ("
+                f"SELECT max(id) FROM (SELECT rowid AS id FROM {fts} WHERE {fts} MATCH :{{0}} LIMIT :candidates))"
+            )
+            stmt = text(
+                f"SELECT id, max(rank) AS rank FROM ({arm.format('name_match')} UNION ALL {arm.format('match')}) "
+                "GROUP BY id ORDER BY rank DESC LIMIT :limit"
+            ).bindparams(
+                match=match,
+                name_match=f"({match}) AND {{{' '.join(self.name_columns)}}} : ({match})",
+                candidates=candidates, limit=limit,
+            )
+        else:
+            raise NotImplementedError(f"Full-text search is not available on '{dialect}' databases")
+        return stmt.columns(id=Integer, rank=Float).subquery("ranked")
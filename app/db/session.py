@@ -1,22 +1,79 @@
-from typing import Any, Generator
+from typing import Any, AsyncGenerator, Generator
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
 from dotenv import load_dotenv
 import os
 
+from app.db.pool import pool_options
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+DB_ASYNC_MODE = os.getenv("DB_ASYNC_MODE", "false").lower() in ("1", "true", "yes")
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
 
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async sessions cannot lazy load, so they never expire on commit.
+# The async engine is created on first use so the async driver is only
+# required when async mode is actually enabled.
+async_engine: AsyncEngine | None = None
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False, class_=AsyncSession)
+
 Base = declarative_base()
 
+
+def to_async_url(url: str) -> str:
+    """Swap the driver of a sync database URL for its async counterpart."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def get_async_engine() -> AsyncEngine:
+    global async_engine
+    if async_engine is None:
+        async_url = ASYNC_DATABASE_URL or to_async_url(DATABASE_URL)
+        async_engine = create_async_engine(async_url, **pool_options(async_url, is_async=True))
+        AsyncSessionLocal.configure(bind=async_engine)
+    return async_engine
+
+
+def commit_keeping_state(db: Session) -> None:
+    """Commit without expiring the session's instances.
+
+    Write paths hold the rows RETURNING gave back; expiring them would make
+    the response refresh each one with another SELECT. Only those commits
+    skip the expiry, every other commit behaves as usual.
+    """
+    expire_on_commit = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = expire_on_commit
+
+
 def get_db() -> Generator[Session, Any, None]:
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,8 +1,57 @@
+import logging
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import user, genre, position, cast_and_crew, country
+from app.db.pool import warm_up_pool
+from app.middleware.compression import CompressionMiddleware
+from app.db.session import engine, SessionLocal
+from app.routes import (
+    user, genre, position, cast_and_crew, country, movie, movie_credit, review, autocomplete, diagnostics,
+)
+from app.services.country import seed_countries, get_snapshot
+from app.services.passwords import password_pool
+from app.services.similar_movies import similar_movies_index
+
+logger = logging.getLogger(__name__)
+
+SEED_COUNTRIES_ON_STARTUP = os.getenv("SEED_COUNTRIES_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+BUILD_SIMILAR_MOVIES_ON_STARTUP = os.getenv("BUILD_SIMILAR_MOVIES_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+
+def load_countries() -> int:
+    with SessionLocal() as db:
+        inserted = seed_countries(db) if SEED_COUNTRIES_ON_STARTUP else 0
+        get_snapshot(db)
+    return inserted
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        opened = await run_in_threadpool(warm_up_pool, engine)
+        logger.info("Connection pool warmed up with %d connections", opened)
+    except Exception:
+        logger.exception("Connection pool warm-up failed")
+    try:
+        inserted = await run_in_threadpool(load_countries)
+        logger.info("Country snapshot loaded, %d countries seeded", inserted)
+    except Exception:
+        # The snapshot is then loaded by the first request that needs it.
+        logger.exception("Loading countries failed")
+    if BUILD_SIMILAR_MOVIES_ON_STARTUP:
+        # In the background: GET /api/movies/{id}/similar is 503 until done.
+        similar_movies_index.start_build(SessionLocal)
+    yield
+    password_pool.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
-app = FastAPI()
+# Added first so that it sits inside CORS and compresses the final body.
+app.add_middleware(CompressionMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -10,6 +59,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "Link", "ETag", "Last-Modified"],
 )
 
 @app.get("/")
@@ -22,3 +72,8 @@ app.include_router(genre.router)
 app.include_router(position.router)
 app.include_router(cast_and_crew.router)
 app.include_router(country.router)
+app.include_router(movie.router)
+app.include_router(movie_credit.router)
+app.include_router(review.router)
+app.include_router(autocomplete.router)
+app.include_router(diagnostics.router)
@@ -0,0 +1,117 @@
+import time
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.compression import (
+    COMPRESSION_MIN_SIZE, StreamCompressor, compress, compression_stats, is_compressible, negotiate, route_label,
+)
+from app.services.conditional import encoded_etag
+
+
+class CompressionMiddleware:
+    """Negotiated gzip / brotli compression for responses of compressible types.
+
+    A response sent in one body message is compressed whole, and only when it
+    is at least ``minimum_size`` bytes. A streamed response is compressed
+    chunk by chunk, with a flush after each one, so streaming keeps working.
+    Responses that already carry a Content-Encoding, such as precompressed
+    cache entries, pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        responder = _CompressionResponder(scope, send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, scope: Scope, send: Send, encoding: Optional[str], minimum_size: int):
+        self.scope = scope
+        self.downstream = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[StreamCompressor] = None
+        self.passthrough = False
+
+    @staticmethod
+    def _compressible(start: Message, headers: MutableHeaders) -> bool:
+        status = start["status"]
+        return (
+            200 <= status < 300 and status != 204
+            and "content-encoding" not in headers
+            and is_compressible(headers.get("content-type"))
+        )
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.downstream(message)
+            return
+        if self.compressor is not None:
+            await self._send_chunk(message)
+            return
+
+        start, self.start_message = self.start_message, None
+        headers = MutableHeaders(raw=start["headers"])
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        compressible = self._compressible(start, headers)
+        if compressible:
+            headers.add_vary_header("Accept-Encoding")
+        if not compressible or self.encoding is None or (not more_body and len(body) < self.minimum_size):
+            self.passthrough = True
+            await self.downstream(start)
+            await self.downstream(message)
+            return
+
+        if not more_body:
+            started = time.thread_time()
+            compressed = compress(body, self.encoding)
+            cpu_seconds = time.thread_time() - started
+            if len(compressed) >= len(body):
+                self.passthrough = True
+                await self.downstream(start)
+                await self.downstream(message)
+                return
+            compression_stats.record(route_label(self.scope), len(body), len(compressed), cpu_seconds)
+            self._mark_encoded(headers)
+            headers["Content-Length"] = str(len(compressed))
+            await self.downstream(start)
+            await self.downstream({"type": "http.response.body", "body": compressed})
+            return
+
+        self.compressor = StreamCompressor(self.encoding)
+        self._mark_encoded(headers)
+        del headers["Content-Length"]
+        await self.downstream(start)
+        await self._send_chunk(message)
+
+    def _mark_encoded(self, headers: MutableHeaders) -> None:
+        headers["Content-Encoding"] = self.encoding
+        if "etag" in headers:
+            headers["ETag"] = encoded_etag(headers["etag"], self.encoding)
+
+    async def _send_chunk(self, message: Message) -> None:
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        started = time.thread_time()
+        data = self.compressor.compress(body) if body else b""
+        if not more_body:
+            data += self.compressor.finish()
+        compression_stats.record(
+            route_label(self.scope), len(body), len(data), time.thread_time() - started,
+            responses=0 if more_body else 1,
+        )
+        await self.downstream({"type": "http.response.body", "body": data, "more_body": more_body})
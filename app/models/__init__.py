@@ -3,5 +3,7 @@ from .user import User
 from .genre import Genre
 from .position import Position
 from .country import Country
+from .movie import Movie, MovieCredit
+from .review import Review
 
-__all__ = ["User", "Genre", "Position", "CastAndCrew", "Country"]
+__all__ = ["User", "Genre", "Position", "CastAndCrew", "Country", "Movie", "MovieCredit", "Review"]
@@ -1,8 +1,17 @@
-from sqlalchemy import Column, Integer
+from datetime import datetime, timezone
+from sqlalchemy import Column, DateTime, Integer, func
 from app.db.session import Base
 
 
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class BaseEntity(Base):
     __abstract__ = True
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
\ No newline at end of file
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    # Maintained by the service write paths, which set both in the same
+    # statement as the change. They back ETag / Last-Modified and If-Match.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, server_default=func.now())
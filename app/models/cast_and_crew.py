@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, Text, Date, ForeignKey, Table
+from sqlalchemy import Column, String, Text, Date, ForeignKey, Table, Index
 from sqlalchemy.orm import relationship
 from app.models.base_entity import BaseEntity
+from app.db.search import FullTextSearch
 from app.db.session import Base
 
 cast_and_crew_countries = Table(
@@ -13,6 +14,12 @@ cast_and_crew_countries = Table(
 
 class CastAndCrew(BaseEntity):
     __tablename__ = "cast_and_crew"
+    __table_args__ = (
+        Index("ix_cast_and_crew_last_name_id", "last_name", "id"),
+        Index("ix_cast_and_crew_first_name_id", "first_name", "id"),
+        Index("ix_cast_and_crew_stage_name_id", "stage_name", "id"),
+        Index("ix_cast_and_crew_birth_date_id", "birth_date", "id"),
+    )
 
     first_name = Column(String(256), nullable=True)
     last_name = Column(String(256), nullable=True)
@@ -21,4 +28,12 @@ class CastAndCrew(BaseEntity):
     image_url = Column(String(2048), nullable=True)
     description = Column(Text, nullable=True)
 
-    countries = relationship("Country", secondary=cast_and_crew_countries, back_populates="cast_and_crew")
\ No newline at end of file
+    countries = relationship("Country", secondary=cast_and_crew_countries, back_populates="cast_and_crew")
+
+# Kept up to date by the database itself (generated column or triggers).
+cast_and_crew_search = FullTextSearch(
+    CastAndCrew.__table__,
+    weights={'first_name': 'A', 'last_name': 'A', 'stage_name': 'A', 'description': 'D'},
+    name_columns=['first_name', 'last_name', 'stage_name'],
+)
+cast_and_crew_search.install()
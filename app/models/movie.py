@@ -0,0 +1,67 @@
+from sqlalchemy import Column, Date, Float, ForeignKey, Index, Integer, String, Table, Text, UniqueConstraint
+from sqlalchemy.orm import relationship
+from app.models.base_entity import BaseEntity
+from app.db.session import Base
+
+# Ratings are whole stars; one histogram column per value.
+RATING_VALUES = range(1, 6)
+
+movie_genres = Table(
+    'movie_genres',
+    Base.metadata,
+    Column('movie_id', ForeignKey('movies.id', ondelete='CASCADE'), primary_key=True),
+    Column('genre_id', ForeignKey('genres.id'), primary_key=True, index=True),
+)
+
+
+class Movie(BaseEntity):
+    __tablename__ = "movies"
+    __table_args__ = (
+        Index("ix_movies_title_id", "title", "id"),
+        Index("ix_movies_release_date_id", "release_date", "id"),
+        Index("ix_movies_rating_mean_id", "rating_mean", "id"),
+        Index("ix_movies_rating_count_id", "rating_count", "id"),
+    )
+
+    title = Column(String(256), nullable=False)
+    original_title = Column(String(256), nullable=True)
+    release_date = Column(Date, nullable=True)
+    runtime_minutes = Column(Integer, nullable=True)
+    description = Column(Text, nullable=True)
+    poster_url = Column(String(2048), nullable=True)
+
+    # Review aggregates, maintained by the database on every review write
+    # (see app.models.review) and checked by app.services.ratings.
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_mean = Column(Float, nullable=True)
+    rating_1 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_2 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_3 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_4 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_5 = Column(Integer, nullable=False, default=0, server_default="0")
+
+    genres = relationship("Genre", secondary=movie_genres)
+
+    @property
+    def rating_histogram(self) -> list:
+        """Number of reviews per rating, from 1 star up."""
+        return [getattr(self, f"rating_{value}") for value in RATING_VALUES]
+
+
+class MovieCredit(BaseEntity):
+    """A person's part in a movie: who, in which position, and for actors
+    the character played."""
+    __tablename__ = "movie_credits"
+    __table_args__ = (
+        UniqueConstraint("movie_id", "cast_and_crew_id", "position_id", name="uq_movie_credits_movie_person_position"),
+        Index("ix_movie_credits_cast_and_crew_id", "cast_and_crew_id"),
+        Index("ix_movie_credits_position_id", "position_id"),
+        Index("ix_movie_credits_billing_order_id", "billing_order", "id"),
+    )
+
+    movie_id = Column(Integer, ForeignKey('movies.id', ondelete='CASCADE'), nullable=False)
+    cast_and_crew_id = Column(Integer, ForeignKey('cast_and_crew.id'), nullable=False)
+    position_id = Column(Integer, ForeignKey('positions.id'), nullable=False)
+    character_name = Column(String(256), nullable=True)
+    billing_order = Column(Integer, nullable=True)
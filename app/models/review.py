@@ -0,0 +1,31 @@
+from sqlalchemy import CheckConstraint, Column, ForeignKey, Index, Integer, String, Text
+from app.db.aggregates import RatingAggregates
+from app.models.base_entity import BaseEntity
+from app.models.movie import Movie, RATING_VALUES
+
+
+class Review(BaseEntity):
+    __tablename__ = "reviews"
+    __table_args__ = (
+        CheckConstraint(
+            f"rating BETWEEN {RATING_VALUES.start} AND {RATING_VALUES.stop - 1}", name="ck_reviews_rating_range",
+        ),
+        Index("ix_reviews_movie_id_id", "movie_id", "id"),
+        Index("ix_reviews_rating_id", "rating", "id"),
+        # One review per user and movie. Only reviews of deleted users have
+        # no user_id.
+        Index("uq_reviews_user_id_movie_id", "user_id", "movie_id", unique=True),
+    )
+
+    movie_id = Column(Integer, ForeignKey('movies.id', ondelete='CASCADE'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+    rating = Column(Integer, nullable=False)
+    title = Column(String(256), nullable=True)
+    body = Column(Text, nullable=True)
+
+
+# Kept up to date by the database itself, in the same statement as the review.
+review_ratings = RatingAggregates(
+    Movie.__table__, Review.__table__, parent_key='movie_id', rating='rating', values=RATING_VALUES,
+)
+review_ratings.install()
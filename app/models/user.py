@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String
+from sqlalchemy import Column, Index, String, func
 from app.models.base_entity import BaseEntity
 
 
@@ -8,3 +8,10 @@ class User(BaseEntity):
     username = Column(String, unique=True, nullable=False, index=True)
     email = Column(String, unique=True, nullable=False, index=True)
     password = Column(String, nullable=False)
+
+    # Case-insensitive uniqueness; registration relies on these to reject
+    # duplicates, and login and the pre-check look users up through them.
+    __table_args__ = (
+        Index("uq_users_username_lower", func.lower(username), unique=True),
+        Index("uq_users_email_lower", func.lower(email), unique=True),
+    )
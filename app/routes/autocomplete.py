@@ -0,0 +1,30 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.routes.responses import JSONBytesResponse
+from app.schemas.autocomplete import SuggestionOut
+from app.services.autocomplete import AUTOCOMPLETE_MAX_LIMIT, autocomplete_indexes
+
+router = APIRouter(prefix="/api/autocomplete", tags=["Autocomplete"])
+
+
+@router.get("/{kind}", response_model=List[SuggestionOut])
+def autocomplete(
+    kind: str,
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=AUTOCOMPLETE_MAX_LIMIT),
+    # The primary, so rows reloaded after a write are never a replica behind.
+    # The session only connects when the index has to be built or refreshed.
+    db: Session = Depends(get_db),
+):
+    """Countries, genres, positions or cast_and_crew with a word starting
+    with ``prefix``, ignoring case and accents, most popular first."""
+    index = autocomplete_indexes.get(kind)
+    if index is None:
+        raise HTTPException(status_code=404, detail=f"Unknown autocomplete kind '{kind}'")
+    index.ensure_current(db)
+    return JSONBytesResponse([
+        {"id": suggestion.id, "label": suggestion.label} for suggestion in index.suggest(prefix, limit)
+    ])
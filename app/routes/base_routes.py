@@ -1,9 +1,53 @@
-from typing import TypeVar, Generic, Type, cast, List
-from pydantic import BaseModel
-from fastapi import APIRouter, Depends, HTTPException, status
+import os
+from email.utils import parsedate_to_datetime
+from typing import TypeVar, Generic, Type, cast, Iterator, List, Literal, Optional, Dict, Any, Tuple
+from urllib.parse import urlencode
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.auth.dependencies import AuthenticatedUser, require_user
+from app.db.replicas import get_async_read_db, get_async_write_db, get_read_db, get_write_db, may_cache_read
+from app.db.session import DB_ASYNC_MODE
+from app.schemas.bulk import BulkResult, BulkItemError
 from app.services.base_service import BaseEntityService
+from app.routes.export import EXPORT_MEDIA_TYPES, csv_chunk, ndjson_chunk, stream_until_disconnect
+from app.routes.responses import FAST_JSON_RESPONSES, JSONBytesResponse, dump_validated, encoded_response
+from app.services.cache import CachedResponse
+from app.services.compression import precompress, route_label
+from app.services.conditional import (
+    collection_etag, entity_etag, has_conditional_get, if_match_versions, is_not_modified, validator_headers,
+)
+from app.services.pagination import Page, DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+BULK_MAX_CHUNK_SIZE = int(os.getenv("BULK_MAX_CHUNK_SIZE", "5000"))
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "50000"))
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+EXPORT_MAX_CHUNK_SIZE = int(os.getenv("EXPORT_MAX_CHUNK_SIZE", "10000"))
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+AUTH_REQUIRED_FOR_WRITES = os.getenv("AUTH_REQUIRED_FOR_WRITES", "false").lower() in ("1", "true", "yes")
+
+LIST_DESCRIPTION = (
+    f"One page of at most `limit` items, {DEFAULT_PAGE_LIMIT} unless given. When more remain, the response "
+    "carries the next page's cursor in `X-Next-Cursor` and its URL in a `Link: <...>; rel=\"next\"` header; "
+    "a response without them is the last page."
+)
+
+CACHED_HEADERS = ("X-Next-Cursor", "Link", "X-Total-Count", "ETag", "Last-Modified")
+# Enough of each row to tell whether a page changed.
+PAGE_VERSION_FIELDS = ['id', 'version']
+
+def current_user_id(user: AuthenticatedUser = Depends(require_user)) -> int:
+    return user.id
+
+
+def no_owner() -> None:
+    return None
+
 
 TCreate = TypeVar("TCreate", bound=BaseModel)
 TUpdate = TypeVar("TUpdate", bound=BaseModel)
@@ -19,39 +63,521 @@ class BaseRouter(Generic[TCreate, TUpdate, TOut]):
         schema_out: Type[TOut],
         prefix: str,
         tags: List[str],
+        async_mode: bool = DB_ASYNC_MODE,
+        fast_json: bool = FAST_JSON_RESPONSES,
+        require_auth: bool = AUTH_REQUIRED_FOR_WRITES,
     ):
         self.service = service
         self.schema_create = schema_create
         self.schema_update = schema_update
         self.schema_out = schema_out
+        self.async_mode = async_mode
+        # Return serialized bytes from every JSON endpoint; cached services
+        # do so for reads regardless.
+        self.fast_json = fast_json
+        self._list_adapter = TypeAdapter(List[schema_out])
+        self._item_adapter = TypeAdapter(schema_out)
+        self.prefix = prefix
+        # Create, update and delete (single and bulk) need a bearer token.
+        # So do writes to a service with an owner_field: creates belong to
+        # the user, and updates and deletes only reach the user's rows.
+        self.write_dependencies = [Depends(require_user)] if require_auth or service.owner_field else []
+        self.owner_id = current_user_id if service.owner_field else no_owner
         self.router = APIRouter(prefix=f"/api/{prefix}", tags=tags)
 
         self._add_routes()
 
+    def _list_filters(self, request: Request) -> dict:
+        return {
+            field: request.query_params.getlist(field)
+            for field in self.service.filterable_fields
+            if field in request.query_params
+        }
+
+    @staticmethod
+    def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+        if not fields:
+            return None
+        return list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+
+    @staticmethod
+    def _versioned_fields(fields: List[str]) -> List[str]:
+        return list(dict.fromkeys([*fields, 'version', 'updated_at']))
+
+    @staticmethod
+    def _json_response(content: Any) -> Response:
+        # Sparse rows are plain dicts, so they skip response_model validation
+        # and go straight to JSON bytes.
+        return JSONBytesResponse(content)
+
+    def _serializes(self, cache_key: Optional[tuple]) -> bool:
+        return self.fast_json or cache_key is not None
+
+    def _entity_response(self, entity: Any, response: Response, status_code: int = status.HTTP_200_OK) -> Any:
+        """Response for a written entity: bytes in fast mode, else the entity
+        with its validators on ``response`` for response_model to serialize."""
+        validators = validator_headers(entity_etag(entity.version), entity.updated_at)
+        if not self.fast_json:
+            response.headers.update(validators)
+            return entity
+        return JSONBytesResponse(dump_validated(self._item_adapter, entity), status_code=status_code, headers=validators)
+
+    def _set_page_headers(self, request: Request, response: Response, page: Page) -> None:
+        if page.next_cursor:
+            response.headers["X-Next-Cursor"] = page.next_cursor
+            params = dict(request.query_params)
+            params["cursor"] = page.next_cursor
+            response.headers["Link"] = f'<{request.url.path}?{urlencode(params)}>; rel="next"'
+        if page.total is not None:
+            response.headers["X-Total-Count"] = str(page.total)
+
+    @staticmethod
+    def _page_etag(page: Page, representation: Dict[str, Any]) -> str:
+        versions = [
+            (item['id'], item['version']) if isinstance(item, dict) else (item.id, item.version)
+            for item in page.items
+        ]
+        return collection_etag(versions, page.next_cursor is not None, page.total, representation)
+
+    @staticmethod
+    def _not_modified(validators: Dict[str, str]) -> Response:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validators)
+
+    def _cache_lookup(self, request: Request, *key: Any) -> Tuple[Optional[tuple], Optional[int], Optional[Response]]:
+        """Return the cache key, the cache generation to store under and the
+        cached response (or 304), if the service caches and has one."""
+        cache = self.service.cache
+        if cache is None:
+            return None, None, None
+        cache_key = (*key, tuple(sorted(request.query_params.multi_items())))
+        generation = cache.generation
+        cached = cache.get(cache_key)
+        if cached is None:
+            return cache_key, generation, None
+        validators = {name: cached.headers[name] for name in ("ETag", "Last-Modified") if name in cached.headers}
+        last_modified = parsedate_to_datetime(validators["Last-Modified"]) if "Last-Modified" in validators else None
+        if is_not_modified(request, validators["ETag"], last_modified):
+            return cache_key, generation, self._not_modified(validators)
+        return cache_key, generation, encoded_response(request, cached.body, cached.encoded, cached.headers)
+
+    def _store_response(self, request: Request, cache_key: tuple, generation: int, response: Response, db: Any) -> Response:
+        if not may_cache_read(db, self.service.cache):
+            return response
+        headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+        cached = CachedResponse(response.body, headers, precompress(response.body, route_label(request.scope)))
+        self.service.cache.set(cache_key, cached, generation)
+        return encoded_response(request, cached.body, cached.encoded, cached.headers)
+
+    def _list_response(
+        self,
+        request: Request,
+        response: Response,
+        page: Page,
+        sparse: bool,
+        validators: Dict[str, str],
+        cache_key: Optional[tuple],
+        generation: Optional[int],
+        db: Any,
+    ) -> Any:
+        serialized = sparse or self._serializes(cache_key)
+        if sparse:
+            response = self._json_response(page.items)
+        elif serialized:
+            # Validate once and dump straight to bytes rather than letting
+            # response_model validate and encode again. The bytes can also
+            # be cached, so a hit skips the query as well.
+            response = JSONBytesResponse(dump_validated(self._list_adapter, page.items))
+        self._set_page_headers(request, response, page)
+        response.headers.update(validators)
+        if cache_key is None:
+            return response if serialized else page.items
+        return self._store_response(request, cache_key, generation, response, db)
+
+    def _detail_response(
+        self,
+        request: Request,
+        response: Response,
+        entity: Any,
+        sparse: bool,
+        validators: Dict[str, str],
+        cache_key: Optional[tuple],
+        generation: Optional[int],
+        db: Any,
+    ) -> Any:
+        serialized = sparse or self._serializes(cache_key)
+        if sparse:
+            response = self._json_response(entity)
+        elif serialized:
+            response = JSONBytesResponse(dump_validated(self._item_adapter, entity))
+        response.headers.update(validators)
+        if cache_key is None:
+            return response if serialized else entity
+        return self._store_response(request, cache_key, generation, response, db)
+
+    def _validate_bulk_items(
+        self,
+        schema: Type[BaseModel],
+        items: List[Dict[str, Any]],
+        result: BulkResult,
+        with_id: bool = False,
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        """Validate each item on its own so one bad item does not reject the batch."""
+        valid = []
+        for index, item in enumerate(items):
+            entity_id = item.get('id')
+            if with_id and not isinstance(entity_id, int):
+                result.failed.append(BulkItemError(index=index, detail="Each item must have an integer 'id'"))
+                continue
+            try:
+                data = schema.model_validate(item).model_dump(exclude_unset=with_id)
+            except ValidationError as e:
+                result.failed.append(BulkItemError(
+                    index=index,
+                    id=entity_id if with_id else None,
+                    detail=e.errors(include_url=False, include_context=False),
+                ))
+                continue
+            if with_id:
+                data['id'] = entity_id
+            valid.append((index, data))
+        return valid
+
+    def _with_owner(self, data: Dict[str, Any], owner_id: Optional[int]) -> Dict[str, Any]:
+        if owner_id is not None:
+            data[self.service.owner_field] = owner_id
+        return data
+
+    @staticmethod
+    def _merge_bulk_results(validation: BulkResult, applied: BulkResult) -> BulkResult:
+        return BulkResult(
+            succeeded=sorted(applied.succeeded, key=lambda item: item.index),
+            failed=sorted(validation.failed + applied.failed, key=lambda item: item.index),
+        )
+
+    def _add_bulk_routes(self):
+        # Bulk operations are batch jobs, so they run as sync endpoints in
+        # both modes. They are registered before the "/{id}" routes.
+
+        @self.router.post("/bulk", response_model=BulkResult, dependencies=self.write_dependencies)
+        def bulk_create(
+            items: List[Dict[str, Any]] = Body(..., max_length=BULK_MAX_ITEMS),
+            chunk_size: int = Query(BULK_CHUNK_SIZE, ge=1, le=BULK_MAX_CHUNK_SIZE),
+            db: Session = Depends(get_write_db),
+            owner_id: Optional[int] = Depends(self.owner_id),
+        ):
+            validation = BulkResult()
+            valid = [
+                (index, self._with_owner(data, owner_id))
+                for index, data in self._validate_bulk_items(self.schema_create, items, validation)
+            ]
+            return self._merge_bulk_results(validation, self.service.bulk_create(db, valid, chunk_size))
+
+        @self.router.put("/bulk", response_model=BulkResult, dependencies=self.write_dependencies)
+        def bulk_update(
+            items: List[Dict[str, Any]] = Body(..., max_length=BULK_MAX_ITEMS),
+            chunk_size: int = Query(BULK_CHUNK_SIZE, ge=1, le=BULK_MAX_CHUNK_SIZE),
+            db: Session = Depends(get_write_db),
+            owner_id: Optional[int] = Depends(self.owner_id),
+        ):
+            validation = BulkResult()
+            valid = self._validate_bulk_items(self.schema_update, items, validation, with_id=True)
+            return self._merge_bulk_results(validation, self.service.bulk_update(db, valid, chunk_size, owner_id))
+
+        @self.router.delete("/bulk", response_model=BulkResult, dependencies=self.write_dependencies)
+        def bulk_delete(
+            ids: List[int] = Body(..., max_length=BULK_MAX_ITEMS),
+            chunk_size: int = Query(BULK_CHUNK_SIZE, ge=1, le=BULK_MAX_CHUNK_SIZE),
+            db: Session = Depends(get_write_db),
+            owner_id: Optional[int] = Depends(self.owner_id),
+        ):
+            return self.service.bulk_delete(db, ids, chunk_size, owner_id)
+
+    def _export_chunks(self, bind: Any, stmt: Select, format: str) -> Iterator[bytes]:
+        """Encoded export chunks. The generator runs after the request's
+        session is closed, so it reads through a session of its own."""
+        fields = list(self.schema_out.model_fields)
+        with Session(bind=bind, autoflush=False) as session:
+            if format == "csv":
+                yield csv_chunk([], fields, header=True)
+            for rows in self.service.iter_chunks(session, stmt):
+                items = self._list_adapter.validate_python(rows, from_attributes=True)
+                if format == "csv":
+                    yield csv_chunk(self._list_adapter.dump_python(items, mode="json", by_alias=True), fields)
+                else:
+                    yield ndjson_chunk(self._item_adapter, items)
+
+    def _add_export_route(self):
+        # Like the bulk routes this is a sync batch endpoint in both modes,
+        # registered before "/{id}".
+
+        @self.router.get("/export", response_class=StreamingResponse)
+        def export(
+            request: Request,
+            format: Literal["ndjson", "csv"] = "ndjson",
+            chunk_size: int = Query(EXPORT_CHUNK_SIZE, ge=1, le=EXPORT_MAX_CHUNK_SIZE),
+            db: Session = Depends(get_read_db),
+        ):
+            """Stream every row, filtered like the list endpoint, in id order."""
+            # Built here so invalid filters fail before the response starts.
+            stmt = self.service.export_statement(self._list_filters(request), chunk_size)
+            chunks = self._export_chunks(db.get_bind(), stmt, format)
+            return StreamingResponse(
+                stream_until_disconnect(request, chunks),
+                media_type=EXPORT_MEDIA_TYPES[format],
+                headers={"Content-Disposition": f'attachment; filename="{self.prefix}.{format}"'},
+            )
+
+    def _add_search_route(self):
+        # Sync in both modes like export, and registered before "/{id}".
+
+        @self.router.get("/search", response_model=List[self.schema_out])
+        def search(
+            q: str = Query(..., min_length=1, max_length=200, description="Words to match, each also as a prefix"),
+            limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+            db: Session = Depends(get_read_db),
+        ):
+            """Rows matching every word of ``q``, best match first."""
+            items = self.service.search(db, q, limit)
+            if self.fast_json:
+                return JSONBytesResponse(dump_validated(self._list_adapter, items))
+            return items
+
     def _add_routes(self):
+        if self.service.search_index is not None:
+            self._add_search_route()
+        self._add_export_route()
+        self._add_bulk_routes()
+        if self.async_mode:
+            self._add_async_routes()
+        else:
+            self._add_sync_routes()
+
+    def _add_sync_routes(self):
+        schema_create_type = cast(Type[TCreate], self.schema_create)
+        schema_update_type = cast(Type[TUpdate], self.schema_update)
+
+        @self.router.get("/", response_model=List[self.schema_out], description=LIST_DESCRIPTION)
+        def get_all(
+            request: Request,
+            response: Response,
+            limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT, description="Items per page"),
+            cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+            sort: Optional[str] = Query(None, description=f"One of {self.service.sortable_fields}, prefix with '-' for descending"),
+            include_total: bool = False,
+            fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,name"),
+            db: Session = Depends(get_read_db),
+        ):
+            cache_key, generation, cached = self._cache_lookup(request, "list")
+            if cached is not None:
+                return cached
+            field_list = self._parse_fields(fields)
+            filters = self._list_filters(request)
+            representation = {"sort": sort, "fields": field_list, "cursor": cursor, "limit": limit}
+            total = None
+            if has_conditional_get(request):
+                # Validate from the ids and versions of the page alone, so a
+                # 304 loads neither the rows nor their relationships.
+                versions = self.service.get_page_fields(db, PAGE_VERSION_FIELDS, limit, cursor, sort, filters, include_total)
+                etag = self._page_etag(versions, representation)
+                if is_not_modified(request, etag, None):
+                    return self._not_modified({"ETag": etag})
+                total = versions.total
+            count_rows = include_total and total is None
+            if field_list:
+                page = self.service.get_page_fields(
+                    db, [*field_list, *PAGE_VERSION_FIELDS], limit, cursor, sort, filters, count_rows,
+                )
+            else:
+                page = self.service.get_page(db, limit, cursor, sort, filters, count_rows)
+            page.total = page.total if total is None else total
+            validators = {"ETag": self._page_etag(page, representation)}
+            if field_list:
+                page.items = [{field: item[field] for field in field_list} for item in page.items]
+            return self._list_response(request, response, page, bool(field_list), validators, cache_key, generation, db)
+
+        @self.router.get("/{id}", response_model=self.schema_out)
+        def get_by_id(
+            request: Request,
+            response: Response,
+            id: int,
+            fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,name"),
+            db: Session = Depends(get_read_db),
+        ):
+            cache_key, generation, cached = self._cache_lookup(request, "detail", id)
+            if cached is not None:
+                return cached
+            field_list = self._parse_fields(fields)
+            entity = None
+            if field_list:
+                # The version comes with the selected columns in one query.
+                row = self.service.get_fields_by_id(db, id, self._versioned_fields(field_list))
+                version, updated_at = row['version'], row['updated_at']
+                entity = {field: row[field] for field in field_list}
+            elif has_conditional_get(request):
+                # Check the version first so a 304 skips loading the entity.
+                version, updated_at = self.service.get_version(db, id)
+            else:
+                entity = self.service.get_by_id(db, id)
+                version, updated_at = entity.version, entity.updated_at
+            validators = validator_headers(entity_etag(version, field_list), updated_at)
+            if is_not_modified(request, validators["ETag"], updated_at):
+                return self._not_modified(validators)
+            if entity is None:
+                entity = self.service.get_by_id(db, id)
+            return self._detail_response(request, response, entity, bool(field_list), validators, cache_key, generation, db)
+
+        @self.router.post(
+            "/", response_model=self.schema_out, status_code=status.HTTP_201_CREATED,
+            dependencies=self.write_dependencies,
+        )
+        def create(
+            entity_data: schema_create_type,
+            response: Response,
+            db: Session = Depends(get_write_db),
+            owner_id: Optional[int] = Depends(self.owner_id),
+        ):
+            entity = self.service.create_entity_from_data(self._with_owner(entity_data.model_dump(), owner_id))
+            created = self.service.create(db, entity)
+            return self._entity_response(created, response, status.HTTP_201_CREATED)
+
+        @self.router.put("/{id}", response_model=self.schema_out, dependencies=self.write_dependencies)
+        def update(
+            id: int,
+            entity_data: schema_update_type,
+            request: Request,
+            response: Response,
+            db: Session = Depends(get_write_db),
+            owner_id: Optional[int] = Depends(self.owner_id),
+        ):
+            entity = self.service.update(
+                db, id, entity_data.model_dump(exclude_unset=True), if_match_versions(request), owner_id
+            )
+            return self._entity_response(entity, response)
+
+        @self.router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=self.write_dependencies)
+        def delete(
+            id: int,
+            request: Request,
+            db: Session = Depends(get_write_db),
+            owner_id: Optional[int] = Depends(self.owner_id),
+        ):
+            success = self.service.delete(db, id, if_match_versions(request), owner_id)
+            if not success:
+                raise HTTPException(status_code=404, detail="Entity not found")
+            return None
+
+    def _add_async_routes(self):
         schema_create_type = cast(Type[TCreate], self.schema_create)
         schema_update_type = cast(Type[TUpdate], self.schema_update)
 
-        @self.router.get("/", response_model=List[self.schema_out])
-        def get_all(db: Session = Depends(get_db)):
-            return self.service.get_all(db)
+        @self.router.get("/", response_model=List[self.schema_out], description=LIST_DESCRIPTION)
+        async def get_all(
+            request: Request,
+            response: Response,
+            limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT, description="Items per page"),
+            cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+            sort: Optional[str] = Query(None, description=f"One of {self.service.sortable_fields}, prefix with '-' for descending"),
+            include_total: bool = False,
+            fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,name"),
+            db: AsyncSession = Depends(get_async_read_db),
+        ):
+            cache_key, generation, cached = self._cache_lookup(request, "list")
+            if cached is not None:
+                return cached
+            field_list = self._parse_fields(fields)
+            filters = self._list_filters(request)
+            representation = {"sort": sort, "fields": field_list, "cursor": cursor, "limit": limit}
+            total = None
+            if has_conditional_get(request):
+                # Validate from the ids and versions of the page alone, so a
+                # 304 loads neither the rows nor their relationships.
+                versions = await self.service.get_page_fields_async(
+                    db, PAGE_VERSION_FIELDS, limit, cursor, sort, filters, include_total,
+                )
+                etag = self._page_etag(versions, representation)
+                if is_not_modified(request, etag, None):
+                    return self._not_modified({"ETag": etag})
+                total = versions.total
+            count_rows = include_total and total is None
+            if field_list:
+                page = await self.service.get_page_fields_async(
+                    db, [*field_list, *PAGE_VERSION_FIELDS], limit, cursor, sort, filters, count_rows,
+                )
+            else:
+                page = await self.service.get_page_async(db, limit, cursor, sort, filters, count_rows)
+            page.total = page.total if total is None else total
+            validators = {"ETag": self._page_etag(page, representation)}
+            if field_list:
+                page.items = [{field: item[field] for field in field_list} for item in page.items]
+            return self._list_response(request, response, page, bool(field_list), validators, cache_key, generation, db)
 
         @self.router.get("/{id}", response_model=self.schema_out)
-        def get_by_id(id: int, db: Session = Depends(get_db)):
-            return self.service.get_by_id(db, id)
+        async def get_by_id(
+            request: Request,
+            response: Response,
+            id: int,
+            fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,name"),
+            db: AsyncSession = Depends(get_async_read_db),
+        ):
+            cache_key, generation, cached = self._cache_lookup(request, "detail", id)
+            if cached is not None:
+                return cached
+            field_list = self._parse_fields(fields)
+            entity = None
+            if field_list:
+                # The version comes with the selected columns in one query.
+                row = await self.service.get_fields_by_id_async(db, id, self._versioned_fields(field_list))
+                version, updated_at = row['version'], row['updated_at']
+                entity = {field: row[field] for field in field_list}
+            elif has_conditional_get(request):
+                # Check the version first so a 304 skips loading the entity.
+                version, updated_at = await self.service.get_version_async(db, id)
+            else:
+                entity = await self.service.get_by_id_async(db, id)
+                version, updated_at = entity.version, entity.updated_at
+            validators = validator_headers(entity_etag(version, field_list), updated_at)
+            if is_not_modified(request, validators["ETag"], updated_at):
+                return self._not_modified(validators)
+            if entity is None:
+                entity = await self.service.get_by_id_async(db, id)
+            return self._detail_response(request, response, entity, bool(field_list), validators, cache_key, generation, db)
 
-        @self.router.post("/", response_model=self.schema_out, status_code=status.HTTP_201_CREATED)
-        def create(entity_data: schema_create_type, db: Session = Depends(get_db)):
-            entity = self.service.model_class(**entity_data.model_dump())
-            return self.service.create(db, entity)
+        @self.router.post(
+            "/", response_model=self.schema_out, status_code=status.HTTP_201_CREATED,
+            dependencies=self.write_dependencies,
+        )
+        async def create(
+            entity_data: schema_create_type,
+            response: Response,
+            db: AsyncSession = Depends(get_async_write_db),
+            owner_id: Optional[int] = Depends(self.owner_id),
+        ):
+            entity = self.service.create_entity_from_data(self._with_owner(entity_data.model_dump(), owner_id))
+            created = await self.service.create_async(db, entity)
+            return self._entity_response(created, response, status.HTTP_201_CREATED)
 
-        @self.router.put("/{id}", response_model=self.schema_out)
-        def update(id: int, entity_data: schema_update_type, db: Session = Depends(get_db)):
-            return self.service.update(db, id, entity_data.model_dump(exclude_unset=True))
+        @self.router.put("/{id}", response_model=self.schema_out, dependencies=self.write_dependencies)
+        async def update(
+            id: int,
+            entity_data: schema_update_type,
+            request: Request,
+            response: Response,
+            db: AsyncSession = Depends(get_async_write_db),
+            owner_id: Optional[int] = Depends(self.owner_id),
+        ):
+            entity = await self.service.update_async(
+                db, id, entity_data.model_dump(exclude_unset=True), if_match_versions(request), owner_id
+            )
+            return self._entity_response(entity, response)
 
-        @self.router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
-        def delete(id: int, db: Session = Depends(get_db)):
-            success = self.service.delete(db, id)
+        @self.router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=self.write_dependencies)
+        async def delete(
+            id: int,
+            request: Request,
+            db: AsyncSession = Depends(get_async_write_db),
+            owner_id: Optional[int] = Depends(self.owner_id),
+        ):
+            success = await self.service.delete_async(db, id, if_match_versions(request), owner_id)
             if not success:
                 raise HTTPException(status_code=404, detail="Entity not found")
             return None
@@ -1,23 +1,28 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.services.country import CountryService
+from app.routes.responses import encoded_response, fast_response
+from app.services.conditional import is_not_modified
+from app.services.country import get_snapshot
 from app.schemas.country import CountryOut
 
 router = APIRouter(prefix="/api/countries", tags=["Countries"])
 
 
 @router.get("/", response_model=List[CountryOut])
-def get_all_countries(db: Session = Depends(get_db)):
-    country_service = CountryService(db)
-    return country_service.get_all_countries()
+def get_all_countries(request: Request, db: Session = Depends(get_db)):
+    # The session only connects if the snapshot has not been loaded yet.
+    snapshot = get_snapshot(db)
+    headers = {"ETag": snapshot.etag}
+    if is_not_modified(request, snapshot.etag, None):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return encoded_response(request, snapshot.list_json, snapshot.list_encoded, headers)
 
 
 @router.get("/{country_id}", response_model=CountryOut)
 def get_country(country_id: int, db: Session = Depends(get_db)):
-    country_service = CountryService(db)
-    country = country_service.get_country_by_id(country_id)
+    country = get_snapshot(db).by_id.get(country_id)
     if not country:
         raise HTTPException(status_code=404, detail="Country not found")
-    return country 
\ No newline at end of file
+    return fast_response(country)
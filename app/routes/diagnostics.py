@@ -0,0 +1,78 @@
+from fastapi import APIRouter
+from app.auth.dependencies import auth_status
+from app.db import replicas, session
+from app.db.pool import pool_status
+from app.services.autocomplete import autocomplete_indexes
+from app.services.cache import caches
+from app.services.compression import compression_stats
+from app.services.model_files import model_stores
+from app.services import rate_limit
+from app.services.similar_movies import similar_movies_index
+from app.services.passwords import password_pool
+
+router = APIRouter(prefix="/api/diagnostics", tags=["Diagnostics"])
+
+
+@router.get("/pool")
+def get_pool_status():
+    """Connection pool occupancy and acquire-wait histogram per engine."""
+    engines = {"primary": pool_status(session.engine)}
+    if session.async_engine is not None:
+        engines["async"] = pool_status(session.async_engine.sync_engine)
+    if replicas.replica_set is not None:
+        for index, replica_engine in enumerate(replicas.replica_set.engines):
+            engines[f"replica_{index}"] = {
+                **pool_status(replica_engine),
+                "down": replicas.replica_set.is_down(index),
+            }
+    return engines
+
+
+@router.get("/cache")
+def get_cache_status():
+    """Size, hit ratio and eviction counters of each response cache."""
+    return {name: cache.stats() for name, cache in caches.items()}
+
+
+@router.get("/compression")
+def get_compression_status():
+    """Bytes saved and CPU spent on response compression per route."""
+    return compression_stats.snapshot()
+
+
+@router.get("/passwords")
+def get_password_pool_status():
+    """Queue depth and rejections of the password hashing pool."""
+    return password_pool.stats()
+
+
+@router.get("/auth")
+def get_auth_status():
+    """Token and user cache counters and bearer-token verification latency."""
+    return auth_status()
+
+
+@router.get("/rate_limit")
+def get_rate_limit_status():
+    """Login limiter settings, rejections and sketch memory."""
+    if rate_limit.login_limiter is None:
+        return {"enabled": False}
+    return {"enabled": True, **rate_limit.login_limiter.stats()}
+
+
+@router.get("/autocomplete")
+def get_autocomplete_status():
+    """Size, cached prefixes and rebuild counters of each autocomplete index."""
+    return {name: index.stats() for name, index in autocomplete_indexes.items()}
+
+
+@router.get("/models")
+def get_model_status():
+    """Version and build summary of each served model file."""
+    return {kind: store.stats() for kind, store in model_stores.items()}
+
+
+@router.get("/similar_movies")
+def get_similar_movies_status():
+    """Size, patched movies and rebuild counters of the similar-movies index."""
+    return similar_movies_index.stats()
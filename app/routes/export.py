@@ -0,0 +1,52 @@
+import csv
+import io
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+import anyio
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+
+from app.routes.responses import dumps
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def ndjson_chunk(adapter: TypeAdapter, items: List[Any]) -> bytes:
+    return b"".join(adapter.dump_json(item, by_alias=True) + b"\n" for item in items)
+
+
+def csv_chunk(rows: List[Dict[str, Any]], fields: List[str], header: bool = False) -> bytes:
+    """CSV lines for ``rows``. Nested values (lists, objects) are written as JSON."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(fields)
+    for row in rows:
+        writer.writerow([
+            dumps(row[field]).decode() if isinstance(row[field], (list, dict)) else row[field]
+            for field in fields
+        ])
+    return buffer.getvalue().encode()
+
+
+async def stream_until_disconnect(request: Request, chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """Pull ``chunks`` (blocking database work) in the thread pool and stop
+    fetching as soon as the client goes away.
+
+    The response may also be cancelled from outside when Starlette notices
+    the disconnect first; closing the iterator is shielded from that, so the
+    cursor and session are released either way.
+    """
+    try:
+        while not await request.is_disconnected():
+            chunk = await run_in_threadpool(next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        with anyio.CancelScope(shield=True):
+            await run_in_threadpool(chunks.close)
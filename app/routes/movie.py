@@ -0,0 +1,46 @@
+from typing import List
+
+from fastapi import Depends, HTTPException, Query
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.schemas.movie import MovieCreate, MovieUpdate, MovieOut
+from app.schemas.recommendation import SimilarMovieOut
+from app.services.movie import MovieService
+from app.services.similar_movies import SIMILAR_MOVIES_NEIGHBORS, similar_movies_index
+from app.routes.base_routes import BaseRouter
+from app.routes.responses import JSONBytesResponse, dump_validated
+
+movie_service = MovieService()
+
+router = BaseRouter(
+    service=movie_service,
+    schema_create=MovieCreate,
+    schema_update=MovieUpdate,
+    schema_out=MovieOut,
+    prefix="movies",
+    tags=["Movies"]
+).router
+
+similar_adapter = TypeAdapter(List[SimilarMovieOut])
+
+
+@router.get("/{movie_id}/similar", response_model=List[SimilarMovieOut])
+def get_similar_movies(
+    movie_id: int,
+    limit: int = Query(10, ge=1, le=SIMILAR_MOVIES_NEIGHBORS),
+    # The primary, so movies re-encoded after a write are never a replica behind.
+    db: Session = Depends(get_db),
+):
+    """Movies sharing the most genres, people and countries with this one,
+    weighted by how rare they are. Works for movies without reviews."""
+    similar_movies_index.ensure_current(db)
+    if not similar_movies_index.ready:
+        raise HTTPException(status_code=503, detail="Similar movies are not available yet")
+    similar = similar_movies_index.similar(movie_id, limit)
+    if similar is None:
+        raise HTTPException(status_code=404, detail="Movie not found")
+    movies = movie_service.get_by_ids(db, [id for id, _ in similar])
+    return JSONBytesResponse(dump_validated(similar_adapter, [
+        {"movie": movies[id], "score": score} for id, score in similar if id in movies
+    ]))
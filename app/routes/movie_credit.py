@@ -0,0 +1,14 @@
+from app.schemas.movie_credit import MovieCreditCreate, MovieCreditUpdate, MovieCreditOut
+from app.services.movie_credit import MovieCreditService
+from app.routes.base_routes import BaseRouter
+
+movie_credit_service = MovieCreditService()
+
+router = BaseRouter(
+    service=movie_credit_service,
+    schema_create=MovieCreditCreate,
+    schema_update=MovieCreditUpdate,
+    schema_out=MovieCreditOut,
+    prefix="movie_credits",
+    tags=["MovieCredits"]
+).router
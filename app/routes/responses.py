@@ -0,0 +1,84 @@
+import os
+from typing import Any, Dict, Mapping, Optional
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_json, to_jsonable_python
+from dotenv import load_dotenv
+
+from app.services.compression import compression_stats, negotiate, route_label
+from app.services.conditional import encoded_etag
+
+try:
+    import orjson
+except ImportError:  # optional, pydantic_core is used instead
+    orjson = None
+
+load_dotenv()
+
+# Serialize responses to bytes in the route instead of returning objects for
+# FastAPI to validate against response_model and encode again.
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "false").lower() in ("1", "true", "yes")
+
+# Matches pydantic_core's output: UTC as "Z", non-string keys as strings.
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson is not None else None
+
+
+def dumps(content: Any) -> bytes:
+    """JSON bytes for plain data such as dicts and lists, via orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(content, default=to_jsonable_python, option=ORJSON_OPTIONS)
+    return to_json(content)
+
+
+def dump_validated(adapter: TypeAdapter, content: Any) -> bytes:
+    """Validate ORM objects into the adapter's schema once and dump them to bytes."""
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True), by_alias=True)
+
+
+class JSONBytesResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content, by_alias=True)
+        return dumps(content)
+
+
+def fast_response(
+    content: Any,
+    status_code: int = status.HTTP_200_OK,
+    headers: Optional[dict] = None,
+    enabled: Optional[bool] = None,
+) -> Any:
+    """``content`` as a ready JSONBytesResponse in fast mode, else unchanged
+    for response_model to handle. Pydantic models are dumped as they are,
+    without being validated a second time."""
+    if not (FAST_JSON_RESPONSES if enabled is None else enabled):
+        return content
+    return JSONBytesResponse(content, status_code=status_code, headers=headers)
+
+
+def encoded_response(
+    request: Request,
+    body: bytes,
+    encoded: Mapping[str, bytes],
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """``body``, or its precompressed variant in a coding the client accepts.
+
+    The compression middleware leaves responses with a Content-Encoding
+    alone, so a stored payload is never compressed again.
+    """
+    headers = dict(headers or {})
+    encoding = negotiate(request.headers.get("accept-encoding"))
+    if encoding not in encoded:
+        return Response(content=body, media_type="application/json", headers=headers)
+    compressed = encoded[encoding]
+    compression_stats.record(route_label(request.scope), len(body), len(compressed), precompressed=True)
+    headers.update({"Content-Encoding": encoding, "Vary": "Accept-Encoding"})
+    if "ETag" in headers:
+        headers["ETag"] = encoded_etag(headers["ETag"], encoding)
+    return Response(content=compressed, media_type="application/json", headers=headers)
@@ -0,0 +1,14 @@
+from app.schemas.review import ReviewCreate, ReviewUpdate, ReviewOut
+from app.services.review import ReviewService
+from app.routes.base_routes import BaseRouter
+
+review_service = ReviewService()
+
+router = BaseRouter(
+    service=review_service,
+    schema_create=ReviewCreate,
+    schema_update=ReviewUpdate,
+    schema_out=ReviewOut,
+    prefix="reviews",
+    tags=["Reviews"]
+).router
@@ -1,10 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
+from app.schemas.recommendation import RecommendationOut
 from app.schemas.user import UserCreate, UserLogin
-from app.services.user import create_user, authenticate_user, get_user_by_id, get_user_by_email
+from app.services.user import create_user_async, authenticate_user_async, get_user_by_id
 from app.models.user import User
 from app.db.session import get_db
+from app.db.replicas import get_read_db
+from app.auth.dependencies import AuthenticatedUser, require_user
 from app.auth.jwt import create_access_token
+from app.routes.responses import JSONBytesResponse, dump_validated, fast_response
+from app.services import rate_limit
+from app.services.recommendations import RECOMMENDATIONS_MAX_LIMIT, item_cf_models, recommend_movies
 from datetime import timedelta
 from dotenv import load_dotenv
 import os
@@ -13,6 +22,8 @@ load_dotenv()
 
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
+recommendations_adapter = TypeAdapter(List[RecommendationOut])
+
 router = APIRouter(
     prefix="/api/users",
     tags=["users"],
@@ -33,22 +44,16 @@ def create_token_response(user: User, expires_delta: timedelta | None = None):
     }
 
 
+# Registration and login are async so that bcrypt runs on the password pool
+# without also holding a request thread while it waits.
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
-def create_new_user(user: UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(
-        (User.username == user.username) | (User.email == user.email)
-    ).first()
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username or email already registered"
-        )
-    new_user = create_user(db, user)
-    return {
+async def create_new_user(user: UserCreate, db: Session = Depends(get_db)):
+    new_user = await create_user_async(db, user)
+    return fast_response({
         "id": new_user.id,
         "username": new_user.username,
         "email": new_user.email,
-    }
+    }, status_code=status.HTTP_201_CREATED)
 
 
 @router.get("/{user_id}", response_model=dict)
@@ -59,30 +64,53 @@ def get_user(user_id: int, db: Session = Depends(get_db)):
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return {
+    return fast_response({
         "id": user.id,
         "username": user.username,
         "email": user.email,
-    }
+    })
 
 
-@router.post("/register")
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(
-        (User.username == user.username) | (User.email == user.email)
-    ).first()
-    if existing_user:
+@router.get("/{user_id}/recommendations", response_model=List[RecommendationOut])
+def get_recommendations(
+    user_id: int,
+    limit: int = Query(20, ge=1, le=RECOMMENDATIONS_MAX_LIMIT),
+    db: Session = Depends(get_read_db),
+    current_user: AuthenticatedUser = Depends(require_user),
+):
+    """Movies the user has not reviewed, ranked by the item-item model built
+    with ``python -m app.services.recommendations``. Reveals what the user
+    reviewed, so only they may ask."""
+    if user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not allowed to read another user's recommendations"
+        )
+    model = item_cf_models.current()
+    if model is None:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username or email already registered"
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Recommendations are not available yet"
         )
-    new_user = create_user(db, user)
-    return create_token_response(new_user)
+    recommendations = recommend_movies(db, model, user_id, limit)
+    return JSONBytesResponse(dump_validated(recommendations_adapter, [
+        {"movie": movie, "score": score} for movie, score in recommendations
+    ]))
+
+
+@router.post("/register")
+async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+    new_user = await create_user_async(db, user)
+    return fast_response(create_token_response(new_user))
 
 
 @router.post("/login")
-def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
-    user = authenticate_user(db, user_credentials.identifier, user_credentials.password)
+async def login(user_credentials: UserLogin, request: Request, db: Session = Depends(get_db)):
+    # Rejected before the user lookup and the bcrypt verify it would trigger.
+    if rate_limit.login_limiter is not None:
+        client_ip = request.client.host if request.client else None
+        rate_limit.login_limiter.check(client_ip, user_credentials.identifier)
+    user = await authenticate_user_async(db, user_credentials.identifier, user_credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -90,4 +118,4 @@ def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    return create_token_response(user, expires_delta=expires)
+    return fast_response(create_token_response(user, expires_delta=expires))
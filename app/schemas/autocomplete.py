@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class SuggestionOut(BaseModel):
+    id: int
+    label: str
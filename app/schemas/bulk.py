@@ -0,0 +1,18 @@
+from typing import Any, List, Optional
+from pydantic import BaseModel, Field
+
+
+class BulkItemResult(BaseModel):
+    index: int = Field(..., description="Position of the item in the request body")
+    id: Optional[int] = None
+
+
+class BulkItemError(BaseModel):
+    index: int = Field(..., description="Position of the item in the request body")
+    id: Optional[int] = None
+    detail: Any
+
+
+class BulkResult(BaseModel):
+    succeeded: List[BulkItemResult] = Field(default_factory=list)
+    failed: List[BulkItemError] = Field(default_factory=list)
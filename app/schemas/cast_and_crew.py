@@ -44,7 +44,14 @@ class CastAndCrewCreate(CastAndCrewBase):
     pass
 
 class CastAndCrewUpdate(CastAndCrewBase):
-    pass
+    add_country_ids: Optional[List[int]] = Field(default=None, description="Country IDs to link, keeping the existing ones")
+    remove_country_ids: Optional[List[int]] = Field(default=None, description="Country IDs to unlink")
+
+    @field_validator('add_country_ids', 'remove_country_ids', mode='before')
+    def validate_country_id_changes(cls, v):
+        if isinstance(v, list):
+            return [int(country_id) for country_id in v if country_id is not None]
+        return v
 
 class CastAndCrewOut(CastAndCrewBase):
     id: int
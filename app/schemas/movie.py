@@ -0,0 +1,49 @@
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from .genre import GenreOut
+
+
+class MovieBase(BaseModel):
+    title: str = Field(..., min_length=1, max_length=256)
+    original_title: Optional[str] = Field(default=None, max_length=256)
+    release_date: Optional[date] = Field(default=None, description="Release date in YYYY-MM-DD format")
+    runtime_minutes: Optional[int] = Field(default=None, ge=1)
+    description: Optional[str] = Field(default=None)
+    poster_url: Optional[str] = Field(default=None, description="Public URL to a poster image")
+    genre_ids: Optional[List[int]] = Field(default=None, description="List of genre IDs")
+
+    @field_validator('original_title', 'description', mode='before')
+    def empty_str_to_none(cls, v):
+        if v is None or (isinstance(v, str) and v.strip() == ''):
+            return None
+        return v
+
+    @field_validator('poster_url', mode='before')
+    def validate_poster_url(cls, v):
+        if v is None or (isinstance(v, str) and v.strip() == ''):
+            return None
+        if isinstance(v, str) and not v.startswith(('http://', 'https://')):
+            raise ValueError('URL must start with http:// or https://')
+        return v.strip()
+
+
+class MovieCreate(MovieBase):
+    pass
+
+
+class MovieUpdate(MovieBase):
+    title: Optional[str] = Field(default=None, min_length=1, max_length=256)
+    add_genre_ids: Optional[List[int]] = Field(default=None, description="Genre IDs to link, keeping the existing ones")
+    remove_genre_ids: Optional[List[int]] = Field(default=None, description="Genre IDs to unlink")
+
+
+class MovieOut(MovieBase):
+    id: int
+    genres: List[GenreOut] = Field(default_factory=list)
+    # Read-only, maintained from the movie's reviews.
+    rating_count: int = 0
+    rating_sum: int = 0
+    rating_mean: Optional[float] = None
+    rating_histogram: List[int] = Field(default_factory=list, description="Number of reviews per rating, 1 star first")
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,22 @@
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class MovieCreditBase(BaseModel):
+    character_name: Optional[str] = Field(default=None, max_length=256, description="For acting credits")
+    billing_order: Optional[int] = Field(default=None, ge=0)
+
+
+class MovieCreditCreate(MovieCreditBase):
+    movie_id: int
+    cast_and_crew_id: int
+    position_id: int
+
+
+class MovieCreditUpdate(MovieCreditBase):
+    position_id: Optional[int] = None
+
+
+class MovieCreditOut(MovieCreditCreate):
+    id: int
+    model_config = ConfigDict(from_attributes=True)
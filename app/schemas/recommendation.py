@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+
+from .movie import MovieOut
+
+
+class RecommendationOut(BaseModel):
+    movie: MovieOut
+    score: float = Field(..., description="Summed similarity to the user's reviewed movies, weighted by their ratings")
+
+
+class SimilarMovieOut(BaseModel):
+    movie: MovieOut
+    score: float = Field(..., description="Cosine similarity of the movies' genre, cast and crew, and country tokens")
@@ -0,0 +1,30 @@
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+MIN_RATING = 1
+MAX_RATING = 5
+
+
+class ReviewBase(BaseModel):
+    rating: int = Field(..., ge=MIN_RATING, le=MAX_RATING, description="Whole stars")
+    title: Optional[str] = Field(default=None, max_length=256)
+    body: Optional[str] = Field(default=None)
+
+
+class ReviewCreate(ReviewBase):
+    # The author is the authenticated user, never the request body.
+    movie_id: int
+
+
+class ReviewUpdate(BaseModel):
+    # A review stays with its movie; only its content changes.
+    rating: Optional[int] = Field(default=None, ge=MIN_RATING, le=MAX_RATING)
+    title: Optional[str] = Field(default=None, max_length=256)
+    body: Optional[str] = Field(default=None)
+
+
+class ReviewOut(ReviewBase):
+    id: int
+    movie_id: int
+    user_id: Optional[int] = None
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,356 @@
+import heapq
+import os
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import Select, literal, select
+from sqlalchemy.orm import Session
+
+load_dotenv()
+
+# Prefixes matching more keys than this keep their best suggestions cached,
+# so one- and two-letter prefixes over large tables stay cheap.
+AUTOCOMPLETE_CACHED_RANGE = int(os.getenv("AUTOCOMPLETE_CACHED_RANGE", "256"))
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+# Every index registers itself here, keyed by the kind in its URL.
+autocomplete_indexes: Dict[str, "AutocompleteIndex"] = {}
+
+# Sorts after any folded text, so [prefix, prefix + END) is the prefix range.
+END = "\U0010ffff"
+
+
+def fold(text: str) -> str:
+    """Lowercase ``text``, strip accents and reduce punctuation and runs of
+    whitespace to single spaces: "Méliès, Georges" becomes "melies georges"."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(re.sub(r"[\W_]+", " ", stripped.casefold()).split())
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    id: int
+    label: str
+    popularity: int
+    keys: Tuple[str, ...]
+    # Sort key: most popular first, then alphabetical.
+    rank: Tuple[int, str, int]
+
+
+class AutocompleteSource:
+    """Which rows of a table become suggestions and how they are labelled.
+
+    Rows are read as ``(id, popularity, *columns)``. By default the label is
+    the first non-empty column and every non-empty column is matched;
+    subclasses override ``label`` and ``texts`` for anything else.
+
+    When ``popularity`` counts rows of another table, ``counted`` is their
+    foreign key to ``model``, so writes to them can re-rank the row.
+    """
+
+    def __init__(
+        self,
+        model: type,
+        columns: Sequence[Any],
+        popularity: Optional[Any] = None,
+        counted: Optional[Any] = None,
+    ):
+        self.model = model
+        self.columns = list(columns)
+        self.popularity = popularity
+        self.counted = counted
+
+    def statement(self) -> Select:
+        popularity = self.popularity if self.popularity is not None else literal(0)
+        return select(self.model.id, popularity.label("popularity"), *self.columns)
+
+    def owners(self, ids: Iterable[int]) -> Select:
+        """Ids of the rows the ``counted`` rows ``ids`` point at."""
+        return select(self.counted).where(self.counted.table.c.id.in_(list(ids)))
+
+    def texts(self, row: Any) -> List[str]:
+        return [value for value in row[2:] if value]
+
+    def label(self, row: Any) -> str:
+        texts = self.texts(row)
+        return texts[0] if texts else ""
+
+    def suggestion(self, row: Any) -> Optional[Suggestion]:
+        label = self.label(row)
+        if not label:
+            return None
+        keys = set()
+        for text in [label, *self.texts(row)]:
+            # Every word starts a key, so "Streep" finds "Meryl Streep".
+            words = fold(text).split(" ")
+            keys.update(" ".join(words[start:]) for start in range(len(words)))
+        keys.discard("")
+        popularity = int(row.popularity or 0)
+        return Suggestion(row.id, label, popularity, tuple(sorted(keys)), (-popularity, fold(label), row.id))
+
+
+class PrefixKeys:
+    """Sorted (key, id) pairs, for prefix ranges by ``bisect``.
+
+    Stored as parallel key and id lists cut into buckets of up to twice
+    ``BUCKET_SIZE``, so an insert or delete shifts one short list instead
+    of every key in the index.
+    """
+
+    BUCKET_SIZE = 1024
+
+    def __init__(self, pairs: Sequence[Tuple[str, int]] = ()):
+        starts = range(0, len(pairs), self.BUCKET_SIZE)
+        self._keys = [[key for key, _ in pairs[start:start + self.BUCKET_SIZE]] for start in starts]
+        self._ids = [[id for _, id in pairs[start:start + self.BUCKET_SIZE]] for start in starts]
+        self._firsts = [keys[0] for keys in self._keys]
+        self._length = len(pairs)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _bucket(self, key: str) -> int:
+        # The last bucket starting below ``key``: equal keys may begin at
+        # its end and run on into the next buckets.
+        return max(bisect_left(self._firsts, key) - 1, 0)
+
+    def add(self, key: str, id: int) -> None:
+        self._length += 1
+        if not self._keys:
+            self._keys, self._ids, self._firsts = [[key]], [[id]], [key]
+            return
+        bucket = self._bucket(key)
+        keys, ids = self._keys[bucket], self._ids[bucket]
+        position = bisect_left(keys, key)
+        keys.insert(position, key)
+        ids.insert(position, id)
+        self._firsts[bucket] = keys[0]
+        if len(keys) > 2 * self.BUCKET_SIZE:
+            half = self.BUCKET_SIZE
+            self._keys[bucket:bucket + 1] = [keys[:half], keys[half:]]
+            self._ids[bucket:bucket + 1] = [ids[:half], ids[half:]]
+            self._firsts[bucket:bucket + 1] = [keys[0], keys[half]]
+
+    def remove(self, key: str, id: int) -> None:
+        bucket = self._bucket(key)
+        position = bisect_left(self._keys[bucket], key)
+        while position == len(self._ids[bucket]) or self._ids[bucket][position] != id:
+            if position == len(self._ids[bucket]):
+                bucket, position = bucket + 1, 0
+            else:
+                position += 1
+        keys, ids = self._keys[bucket], self._ids[bucket]
+        del keys[position], ids[position]
+        self._length -= 1
+        if keys:
+            self._firsts[bucket] = keys[0]
+        else:
+            del self._keys[bucket], self._ids[bucket], self._firsts[bucket]
+
+    def _spans(self, prefix: str) -> Iterator[Tuple[List[int], int, int]]:
+        if not self._keys:
+            return
+        end = prefix + END
+        bucket = self._bucket(prefix)
+        start = bisect_left(self._keys[bucket], prefix)
+        for keys, ids in zip(self._keys[bucket:], self._ids[bucket:]):
+            stop = bisect_left(keys, end, lo=start)
+            yield ids, start, stop
+            if stop < len(keys):
+                return
+            start = 0
+
+    def count(self, prefix: str) -> int:
+        return sum(stop - start for _, start, stop in self._spans(prefix))
+
+    def ids(self, prefix: str) -> Set[int]:
+        """Ids with a key starting with ``prefix``."""
+        return {id for ids, start, stop in self._spans(prefix) for id in ids[start:stop]}
+
+
+class AutocompleteIndex:
+    """Prefix index over one table, answering from memory.
+
+    Folded keys are kept sorted in ``PrefixKeys``, so a prefix is a
+    ``bisect`` range. The best ``AUTOCOMPLETE_MAX_LIMIT`` ids of ranges
+    wider than ``AUTOCOMPLETE_CACHED_RANGE`` are cached per prefix, and kept
+    exact as entries come and go.
+
+    The index is built by the first lookup. Afterwards service writes only
+    mark the written ids stale (``mark_stale`` is a write listener), and the
+    next lookup reloads just those rows: one ``WHERE id IN`` query, then a
+    few bucket insertions. Lookups with nothing stale never use the session.
+
+    Marks made while a build reads its rows are kept and replayed right
+    after it, since the rows may predate those writes.
+    """
+
+    def __init__(self, name: str, source: AutocompleteSource):
+        self.name = name
+        self.source = source
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loading = False
+        # Bumped by ``invalidate``, so a build that read its rows before an
+        # invalidation does not count as current.
+        self._generation = 0
+        self._clear_state()
+        self.builds = 0
+        self.refreshes = 0
+
+    def _clear_state(self) -> None:
+        self._loaded = False
+        self._keys = PrefixKeys()
+        self._entries: Dict[int, Suggestion] = {}
+        self._top: Dict[str, List[int]] = {}
+        self._stale: Set[int] = set()
+        self._stale_counted: Set[int] = set()
+
+    def mark_stale(self, action: str, ids: List[int]) -> None:
+        with self._lock:
+            if self._loaded or self._loading:
+                self._stale.update(ids)
+
+    def mark_counted_stale(self, action: str, ids: List[int]) -> None:
+        """Write listener for the ``counted`` rows of the source. A new one
+        re-ranks the row it points at; an updated or deleted one may have
+        left a row that can no longer be looked up, so it rebuilds."""
+        if action != 'create':
+            self.invalidate()
+            return
+        with self._lock:
+            if self._loaded or self._loading:
+                self._stale_counted.update(ids)
+
+    def invalidate(self) -> None:
+        """Rebuild the whole index on the next lookup."""
+        with self._lock:
+            self._loaded = False
+            self._generation += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear_state()
+            self._generation += 1
+
+    def ensure_current(self, db: Session) -> None:
+        """Build the index, then reload the rows written since the last lookup."""
+        if self._loaded and not self._stale and not self._stale_counted:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                with self._lock:
+                    generation = self._generation
+                    self._loading = True
+                    self._stale, self._stale_counted = set(), set()
+                try:
+                    self.load(db.execute(self.source.statement()), generation)
+                finally:
+                    with self._lock:
+                        self._loading = False
+            if self._loaded and (self._stale or self._stale_counted):
+                with self._lock:
+                    ids, self._stale = self._stale, set()
+                    counted, self._stale_counted = self._stale_counted, set()
+                if counted:
+                    ids |= set(db.scalars(self.source.owners(counted)))
+                rows = db.execute(self.source.statement().where(self.source.model.id.in_(ids)))
+                self.apply(ids, rows)
+
+    def load(self, rows: Iterable[Any], generation: Optional[int] = None) -> None:
+        """Replace the index with ``rows``. Stale marks are kept.
+
+        ``generation`` is the one the rows were read in; if the index was
+        invalidated since, the next lookup builds it again.
+        """
+        entries = {}
+        for row in rows:
+            suggestion = self.source.suggestion(row)
+            if suggestion is not None:
+                entries[suggestion.id] = suggestion
+        keys = PrefixKeys(sorted((key, id) for id, suggestion in entries.items() for key in suggestion.keys))
+        with self._lock:
+            stale, stale_counted = self._stale, self._stale_counted
+            self._clear_state()
+            self._entries = entries
+            self._keys = keys
+            self._stale, self._stale_counted = stale, stale_counted
+            self._loaded = generation is None or generation == self._generation
+            self.builds += 1
+
+    def apply(self, ids: Iterable[int], rows: Iterable[Any]) -> None:
+        """Replace the entries of ``ids`` with ``rows``; ids without a row
+        were deleted."""
+        suggestions = [suggestion for suggestion in map(self.source.suggestion, rows) if suggestion is not None]
+        with self._lock:
+            for id in ids:
+                self._remove(id)
+            for suggestion in suggestions:
+                self._add(suggestion)
+            self.refreshes += 1
+
+    def _cached_prefixes(self, keys: Iterable[str]) -> Set[str]:
+        return {key[:length] for key in keys for length in range(1, len(key) + 1) if key[:length] in self._top}
+
+    def _remove(self, id: int) -> None:
+        suggestion = self._entries.pop(id, None)
+        if suggestion is None:
+            return
+        for key in suggestion.keys:
+            self._keys.remove(key, id)
+        # A cached ranking that lost a member is recomputed on demand.
+        for prefix in self._cached_prefixes(suggestion.keys):
+            if id in self._top[prefix]:
+                del self._top[prefix]
+
+    def _add(self, suggestion: Suggestion) -> None:
+        self._entries[suggestion.id] = suggestion
+        for key in suggestion.keys:
+            self._keys.add(key, suggestion.id)
+        for prefix in self._cached_prefixes(suggestion.keys):
+            top = self._top[prefix]
+            if len(top) < AUTOCOMPLETE_MAX_LIMIT or suggestion.rank < self._entries[top[-1]].rank:
+                insort(top, suggestion.id, key=lambda id: self._entries[id].rank)
+                del top[AUTOCOMPLETE_MAX_LIMIT:]
+
+    def _best(self, prefix: str, limit: int) -> List[int]:
+        entries = self._entries
+        return heapq.nsmallest(limit, self._keys.ids(prefix), key=lambda id: entries[id].rank)
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Suggestion]:
+        """Up to ``limit`` suggestions with a word starting with ``prefix``,
+        most popular first."""
+        folded = fold(prefix)
+        if not folded:
+            return []
+        with self._lock:
+            top = self._top.get(folded)
+            if top is None:
+                if self._keys.count(folded) <= AUTOCOMPLETE_CACHED_RANGE:
+                    return [self._entries[id] for id in self._best(folded, limit)]
+                top = self._top[folded] = self._best(folded, AUTOCOMPLETE_MAX_LIMIT)
+            return [self._entries[id] for id in top[:limit]]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "entries": len(self._entries),
+                "keys": len(self._keys),
+                "cached_prefixes": len(self._top),
+                "stale": len(self._stale) + len(self._stale_counted),
+                "builds": self.builds,
+                "refreshes": self.refreshes,
+            }
+
+
+def autocomplete_index(name: str, source: AutocompleteSource) -> AutocompleteIndex:
+    index = autocomplete_indexes[name] = AutocompleteIndex(name, source)
+    return index
+
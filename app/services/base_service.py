@@ -1,26 +1,316 @@
+import os
+from datetime import datetime
 from abc import ABC
-from typing import TypeVar, Generic, Type, List, Dict, Any, Optional
-from sqlalchemy.orm import Session
+from typing import TypeVar, Generic, Type, List, Dict, Any, Iterator, Optional, Set, Tuple, Callable
+from sqlalchemy import bindparam, delete, func, insert, inspect, literal, select, tuple_, update, Select, Table
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload, subqueryload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
-from app.models.base_entity import BaseEntity
+from app.db.search import FullTextSearch
+from app.db.session import commit_keeping_state
+from app.models.base_entity import BaseEntity, utcnow
+from app.services.autocomplete import AutocompleteIndex
+from app.schemas.bulk import BulkResult, BulkItemResult, BulkItemError
+from app.services.cache import ResponseCache
+from app.services.conditional import precondition_failed
+from app.services.pagination import Page, parse_sort, encode_cursor, decode_cursor, coerce_value
 
 T = TypeVar('T', bound=BaseEntity)
 
+# Called with the action ('create', 'update' or 'delete') and the affected ids
+# after a write has been committed.
+WriteListener = Callable[[str, List[int]], None]
+
+LOAD_STRATEGIES = {
+    'selectin': selectinload,
+    'joined': joinedload,
+    'subquery': subqueryload,
+    'raise': raiseload,
+}
+
 class BaseService:
     def __init__(self, db: Session):
         self.db = db
 
 class BaseEntityService(Generic[T], ABC):
-    def __init__(self, model_class: Type[T], relationships: Optional[Dict[str, Dict[str, Any]]] = None):
+    # When set, any relationship the service did not declare a load strategy
+    # for raises on access instead of lazily emitting a query. Tests turn it on.
+    raise_on_lazy_load = os.getenv("DB_RAISE_ON_LAZY_LOAD", "false").lower() in ("1", "true", "yes")
+
+    def __init__(
+        self,
+        model_class: Type[T],
+        relationships: Optional[Dict[str, Dict[str, Any]]] = None,
+        sortable_fields: Optional[List[str]] = None,
+        filterable_fields: Optional[List[str]] = None,
+        cache: Optional[ResponseCache] = None,
+        search: Optional[FullTextSearch] = None,
+        autocomplete: Optional[AutocompleteIndex] = None,
+        dependents: Optional[List[Any]] = None,
+        owner_field: Optional[str] = None,
+    ):
         self.model_class = model_class
+        # Each relationship config may declare 'load': one of LOAD_STRATEGIES,
+        # selectin by default. List and detail queries apply it. Updates also
+        # accept 'add_field_name' / 'remove_field_name' (add_<field_name> and
+        # remove_<field_name> by default) to change links incrementally.
         self.relationships = relationships or {}
-        
+        for rel_name, rel_config in self.relationships.items():
+            if rel_config.setdefault('load', 'selectin') not in LOAD_STRATEGIES:
+                raise ValueError(f"Unknown load strategy '{rel_config['load']}' for relationship '{rel_name}'")
+            rel_config.setdefault('add_field_name', f"add_{rel_config['field_name']}")
+            rel_config.setdefault('remove_field_name', f"remove_{rel_config['field_name']}")
+        # The first sortable field is the default order. Every sortable
+        # field should be backed by an index on (field, id).
+        self.sortable_fields = sortable_fields or ['id']
+        self.filterable_fields = filterable_fields or []
+        # Serialized list and detail responses, see BaseRouter. Every
+        # committed write through the service invalidates it.
+        self.cache = cache
+        # Full-text index of the table; BaseRouter adds GET /search when set.
+        self.search_index = search
+        # Foreign key columns of child rows that are deleted with the entity.
+        self.dependents = dependents or []
+        # Column holding the id of the user a row belongs to. Writes given an
+        # ``owner_id`` only see that user's rows; others' are not found.
+        self.owner_field = owner_field
+        self._write_listeners: List[WriteListener] = []
+        if cache is not None:
+            self.add_write_listener(lambda action, ids: cache.invalidate(ids))
+        # In-memory prefix index of the table, see GET /api/autocomplete.
+        if autocomplete is not None:
+            self.add_write_listener(autocomplete.mark_stale)
+
+    def add_write_listener(self, listener: WriteListener) -> None:
+        self._write_listeners.append(listener)
+
+    def _notify_write(self, action: str, ids: List[int]) -> None:
+        if not ids:
+            return
+        for listener in self._write_listeners:
+            listener(action, ids)
+
+    def _relationship_load_options(self) -> list:
+        options = [
+            LOAD_STRATEGIES[rel_config['load']](getattr(self.model_class, rel_config['relationship_attr']))
+            for rel_config in self.relationships.values()
+        ]
+        if self.raise_on_lazy_load:
+            options.append(raiseload('*'))
+        return options
+
+    def _select(self) -> Select:
+        return select(self.model_class).options(*self._relationship_load_options())
+
     def get_all(self, db: Session) -> List[T]:
-        return db.query(self.model_class).all()
+        return list(db.scalars(self._select()).unique().all())
+
+    def _filtered_statement(self, filters: Optional[Dict[str, List[Any]]], columns: Optional[List[Any]] = None) -> Select:
+        stmt = select(*columns) if columns else self._select()
+        for field, values in (filters or {}).items():
+            if field not in self.filterable_fields:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Cannot filter by '{field}'"
+                )
+            column = getattr(self.model_class, field)
+            values = [coerce_value(column, value) for value in values]
+            stmt = stmt.where(column == values[0] if len(values) == 1 else column.in_(values))
+        return stmt
+
+    def _page_statements(
+        self,
+        limit: int,
+        cursor: Optional[str],
+        sort: Optional[str],
+        filters: Optional[Dict[str, List[Any]]],
+        columns: Optional[List[Any]] = None,
+    ) -> List[Select]:
+        """Keyset queries ordered by (sort column, id), to be read in turn
+        until the page is full.
+
+        Continuing after a cursor is a range condition on the same key, so a
+        deep page reads as few index entries as the first one. NULLs of
+        nullable columns sort after all values in ascending order and before
+        them in descending order. Dialects disagree on where an index keeps
+        its NULLs, and an ORDER BY or OR that mixes both kinds of rows makes
+        the database sort the rest of the table, so the values and the NULL
+        block are separate range scans on the (column, id) index.
+        """
+        field, descending = parse_sort(sort, self.sortable_fields)
+        column = getattr(self.model_class, field)
+        id_column = self.model_class.id
+        nullable = field != 'id' and column.nullable
+        stmt = self._filtered_statement(filters, columns)
+
+        if cursor:
+            value, last_id = decode_cursor(cursor, sort or self.sortable_fields[0])
+            value = coerce_value(column, value)
+        after_id = (id_column < last_id if descending else id_column > last_id) if cursor else None
+        if field == 'id':
+            stmt = stmt.order_by(id_column.desc() if descending else id_column)
+            return [stmt.where(after_id) if cursor else stmt]
+
+        values = stmt.where(column.is_not(None)) if nullable else stmt
+        if cursor and value is not None:
+            key, last = tuple_(column, id_column), tuple_(literal(value, column.type), literal(last_id))
+            values = values.where(key < last if descending else key > last)
+        values = values.order_by(*([column.desc(), id_column.desc()] if descending else [column, id_column]))
+        if not nullable:
+            return [values]
+
+        nulls = stmt.where(column.is_(None)).order_by(id_column.desc() if descending else id_column)
+        if cursor and value is None:
+            # Inside the NULL block: the rest of it, then the values if they come next.
+            nulls = nulls.where(after_id)
+            return [nulls, values] if descending else [nulls]
+        if cursor:
+            return [values] if descending else [values, nulls]
+        return [nulls, values] if descending else [values, nulls]
+
+    @staticmethod
+    def _read_segments(fetch: Callable[[Select], List[Any]], statements: List[Select], limit: int) -> List[Any]:
+        """Rows of ``statements`` in turn, up to ``limit + 1``."""
+        rows: List[Any] = []
+        for stmt in statements:
+            rows.extend(fetch(stmt.limit(limit + 1 - len(rows))))
+            if len(rows) > limit:
+                break
+        return rows
+
+    @staticmethod
+    async def _read_segments_async(fetch: Callable[[Select], Any], statements: List[Select], limit: int) -> List[Any]:
+        rows: List[Any] = []
+        for stmt in statements:
+            rows.extend(await fetch(stmt.limit(limit + 1 - len(rows))))
+            if len(rows) > limit:
+                break
+        return rows
+
+    def _build_page(self, rows: List[T], limit: int, sort: Optional[str]) -> Page[T]:
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            field, _ = parse_sort(sort, self.sortable_fields)
+            last = rows[-1]
+            next_cursor = encode_cursor(sort or self.sortable_fields[0], getattr(last, field), last.id)
+        return Page(items=rows, next_cursor=next_cursor)
+
+    def _count_statement(self, filters: Optional[Dict[str, List[Any]]]) -> Select:
+        return select(func.count()).select_from(self._filtered_statement(filters).subquery())
+
+    def export_statement(self, filters: Optional[Dict[str, List[Any]]], chunk_size: int) -> Select:
+        """Filtered rows in id order over a server-side cursor, ``chunk_size``
+        rows per fetch. Relationships are selectin-loaded per chunk whatever
+        their declared strategy, since joined collection loading cannot be
+        combined with yield_per."""
+        options = [
+            selectinload(getattr(self.model_class, rel_config['relationship_attr']))
+            for rel_config in self.relationships.values()
+            if rel_config['load'] != 'raise'
+        ]
+        if self.raise_on_lazy_load:
+            options.append(raiseload('*'))
+        return (
+            self._filtered_statement(filters, [self.model_class])
+            .options(*options)
+            .order_by(self.model_class.id)
+            .execution_options(yield_per=chunk_size)
+        )
+
+    def iter_chunks(self, db: Session, stmt: Select) -> Iterator[List[T]]:
+        """Yield the rows of an export statement chunk by chunk. The identity
+        map only holds weak references to unmodified rows, so a chunk is freed
+        once the caller drops it and memory stays flat."""
+        for partition in db.scalars(stmt).partitions():
+            yield list(partition)
+
+    def search(self, db: Session, query: str, limit: int) -> List[T]:
+        """Best matches for ``query``, best first, with relationships loaded."""
+        ranked = self.search_index.ranked(db.get_bind().dialect.name, query, limit)
+        if ranked is None:
+            return []
+        stmt = (
+            self._select()
+            .join(ranked, ranked.c.id == self.model_class.id)
+            .order_by(ranked.c.rank.desc(), self.model_class.id)
+        )
+        return list(db.scalars(stmt).unique().all())
+
+    def get_version(self, db: Session, id: int) -> Tuple[int, datetime]:
+        row = db.execute(
+            select(self.model_class.version, self.model_class.updated_at).where(self.model_class.id == id)
+        ).first()
+        if row is None:
+            self._raise_not_found(id)
+        return row.version, row.updated_at
+
+    def get_page(
+        self,
+        db: Session,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort: Optional[str] = None,
+        filters: Optional[Dict[str, List[Any]]] = None,
+        include_total: bool = False,
+    ) -> Page[T]:
+        rows = self._read_segments(
+            lambda stmt: db.scalars(stmt).unique().all(), self._page_statements(limit, cursor, sort, filters), limit,
+        )
+        page = self._build_page(rows, limit, sort)
+        if include_total:
+            page.total = db.scalar(self._count_statement(filters))
+        return page
+
+    def _field_columns(self, fields: List[str], sort: Optional[str] = None) -> List[Any]:
+        """Columns to select for a sparse fieldset, plus the keys the cursor needs."""
+        column_keys = {column.key for column in self.model_class.__mapper__.column_attrs}
+        unknown = [field for field in fields if field not in column_keys]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(sorted(column_keys))}"
+            )
+        sort_field, _ = parse_sort(sort, self.sortable_fields)
+        keys = list(dict.fromkeys([*fields, 'id', sort_field]))
+        return [getattr(self.model_class, key) for key in keys]
+
+    @staticmethod
+    def _rows_to_dicts(rows: List[Any], fields: List[str]) -> List[Dict[str, Any]]:
+        return [{field: getattr(row, field) for field in fields} for row in rows]
+
+    def get_page_fields(
+        self,
+        db: Session,
+        fields: List[str],
+        limit: int,
+        cursor: Optional[str] = None,
+        sort: Optional[str] = None,
+        filters: Optional[Dict[str, List[Any]]] = None,
+        include_total: bool = False,
+    ) -> Page[Dict[str, Any]]:
+        """Like get_page but selects only ``fields`` and returns plain dicts
+        without building ORM instances."""
+        statements = self._page_statements(limit, cursor, sort, filters, self._field_columns(fields, sort))
+        page = self._build_page(self._read_segments(lambda stmt: db.execute(stmt).all(), statements, limit), limit, sort)
+        page.items = self._rows_to_dicts(page.items, fields)
+        if include_total:
+            page.total = db.scalar(self._count_statement(filters))
+        return page
+
+    def get_fields_by_id(self, db: Session, id: int, fields: List[str]) -> Dict[str, Any]:
+        stmt = select(*self._field_columns(fields)).where(self.model_class.id == id)
+        row = db.execute(stmt).first()
+        if row is None:
+            self._raise_not_found(id)
+        return self._rows_to_dicts([row], fields)[0]
 
     def get_or_404(self, db: Session, id: int) -> T:
-        entity = db.query(self.model_class).filter(self.model_class.id == id).first() # type: ignore
+        # Session.get answers from the identity map without a round trip
+        # when the entity is already loaded in this session.
+        entity = db.get(self.model_class, id, options=self._relationship_load_options())
         if not entity:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -32,31 +322,350 @@ class BaseEntityService(Generic[T], ABC):
         return self.get_or_404(db, id)
 
     def _handle_relationships_for_create(self, db: Session, entity: T, data: Dict[str, Any]) -> None:
+        """Link a freshly inserted entity with one INSERT ... SELECT per
+        relationship; ids that do not exist are skipped by the SELECT."""
         for rel_name, rel_config in self.relationships.items():
-            field_name = rel_config['field_name']
+            related_ids = data.get(rel_config['field_name'])
+            if not related_ids:
+                # Nothing to link, so the collection is known to be empty.
+                set_committed_value(entity, rel_config['relationship_attr'], [])
+                continue
+            table, local_column, remote_column = self._association(rel_config)
             related_model = rel_config['model']
-            relationship_attr = rel_config['relationship_attr']
-            
-            if field_name in data:
-                related_ids = data[field_name]
-                if related_ids:
-                    related_entities = db.query(related_model).filter(related_model.id.in_(related_ids)).all()
-                    setattr(entity, relationship_attr, related_entities)
+            db.execute(insert(table).from_select(
+                [local_column, remote_column],
+                select(literal(entity.id), related_model.id).where(related_model.id.in_(related_ids)),
+            ))
+
+    def _load_relationships(self, db: Session, entity: T) -> None:
+        """Load the relationships the response needs that are not loaded yet."""
+        unloaded = inspect(entity).unloaded
+        for rel_config in self.relationships.values():
+            if rel_config['load'] != 'raise' and rel_config['relationship_attr'] in unloaded:
+                # A plain attribute access is a single lazy-load query; a
+                # refresh would select the parent row again first.
+                getattr(entity, rel_config['relationship_attr'])
+
+    def _column_values(self, entity: T) -> Dict[str, Any]:
+        return {
+            column.key: entity.__dict__[column.key]
+            for column in self.model_class.__mapper__.column_attrs
+            if column.key in entity.__dict__
+        }
+
+    def _version_values(self) -> Dict[str, Any]:
+        """Column values that mark a row as changed; part of every UPDATE."""
+        return {'version': self.model_class.version + 1, 'updated_at': utcnow()}
+
+    def _owned(self, stmt: Any, owner_id: Optional[int]) -> Any:
+        """``stmt`` restricted to the rows of ``owner_id``, if given."""
+        if owner_id is None:
+            return stmt
+        return stmt.where(getattr(self.model_class, self.owner_field) == owner_id)
+
+    def _raise_missing_or_modified(
+        self, db: Session, id: int, expected_versions: Optional[List[int]], owner_id: Optional[int] = None,
+    ) -> None:
+        """A conditional write matched no row: 412 if the row exists, else 404."""
+        db.rollback()
+        if expected_versions is not None and db.scalar(
+            self._owned(select(self.model_class.id).where(self.model_class.id == id), owner_id)
+        ):
+            raise precondition_failed()
+        self._raise_not_found(id)
+
+    def _raise_not_found(self, id: int) -> None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{self.model_class.__name__} with ID {id} not found"
+        )
 
     def _handle_relationships_for_update(self, db: Session, entity: T, update_data: Dict[str, Any]) -> None:
+        for rel_name, rel_config in self.relationships.items():
+            if not self._has_relationship_update(rel_config, update_data):
+                continue
+            current = self._loaded_related_ids(entity, rel_config)
+            if current is None:
+                current = self._current_related_ids(db, rel_config, [entity.id])[entity.id]
+            to_add, to_remove = self._relationship_changes(rel_config, current, update_data)
+            if to_add or to_remove:
+                self._apply_relationship_changes(db, rel_config, {entity.id: (to_add, to_remove)})
+                db.expire(entity, [rel_config['relationship_attr']])
+
+    @staticmethod
+    def _has_relationship_update(rel_config: Dict[str, Any], data: Dict[str, Any]) -> bool:
+        return any(
+            rel_config[key] in data for key in ('field_name', 'add_field_name', 'remove_field_name')
+        )
+
+    @staticmethod
+    def _loaded_related_ids(entity: T, rel_config: Dict[str, Any]) -> Optional[Set[int]]:
+        """Ids of an already loaded collection, or None if it is not loaded."""
+        relationship_attr = rel_config['relationship_attr']
+        if relationship_attr in inspect(entity).unloaded:
+            return None
+        return {related.id for related in getattr(entity, relationship_attr)}
+
+    def _current_related_ids(self, db: Session, rel_config: Dict[str, Any], entity_ids: List[int]) -> Dict[int, Set[int]]:
+        table, local_column, remote_column = self._association(rel_config)
+        current: Dict[int, Set[int]] = {entity_id: set() for entity_id in entity_ids}
+        for entity_id, related_id in db.execute(select(local_column, remote_column).where(local_column.in_(entity_ids))):
+            current[entity_id].add(related_id)
+        return current
+
+    @staticmethod
+    def _relationship_changes(rel_config: Dict[str, Any], current: Set[int], data: Dict[str, Any]) -> Tuple[Set[int], Set[int]]:
+        """Pop the relationship fields from ``data`` and diff them against the
+        current ids. Returns ``(ids to link, ids to unlink)``.
+
+        A full list replaces the links (None leaves them as they are), then
+        the add/remove lists are applied on top.
+        """
+        replacement = data.pop(rel_config['field_name'], None)
+        add_ids = data.pop(rel_config['add_field_name'], None) or []
+        remove_ids = data.pop(rel_config['remove_field_name'], None) or []
+
+        desired = set(current) if replacement is None else set(replacement)
+        desired = (desired | set(add_ids)) - set(remove_ids)
+        return desired - current, current - desired
+
+    def _apply_relationship_changes(
+        self,
+        db: Session,
+        rel_config: Dict[str, Any],
+        changes: Dict[int, Tuple[Set[int], Set[int]]],
+    ) -> None:
+        """Insert and delete only the association rows that changed."""
+        table, local_column, remote_column = self._association(rel_config)
+        removals = [
+            {'entity_id': entity_id, 'related_id': related_id}
+            for entity_id, (_, to_remove) in changes.items()
+            for related_id in to_remove
+        ]
+        if removals:
+            db.execute(
+                delete(table).where(
+                    local_column == bindparam('entity_id'),
+                    remote_column == bindparam('related_id'),
+                ),
+                removals,
+            )
+        additions = {entity_id: list(to_add) for entity_id, (to_add, _) in changes.items() if to_add}
+        if additions:
+            self._link_related_ids(db, {rel_config['field_name']: additions})
+
+    def _integrity_error_detail(self, e: IntegrityError) -> str:
+        if "UNIQUE constraint failed" in str(e) or "duplicate key value" in str(e):
+            return f"A {self.model_class.__name__.lower()} with this data already exists"
+        return "Database constraint violation"
+
+    def _raise_integrity_error(self, e: IntegrityError) -> None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=self._integrity_error_detail(e)
+        )
+
+    def _pop_temp_relationship_data(self, entity: T) -> Dict[str, Any]:
+        temp_relationship_data = {}
+
         for rel_name, rel_config in self.relationships.items():
             field_name = rel_config['field_name']
+            temp_attr = f'_temp_{field_name}'
+
+            if hasattr(entity, temp_attr):
+                temp_relationship_data[field_name] = getattr(entity, temp_attr)
+                delattr(entity, temp_attr)
+
+        return temp_relationship_data
+
+    def _association(self, rel_config: Dict[str, Any]) -> Tuple[Table, Any, Any]:
+        """Association table of a many-to-many relationship with its
+        (this entity id, related entity id) columns."""
+        relationship = self.model_class.__mapper__.relationships[rel_config['relationship_attr']]
+        return (
+            relationship.secondary,
+            relationship.synchronize_pairs[0][1],
+            relationship.secondary_synchronize_pairs[0][1],
+        )
+
+    def _split_relationship_data(self, data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        data = data.copy()
+        relationship_data = {
+            rel_config[key]: data.pop(rel_config[key])
+            for rel_config in self.relationships.values()
+            for key in ('field_name', 'add_field_name', 'remove_field_name')
+            if rel_config[key] in data
+        }
+        return data, relationship_data
+
+    def _link_related_ids(self, db: Session, links: Dict[str, Dict[int, List[int]]]) -> None:
+        """Insert association rows for ``{field_name: {entity_id: related_ids}}``.
+
+        Related ids that do not exist are skipped, like the single-entity
+        create does, at the cost of one lookup per relationship.
+        """
+        for rel_config in self.relationships.values():
+            entity_links = links.get(rel_config['field_name'])
+            if not entity_links:
+                continue
+            table, local_column, remote_column = self._association(rel_config)
             related_model = rel_config['model']
-            relationship_attr = rel_config['relationship_attr']
-            
-            if field_name in update_data:
-                related_ids = update_data.pop(field_name)
-                if related_ids is not None:
+            requested_ids = {related_id for ids in entity_links.values() for related_id in ids}
+            existing_ids = set(db.scalars(select(related_model.id).where(related_model.id.in_(requested_ids))))
+            rows = [
+                {local_column.key: entity_id, remote_column.key: related_id}
+                for entity_id, related_ids in entity_links.items()
+                for related_id in dict.fromkeys(related_ids)
+                if related_id in existing_ids
+            ]
+            if rows:
+                db.execute(insert(table), rows)
+
+    def _unlink_related(self, db: Session, entity_ids: List[int]) -> None:
+        for rel_config in self.relationships.values():
+            table, local_column, _ = self._association(rel_config)
+            db.execute(delete(table).where(local_column.in_(entity_ids)))
+
+    def _delete_dependents(self, db: Session, entity_ids: List[int]) -> None:
+        """Delete child rows of deleted entities. On Postgres ON DELETE CASCADE
+        has removed them already; SQLite only cascades with foreign keys on.
+        Running after the parent is gone means child triggers that update
+        the parent find nothing to update."""
+        for column in self.dependents:
+            db.execute(delete(column.table).where(column.in_(entity_ids)))
+
+    def _run_chunk(self, db: Session, chunk: List[Tuple[int, Any]], operation, result: BulkResult) -> None:
+        """Apply ``operation`` to a chunk inside a savepoint. On a constraint
+        violation the chunk is split in half and retried, so only the
+        offending items end up in ``result.failed``."""
+        try:
+            with db.begin_nested():
+                succeeded = operation(chunk)
+        except IntegrityError as e:
+            if len(chunk) > 1:
+                middle = len(chunk) // 2
+                self._run_chunk(db, chunk[:middle], operation, result)
+                self._run_chunk(db, chunk[middle:], operation, result)
+            else:
+                index, payload = chunk[0]
+                result.failed.append(BulkItemError(
+                    index=index,
+                    id=payload.get('id') if isinstance(payload, dict) else payload,
+                    detail=self._integrity_error_detail(e),
+                ))
+            return
+        result.succeeded.extend(succeeded)
+
+    def bulk_create(self, db: Session, items: List[Tuple[int, Dict[str, Any]]], chunk_size: int) -> BulkResult:
+        """Create ``(index, data)`` items with one multi-row INSERT ... RETURNING per chunk."""
+        result = BulkResult()
+
+        def insert_chunk(chunk):
+            split = [self._split_relationship_data(data) for _, data in chunk]
+            ids = db.scalars(
+                insert(self.model_class).returning(self.model_class.id, sort_by_parameter_order=True),
+                [columns for columns, _ in split],
+            ).all()
+            links: Dict[str, Dict[int, List[int]]] = {}
+            for entity_id, (_, relationship_data) in zip(ids, split):
+                for field_name, related_ids in relationship_data.items():
                     if related_ids:
-                        related_entities = db.query(related_model).filter(related_model.id.in_(related_ids)).all()
-                        setattr(entity, relationship_attr, related_entities)
-                    else:
-                        setattr(entity, relationship_attr, [])
+                        links.setdefault(field_name, {})[entity_id] = related_ids
+            self._link_related_ids(db, links)
+            return [BulkItemResult(index=index, id=entity_id) for (index, _), entity_id in zip(chunk, ids)]
+
+        for start in range(0, len(items), chunk_size):
+            succeeded_before = len(result.succeeded)
+            self._run_chunk(db, items[start:start + chunk_size], insert_chunk, result)
+            db.commit()
+            self._notify_write('create', [item.id for item in result.succeeded[succeeded_before:]])
+        return result
+
+    def bulk_update(
+        self, db: Session, items: List[Tuple[int, Dict[str, Any]]], chunk_size: int, owner_id: Optional[int] = None,
+    ) -> BulkResult:
+        """Update ``(index, data)`` items, each carrying its ``id``, with an
+        executemany UPDATE per chunk. Relationship fields replace the links."""
+        result = BulkResult()
+
+        def update_chunk(chunk):
+            split = [self._split_relationship_data(data) for _, data in chunk]
+            column_rows = [columns for columns, _ in split if len(columns) > 1]
+            if column_rows:
+                db.execute(update(self.model_class), column_rows)
+            # Executemany by primary key only takes literal values, so the
+            # version bump is one more statement for the whole chunk.
+            db.execute(
+                update(self.model_class)
+                .where(self.model_class.id.in_([columns['id'] for columns, _ in split]))
+                .values(self._version_values())
+                .execution_options(synchronize_session=False)
+            )
+            for rel_config in self.relationships.values():
+                updates = {
+                    columns['id']: relationship_data
+                    for columns, relationship_data in split
+                    if self._has_relationship_update(rel_config, relationship_data)
+                }
+                if not updates:
+                    continue
+                current = self._current_related_ids(db, rel_config, list(updates))
+                changes = {
+                    entity_id: self._relationship_changes(rel_config, current[entity_id], dict(relationship_data))
+                    for entity_id, relationship_data in updates.items()
+                }
+                self._apply_relationship_changes(db, rel_config, changes)
+            return [BulkItemResult(index=index, id=data['id']) for index, data in chunk]
+
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start:start + chunk_size]
+            existing_ids = set(db.scalars(self._owned(
+                select(self.model_class.id).where(self.model_class.id.in_([data['id'] for _, data in chunk])),
+                owner_id,
+            )))
+            found = []
+            succeeded_before = len(result.succeeded)
+            for index, data in chunk:
+                if data['id'] in existing_ids:
+                    found.append((index, data))
+                else:
+                    result.failed.append(BulkItemError(index=index, id=data['id'], detail="Entity not found"))
+            if found:
+                self._run_chunk(db, found, update_chunk, result)
+            db.commit()
+            self._notify_write('update', [item.id for item in result.succeeded[succeeded_before:]])
+        return result
+
+    def bulk_delete(self, db: Session, ids: List[int], chunk_size: int, owner_id: Optional[int] = None) -> BulkResult:
+        """Delete by id with one DELETE ... RETURNING per chunk."""
+        result = BulkResult()
+        items = list(enumerate(ids))
+
+        def delete_chunk(chunk):
+            chunk_ids = [entity_id for _, entity_id in chunk]
+            if owner_id is not None:
+                chunk_ids = list(db.scalars(
+                    self._owned(select(self.model_class.id).where(self.model_class.id.in_(chunk_ids)), owner_id)
+                ))
+            self._unlink_related(db, chunk_ids)
+            deleted = set(db.scalars(
+                delete(self.model_class).where(self.model_class.id.in_(chunk_ids)).returning(self.model_class.id)
+            ))
+            self._delete_dependents(db, list(deleted))
+            return [BulkItemResult(index=index, id=entity_id) for index, entity_id in chunk if entity_id in deleted]
+
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start:start + chunk_size]
+            succeeded_before = len(result.succeeded)
+            self._run_chunk(db, chunk, delete_chunk, result)
+            deleted = {item.index for item in result.succeeded[succeeded_before:]}
+            failed = {item.index for item in result.failed}
+            for index, entity_id in chunk:
+                if index not in deleted and index not in failed:
+                    result.failed.append(BulkItemError(index=index, id=entity_id, detail="Entity not found"))
+            db.commit()
+            self._notify_write('delete', [item.id for item in result.succeeded[succeeded_before:]])
+        return result
 
     def create_entity_from_data(self, data: Dict[str, Any]) -> T:
         entity_data = data.copy()
@@ -75,55 +684,175 @@ class BaseEntityService(Generic[T], ABC):
         return entity
 
     def create(self, db: Session, entity: T) -> T:
-        temp_relationship_data = {}
-        attrs_to_remove = []
-        
-        for rel_name, rel_config in self.relationships.items():
-            field_name = rel_config['field_name']
-            temp_attr = f'_temp_{field_name}'
-            
-            if hasattr(entity, temp_attr):
-                temp_relationship_data[field_name] = getattr(entity, temp_attr)
-                attrs_to_remove.append(temp_attr)
+        """INSERT ... RETURNING the new row, then link relationships.
 
-        for attr in attrs_to_remove:
-            delattr(entity, attr)
+        Returns the persisted instance built from the RETURNING row, which
+        replaces the refresh SELECT after the commit.
+        """
+        temp_relationship_data = self._pop_temp_relationship_data(entity)
 
-        self._handle_relationships_for_create(db, entity, temp_relationship_data)
-        
         try:
-            db.add(entity)
-            db.commit()
-            db.refresh(entity)
+            created = db.scalars(
+                insert(self.model_class).values(self._column_values(entity)).returning(self.model_class)
+            ).one()
+            self._handle_relationships_for_create(db, created, temp_relationship_data)
+            self._load_relationships(db, created)
+            commit_keeping_state(db)
+            self._notify_write('create', [created.id])
+            return created
+        except IntegrityError as e:
+            db.rollback()
+            self._raise_integrity_error(e)
+
+    def update(
+        self,
+        db: Session,
+        id: int,
+        update_data: Dict[str, Any],
+        expected_versions: Optional[List[int]] = None,
+        owner_id: Optional[int] = None,
+    ) -> T:
+        """UPDATE ... RETURNING the row, so the existence check, the write and
+        the refresh are one statement. The version is bumped even when only
+        relationships change, since they are part of the representation.
+
+        With ``expected_versions`` (from If-Match) the row is only updated if
+        its version is one of them, otherwise 412.
+        """
+        columns, relationship_data = self._split_relationship_data(update_data)
+        stmt = self._owned(update(self.model_class).where(self.model_class.id == id), owner_id)
+        if expected_versions is not None:
+            stmt = stmt.where(self.model_class.version.in_(expected_versions))
+
+        try:
+            entity = db.scalars(
+                stmt
+                .values({**columns, **self._version_values()})
+                .returning(self.model_class)
+                .execution_options(populate_existing=True)
+            ).one_or_none()
+            if entity is None:
+                self._raise_missing_or_modified(db, id, expected_versions, owner_id)
+
+            self._handle_relationships_for_update(db, entity, relationship_data)
+            self._load_relationships(db, entity)
+            commit_keeping_state(db)
+            self._notify_write('update', [entity.id])
             return entity
         except IntegrityError as e:
             db.rollback()
-            if "UNIQUE constraint failed" in str(e) or "duplicate key value" in str(e):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"A {self.model_class.__name__.lower()} with this data already exists"
-                )
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Database constraint violation"
-                )
+            self._raise_integrity_error(e)
 
-    def update(self, db: Session, id: int, update_data: Dict[str, Any]) -> T:
-        entity = self.get_or_404(db, id)
+    def delete(
+        self, db: Session, id: int, expected_versions: Optional[List[int]] = None, owner_id: Optional[int] = None,
+    ) -> bool:
+        """DELETE ... RETURNING id; an empty result means the entity did not
+        exist, or with ``expected_versions`` that its version did not match."""
+        stmt = self._owned(delete(self.model_class).where(self.model_class.id == id), owner_id)
+        if expected_versions is not None:
+            stmt = stmt.where(self.model_class.version.in_(expected_versions))
+        try:
+            self._unlink_related(db, [id])
+            deleted_id = db.scalar(stmt.returning(self.model_class.id))
+            if deleted_id is None:
+                self._raise_missing_or_modified(db, id, expected_versions, owner_id)
+            self._delete_dependents(db, [id])
+            db.commit()
+            self._notify_write('delete', [id])
+            return True
+        except IntegrityError as e:
+            db.rollback()
+            self._raise_integrity_error(e)
+
+    # Async variants. They rely on the declared load strategies because lazy
+    # loading is not available on an AsyncSession.
+
+    async def get_all_async(self, db: AsyncSession) -> List[T]:
+        result = await db.scalars(self._select())
+        return list(result.unique().all())
+
+    async def get_page_async(
+        self,
+        db: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort: Optional[str] = None,
+        filters: Optional[Dict[str, List[Any]]] = None,
+        include_total: bool = False,
+    ) -> Page[T]:
+        async def fetch(stmt: Select) -> List[T]:
+            return (await db.scalars(stmt)).unique().all()
+
+        rows = await self._read_segments_async(fetch, self._page_statements(limit, cursor, sort, filters), limit)
+        page = self._build_page(rows, limit, sort)
+        if include_total:
+            page.total = await db.scalar(self._count_statement(filters))
+        return page
 
-        self._handle_relationships_for_update(db, entity, update_data)
+    async def get_page_fields_async(
+        self,
+        db: AsyncSession,
+        fields: List[str],
+        limit: int,
+        cursor: Optional[str] = None,
+        sort: Optional[str] = None,
+        filters: Optional[Dict[str, List[Any]]] = None,
+        include_total: bool = False,
+    ) -> Page[Dict[str, Any]]:
+        async def fetch(stmt: Select) -> List[Any]:
+            return (await db.execute(stmt)).all()
 
-        for key, value in update_data.items():
-            setattr(entity, key, value)
-            
-        db.commit()
-        db.refresh(entity)
+        statements = self._page_statements(limit, cursor, sort, filters, self._field_columns(fields, sort))
+        page = self._build_page(await self._read_segments_async(fetch, statements, limit), limit, sort)
+        page.items = self._rows_to_dicts(page.items, fields)
+        if include_total:
+            page.total = await db.scalar(self._count_statement(filters))
+        return page
+
+    async def get_version_async(self, db: AsyncSession, id: int) -> Tuple[int, datetime]:
+        result = await db.execute(
+            select(self.model_class.version, self.model_class.updated_at).where(self.model_class.id == id)
+        )
+        row = result.first()
+        if row is None:
+            self._raise_not_found(id)
+        return row.version, row.updated_at
+
+    async def get_fields_by_id_async(self, db: AsyncSession, id: int, fields: List[str]) -> Dict[str, Any]:
+        result = await db.execute(select(*self._field_columns(fields)).where(self.model_class.id == id))
+        row = result.first()
+        if row is None:
+            self._raise_not_found(id)
+        return self._rows_to_dicts([row], fields)[0]
+
+    async def get_or_404_async(self, db: AsyncSession, id: int) -> T:
+        entity = await db.get(self.model_class, id, options=self._relationship_load_options())
+        if not entity:
+            self._raise_not_found(id)
         return entity
 
-    def delete(self, db: Session, id: int) -> bool:
-        entity = self.get_or_404(db, id)
-        db.delete(entity)
-        db.commit()
-        return True
+    async def get_by_id_async(self, db: AsyncSession, id: int) -> T:
+        return await self.get_or_404_async(db, id)
+
+    # The write paths are statement-level already, so the async variants run
+    # the sync implementations through run_sync on the async connection.
+    # Relationships are loaded before they return, so nothing lazy loads
+    # during serialization.
+
+    async def create_async(self, db: AsyncSession, entity: T) -> T:
+        return await db.run_sync(lambda session: self.create(session, entity))
+
+    async def update_async(
+        self,
+        db: AsyncSession,
+        id: int,
+        update_data: Dict[str, Any],
+        expected_versions: Optional[List[int]] = None,
+        owner_id: Optional[int] = None,
+    ) -> T:
+        return await db.run_sync(lambda session: self.update(session, id, update_data, expected_versions, owner_id))
 
+    async def delete_async(
+        self, db: AsyncSession, id: int, expected_versions: Optional[List[int]] = None, owner_id: Optional[int] = None,
+    ) -> bool:
+        return await db.run_sync(lambda session: self.delete(session, id, expected_versions, owner_id))
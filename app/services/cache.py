@@ -0,0 +1,213 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+# Every cache registers itself here so diagnostics and tests can reach it.
+caches: Dict[str, "ResponseCache"] = {}
+
+
+@dataclass
+class CachedResponse:
+    """An already serialized response body with the headers that go with it,
+    and the body compressed in each supported content coding."""
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        return (
+            len(self.body)
+            + sum(len(name) + len(value) for name, value in self.headers.items())
+            + sum(len(body) for body in self.encoded.values())
+        )
+
+
+class ResponseCache:
+    """Thread-safe LRU of serialized responses bounded by TTL, entry count and bytes.
+
+    Keys are tuples whose first element is the kind of entry: ``("list", ...)``
+    entries depend on every row, ``("detail", id, ...)`` entries on one row.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: float = CACHE_TTL_SECONDS,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        max_bytes: int = CACHE_MAX_BYTES,
+    ):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[float, CachedResponse]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        # Bumped by every invalidation. A reader records it before querying
+        # and passes it to set(), so a result read before a concurrent write
+        # committed is not cached after that write invalidated the entries.
+        self.generation = 0
+        self.last_invalidated = float("-inf")
+        caches[name] = self
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: CachedResponse, generation: Optional[int] = None) -> None:
+        if value.size > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self.size_bytes += value.size
+            while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, ids: Optional[Iterable[int]] = None) -> None:
+        """Drop every list entry and the detail entries of ``ids`` (all of them if None)."""
+        ids = None if ids is None else set(ids)
+        with self._lock:
+            self.generation += 1
+            self.last_invalidated = time.monotonic()
+            stale = [
+                key for key in self._entries
+                if key[0] != "detail" or ids is None or key[1] in ids
+            ]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self.last_invalidated = time.monotonic()
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def invalidated_within(self, seconds: float) -> bool:
+        return time.monotonic() - self.last_invalidated < seconds
+
+    def _remove(self, key: Hashable) -> None:
+        _, value = self._entries.pop(key)
+        self.size_bytes -= value.size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self.size_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+def reference_cache(name: str) -> Optional[ResponseCache]:
+    """Cache for a rarely changing reference table, or None when caching is off."""
+    return ResponseCache(name) if CACHE_ENABLED else None
+
+
+class ExpiringLRU:
+    """Thread-safe LRU of arbitrary values, each with its own expiry.
+
+    Unlike ResponseCache it holds Python objects rather than serialized
+    bodies, so it is bounded by entry count only.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: float) -> None:
+        if ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
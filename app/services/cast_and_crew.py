@@ -1,14 +1,56 @@
-from app.models.cast_and_crew import CastAndCrew
+from typing import Any, List
+
+from sqlalchemy import func, select
+
+from app.models.cast_and_crew import CastAndCrew, cast_and_crew_search
 from app.models.country import Country
+from app.models.movie import MovieCredit
+from app.services.autocomplete import AutocompleteSource, autocomplete_index
 from app.services.base_service import BaseEntityService
+from app.services.country import country_autocomplete
+from app.services.similar_movies import similar_movies_index
+
+
+class CastAndCrewAutocomplete(AutocompleteSource):
+    """Labels people by stage name, else by full name; both are matched.
+    People with the most credits come first."""
+
+    def __init__(self):
+        super().__init__(
+            CastAndCrew,
+            [CastAndCrew.stage_name, CastAndCrew.first_name, CastAndCrew.last_name],
+            popularity=select(func.count())
+            .where(MovieCredit.cast_and_crew_id == CastAndCrew.id)
+            .scalar_subquery(),
+            counted=MovieCredit.cast_and_crew_id,
+        )
+
+    def texts(self, row: Any) -> List[str]:
+        full_name = " ".join(name for name in (row.first_name, row.last_name) if name)
+        return [text for text in (row.stage_name, full_name) if text]
+
+
+cast_and_crew_autocomplete = autocomplete_index("cast_and_crew", CastAndCrewAutocomplete())
 
 
 class CastAndCrewService(BaseEntityService[CastAndCrew]):
     def __init__(self):
-        super().__init__(CastAndCrew, relationships={
-            'countries': {
-                'model': Country,
-                'field_name': 'country_ids',
-                'relationship_attr': 'countries'
-            }
-        })
\ No newline at end of file
+        super().__init__(
+            CastAndCrew,
+            relationships={
+                'countries': {
+                    'model': Country,
+                    'field_name': 'country_ids',
+                    'relationship_attr': 'countries',
+                    'load': 'selectin',
+                }
+            },
+            sortable_fields=['id', 'last_name', 'first_name', 'stage_name', 'birth_date'],
+            filterable_fields=['last_name', 'first_name', 'stage_name', 'birth_date'],
+            search=cast_and_crew_search,
+            autocomplete=cast_and_crew_autocomplete,
+        )
+        # Countries are ranked by how many people they have.
+        self.add_write_listener(lambda action, ids: country_autocomplete.invalidate())
+        # A person's countries are tokens of their movies.
+        self.add_write_listener(similar_movies_index.mark_people_stale)
@@ -0,0 +1,146 @@
+import gzip
+import os
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+try:
+    import brotli
+except ImportError:  # optional, gzip only
+    brotli = None
+
+load_dotenv()
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+# Precompressed payloads are compressed once per cache fill, so they can
+# afford a higher setting than per-response compression.
+PRECOMPRESS_GZIP_LEVEL = 9
+PRECOMPRESS_BROTLI_QUALITY = 9
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "application/javascript", "text/", "image/svg+xml")
+
+
+def available_encodings() -> List[str]:
+    """Supported content codings, most preferred first."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the coding to use for an Accept-Encoding header, or None."""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+    wildcard = weights.get("*", 0.0)
+    candidates = [
+        (weights.get(coding, wildcard), -rank, coding)
+        for rank, coding in enumerate(available_encodings())
+    ]
+    weight, _, coding = max(candidates)
+    return coding if weight > 0 else None
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def compress(body: bytes, encoding: str, precompress: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=PRECOMPRESS_BROTLI_QUALITY if precompress else COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=PRECOMPRESS_GZIP_LEVEL if precompress else COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class StreamCompressor:
+    """Incremental compressor that flushes after every chunk, so a streamed
+    response reaches the client chunk by chunk instead of when it ends."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.flush()
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish() if self.encoding == "br" else self._compressor.flush()
+
+
+def precompress(body: bytes, route: str) -> Dict[str, bytes]:
+    """Every supported coding of ``body``, for payloads served many times."""
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return {}
+    started = time.thread_time()
+    encoded = {encoding: compress(body, encoding, precompress=True) for encoding in available_encodings()}
+    compression_stats.record_precompression(route, time.thread_time() - started)
+    return encoded
+
+
+def route_label(scope: Dict[str, Any]) -> str:
+    """Path template of the matched route (``/api/genres/{id}``), else the raw path."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope.get("path", "")
+
+
+class CompressionStats:
+    """Per-route counters of what compression saved and what it cost."""
+
+    def __init__(self):
+        self._routes: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _route(self, route: str) -> Dict[str, float]:
+        return self._routes.setdefault(route, {
+            "responses": 0,
+            "precompressed_responses": 0,
+            "bytes_in": 0,
+            "bytes_out": 0,
+            "cpu_seconds": 0.0,
+            "precompress_cpu_seconds": 0.0,
+        })
+
+    def record(self, route: str, bytes_in: int, bytes_out: int, cpu_seconds: float = 0.0,
+               responses: int = 1, precompressed: bool = False) -> None:
+        with self._lock:
+            stats = self._route(route)
+            stats["responses"] += responses
+            stats["precompressed_responses"] += responses if precompressed else 0
+            stats["bytes_in"] += bytes_in
+            stats["bytes_out"] += bytes_out
+            stats["cpu_seconds"] += cpu_seconds
+
+    def record_precompression(self, route: str, cpu_seconds: float) -> None:
+        with self._lock:
+            self._route(route)["precompress_cpu_seconds"] += cpu_seconds
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                route: {**stats, "bytes_saved": stats["bytes_in"] - stats["bytes_out"]}
+                for route, stats in self._routes.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+compression_stats = CompressionStats()
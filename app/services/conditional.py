@@ -0,0 +1,117 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+
+def entity_etag(version: int, fields: Optional[List[str]] = None) -> str:
+    """Strong ETag of one entity. Sparse representations get their own tag."""
+    if not fields:
+        return f'"v{version}"'
+    digest = hashlib.sha1(",".join(fields).encode()).hexdigest()[:8]
+    return f'"v{version}-{digest}"'
+
+
+def collection_etag(
+    versions: List[Tuple[int, int]], has_next: bool, total: Optional[int], representation: Dict[str, Any],
+) -> str:
+    """Strong ETag of one page of a collection.
+
+    The page is identified by the ``(id, version)`` of its rows, whether a
+    next page follows and the total if one is sent: an insert or delete
+    shifts rows in or out, an update bumps a version. ``representation``
+    holds the parameters that shape the response (sort, fields, cursor,
+    limit), so two pages or views never share a tag.
+    """
+    payload = json.dumps([versions, has_next, total, representation], separators=(",", ":"), default=str)
+    return f'"c{hashlib.sha1(payload.encode()).hexdigest()[:16]}"'
+
+
+def as_utc(value: datetime) -> datetime:
+    # SQLite hands timezone-aware columns back as naive datetimes.
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(as_utc(value).replace(microsecond=0), usegmt=True)
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+ENCODING_SUFFIXES = ("-gzip", "-br")
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """Tag of a compressed representation: a strong tag must differ per encoding."""
+    if etag.startswith("W/"):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _strip_encoding(tag: str) -> str:
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(f'{suffix}"'):
+            return f'{tag[:-len(suffix) - 1]}"'
+    return tag
+
+
+def _etag_list(header: str) -> List[str]:
+    # Tags of compressed representations validate the identity one too.
+    return [_strip_encoding(tag.strip()) for tag in header.split(",") if tag.strip()]
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when it is absent (RFC 9110 13.2.2)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison: a W/ prefix on the client's copy still matches.
+        tags = [tag.removeprefix("W/") for tag in _etag_list(if_none_match)]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return as_utc(last_modified).replace(microsecond=0) <= as_utc(since)
+    return False
+
+
+def has_conditional_get(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def if_match_versions(request: Request) -> Optional[List[int]]:
+    """Versions an If-Match header accepts, or None when any version will do.
+
+    Only full-representation tags (``"v<version>"``) can match, since they
+    are the ones a PUT or DELETE replaces. A list with no usable tag is
+    returned empty, which never matches.
+    """
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return None
+    tags = _etag_list(if_match)
+    if "*" in tags:
+        return None
+    versions = []
+    for tag in tags:
+        # If-Match uses strong comparison, so weak tags never match.
+        if tag.startswith('"v') and tag.endswith('"') and tag[2:-1].isdigit():
+            versions.append(int(tag[2:-1]))
+    return versions
+
+
+def precondition_failed() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="The entity was modified since the given ETag was issued"
+    )
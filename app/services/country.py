@@ -1,8 +1,108 @@
+import hashlib
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Iterable, List, Mapping, Optional, Tuple
+
 import pycountry
-from typing import List, Optional
+from pydantic import TypeAdapter
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
+from app.models.cast_and_crew import cast_and_crew_countries
 from app.models.country import Country
 from app.schemas.country import CountryOut
+from app.services.autocomplete import AutocompleteSource, autocomplete_index
+from app.services.compression import precompress
+
+UPSERT_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+countries_adapter = TypeAdapter(List[CountryOut])
+
+# Matched by name and code, most linked people first. The table is small,
+# so any change rebuilds the whole index.
+country_autocomplete = autocomplete_index("countries", AutocompleteSource(
+    Country,
+    [Country.name, Country.code],
+    popularity=select(func.count())
+    .where(cast_and_crew_countries.c.country_id == Country.id)
+    .scalar_subquery(),
+))
+
+
+@dataclass(frozen=True)
+class CountrySnapshot:
+    """Immutable view of the countries table, indexed and pre-serialized."""
+    countries: Tuple[CountryOut, ...]
+    by_id: Mapping[int, CountryOut]
+    by_code: Mapping[str, CountryOut]
+    list_json: bytes
+    list_encoded: Mapping[str, bytes]
+    etag: str
+
+    @classmethod
+    def build(cls, countries: Iterable[CountryOut]) -> "CountrySnapshot":
+        ordered = tuple(sorted(countries, key=lambda country: country.name))
+        list_json = countries_adapter.dump_json(list(ordered))
+        return cls(
+            countries=ordered,
+            by_id=MappingProxyType({country.id: country for country in ordered}),
+            by_code=MappingProxyType({country.code: country for country in ordered}),
+            list_json=list_json,
+            list_encoded=MappingProxyType(precompress(list_json, "/api/countries/")),
+            etag=f'"{hashlib.sha1(list_json).hexdigest()[:16]}"',
+        )
+
+
+# Replaced wholesale on reload; a reference swap is atomic, so readers
+# need no lock.
+_snapshot: Optional[CountrySnapshot] = None
+
+
+def seed_countries(db: Session) -> int:
+    """Insert every pycountry country whose code is missing; return how many.
+
+    Safe to run on every startup and from several processes at once: the
+    insert skips existing codes instead of failing on them.
+    """
+    rows = [{'code': country.alpha_2, 'name': country.name} for country in pycountry.countries]
+    upsert_insert = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if upsert_insert is not None:
+        result = db.execute(upsert_insert(Country).values(rows).on_conflict_do_nothing(index_elements=['code']))
+        inserted = max(result.rowcount, 0)
+    else:
+        existing = set(db.scalars(select(Country.code)))
+        missing = [row for row in rows if row['code'] not in existing]
+        if missing:
+            db.execute(insert(Country), missing)
+        inserted = len(missing)
+    db.commit()
+    if inserted:
+        reload_countries(db)
+    return inserted
+
+
+def reload_countries(db: Session) -> CountrySnapshot:
+    """Rebuild the snapshot from the table. Call it after changing countries."""
+    global _snapshot
+    countries = [CountryOut.model_validate(country) for country in db.scalars(select(Country))]
+    _snapshot = CountrySnapshot.build(countries)
+    country_autocomplete.invalidate()
+    return _snapshot
+
+
+def get_snapshot(db: Session) -> CountrySnapshot:
+    """Current snapshot, loaded on first use if startup did not load it.
+
+    An empty snapshot is reloaded, so countries seeded later are picked up
+    without an explicit reload.
+    """
+    snapshot = _snapshot
+    if snapshot is None or not snapshot.countries:
+        snapshot = reload_countries(db)
+    return snapshot
 
 
 class CountryService:
@@ -10,31 +110,17 @@ class CountryService:
         self.db = db
 
     def populate_countries(self) -> None:
-        if self.db.query(Country).count() > 0:
-            return
-
-        countries_data = []
-        for country in pycountry.countries:
-            countries_data.append(Country(
-                code=country.alpha_2,
-                name=country.name
-            ))
-
-        self.db.bulk_save_objects(countries_data)
-        self.db.commit()
+        seed_countries(self.db)
 
     def get_all_countries(self) -> List[CountryOut]:
-        self.populate_countries()
-        
-        countries = self.db.query(Country).order_by(Country.name).all()
-        return [CountryOut.model_validate(country) for country in countries]
+        return list(get_snapshot(self.db).countries)
 
     def get_country_by_id(self, country_id: int) -> Optional[CountryOut]:
-        country = self.db.query(Country).filter(Country.id == country_id).first()
-        if country:
-            return CountryOut.model_validate(country)
-        return None
+        return get_snapshot(self.db).by_id.get(country_id)
+
+    def get_country_by_code(self, code: str) -> Optional[CountryOut]:
+        return get_snapshot(self.db).by_code.get(code.upper())
 
     def get_countries_by_ids(self, country_ids: List[int]) -> List[CountryOut]:
-        countries = self.db.query(Country).filter(Country.id.in_(country_ids)).all()
-        return [CountryOut.model_validate(country) for country in countries] 
\ No newline at end of file
+        by_id = get_snapshot(self.db).by_id
+        return [by_id[country_id] for country_id in country_ids if country_id in by_id]
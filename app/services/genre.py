@@ -1,7 +1,26 @@
+from sqlalchemy import func, select
+
 from app.models.genre import Genre
+from app.models.movie import movie_genres
+from app.services.autocomplete import AutocompleteSource, autocomplete_index
 from app.services.base_service import BaseEntityService
+from app.services.cache import reference_cache
+
+# Shared by every GenreService so a write through any of them invalidates it.
+genre_cache = reference_cache("genres")
+genre_autocomplete = autocomplete_index("genres", AutocompleteSource(
+    Genre,
+    [Genre.name],
+    popularity=select(func.count()).where(movie_genres.c.genre_id == Genre.id).scalar_subquery(),
+))
 
 
 class GenreService(BaseEntityService[Genre]):
     def __init__(self):
-        super().__init__(Genre)
\ No newline at end of file
+        super().__init__(
+            Genre,
+            sortable_fields=['id', 'name'],
+            filterable_fields=['name'],
+            cache=genre_cache,
+            autocomplete=genre_autocomplete,
+        )
\ No newline at end of file
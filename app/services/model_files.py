@@ -0,0 +1,181 @@
+"""Versioned model files of named NumPy arrays, memory-mapped when served.
+
+A file is a short JSON header followed by the raw arrays, each aligned so
+that it maps in place without a copy:
+
+    MAGIC | header length (uint32) | header | padding | array | padding | array ...
+
+Builds write ``<kind>-<version>.arrays`` through a temporary file and a
+rename, so a server never opens a partial file, and servers switch to the
+newest version the next time they check the directory. Mapped pages are
+shared between worker processes and only the pages a request touches are
+read from disk.
+"""
+import json
+import logging
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = os.getenv("MODEL_DIR", "models")
+MODEL_CHECK_SECONDS = float(os.getenv("MODEL_CHECK_SECONDS", "30"))
+MODEL_KEEP_VERSIONS = int(os.getenv("MODEL_KEEP_VERSIONS", "3"))
+
+MAGIC = b"MRVARR1\n"
+SUFFIX = ".arrays"
+ALIGNMENT = 64
+LENGTH = struct.Struct("<I")
+
+# Every store registers itself here so diagnostics and tests can reach it.
+model_stores: Dict[str, "ModelStore"] = {}
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+@dataclass
+class ModelFile:
+    path: Path
+    kind: str
+    version: str
+    meta: Dict[str, Any]
+    arrays: Dict[str, np.ndarray]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+
+def write_model(kind: str, arrays: Dict[str, np.ndarray], meta: Dict[str, Any], directory: str = MODEL_DIR) -> Path:
+    """Write ``arrays`` as the newest version of ``kind`` and return its path."""
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+    header = json.dumps({"kind": kind, "version": version, "meta": meta, "arrays": layout}).encode()
+
+    path = Path(directory) / f"{kind}-{version}{SUFFIX}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f".{path.name}.tmp")
+    with open(temporary, "wb") as f:
+        f.write(MAGIC + LENGTH.pack(len(header)) + header)
+        for name, array in arrays.items():
+            f.write(b"\0" * (_aligned(f.tell()) - f.tell()))
+            f.write(array.data if array.size else b"")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+    return path
+
+
+def open_model(path: Path) -> ModelFile:
+    """Map the file at ``path``; its arrays are read-only views of the mapping."""
+    path = Path(path)
+    with open(path, "rb") as f:
+        prefix = f.read(len(MAGIC) + LENGTH.size)
+        if prefix[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a model file")
+        (length,) = LENGTH.unpack(prefix[len(MAGIC):])
+        header = json.loads(f.read(length))
+    start = _aligned(len(MAGIC) + LENGTH.size + length)
+    mapped = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype, shape = np.dtype(spec["dtype"]), tuple(spec["shape"])
+        begin = start + spec["offset"]
+        end = begin + dtype.itemsize * int(np.prod(shape, dtype=np.int64))
+        if end > len(mapped):
+            raise ValueError(f"{path} is truncated")
+        arrays[name] = mapped[begin:end].view(dtype).reshape(shape)
+    return ModelFile(path, header["kind"], header["version"], header["meta"], arrays)
+
+
+def model_paths(kind: str, directory: str = MODEL_DIR) -> List[Path]:
+    """Versions of ``kind`` in ``directory``, oldest first."""
+    return sorted(Path(directory).glob(f"{kind}-*{SUFFIX}"))
+
+
+def prune_models(kind: str, keep: int = MODEL_KEEP_VERSIONS, directory: str = MODEL_DIR) -> List[Path]:
+    """Delete all but the ``keep`` newest versions. Servers still mapping a
+    deleted file keep reading it until they switch."""
+    removed = model_paths(kind, directory)[:-keep] if keep > 0 else []
+    for path in removed:
+        path.unlink(missing_ok=True)
+    return removed
+
+
+class ModelStore:
+    """The newest model file of one kind, reopened when a newer one appears.
+
+    The directory is listed at most every ``check_seconds``; in between,
+    ``current`` is a couple of attribute reads. A file that fails to open is
+    logged and the previous model keeps serving.
+    """
+
+    def __init__(self, kind: str, directory: str = MODEL_DIR, check_seconds: float = MODEL_CHECK_SECONDS):
+        self.kind = kind
+        self.directory = directory
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._model: Optional[ModelFile] = None
+        self._checked_at: Optional[float] = None
+        self.loads = 0
+        self.load_errors = 0
+
+    def _fresh(self, now: float) -> bool:
+        return self._checked_at is not None and now - self._checked_at < self.check_seconds
+
+    def current(self) -> Optional[ModelFile]:
+        if self._fresh(time.monotonic()):
+            return self._model
+        with self._lock:
+            now = time.monotonic()
+            if self._fresh(now):
+                return self._model
+            self._checked_at = now
+            paths = model_paths(self.kind, self.directory)
+            if paths and (self._model is None or paths[-1] != self._model.path):
+                try:
+                    self._model = open_model(paths[-1])
+                    self.loads += 1
+                    logger.info("Loaded %s model %s", self.kind, self._model.version)
+                except (OSError, ValueError, KeyError):
+                    self.load_errors += 1
+                    logger.exception("Could not open %s", paths[-1])
+            return self._model
+
+    def clear(self) -> None:
+        """Forget the open model; the next call looks at the directory again."""
+        with self._lock:
+            self._model = None
+            self._checked_at = None
+
+    def stats(self) -> Dict[str, Any]:
+        model = self._model
+        return {
+            "version": model.version if model else None,
+            "path": str(model.path) if model else None,
+            "meta": model.meta if model else None,
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+        }
+
+
+def model_store(kind: str, **options: Any) -> ModelStore:
+    store = ModelStore(kind, **options)
+    model_stores[kind] = store
+    return store
@@ -0,0 +1,41 @@
+from typing import Dict, Iterable
+
+from sqlalchemy.orm import Session
+
+from app.models.genre import Genre
+from app.models.movie import Movie, MovieCredit
+from app.models.review import Review
+from app.services.base_service import BaseEntityService
+from app.services.cast_and_crew import cast_and_crew_autocomplete
+from app.services.genre import genre_autocomplete
+from app.services.similar_movies import similar_movies_index
+
+
+class MovieService(BaseEntityService[Movie]):
+    def __init__(self):
+        super().__init__(
+            Movie,
+            relationships={
+                'genres': {
+                    'model': Genre,
+                    'field_name': 'genre_ids',
+                    'relationship_attr': 'genres',
+                    'load': 'selectin',
+                }
+            },
+            sortable_fields=['id', 'title', 'release_date', 'rating_mean', 'rating_count'],
+            filterable_fields=['title', 'release_date'],
+            dependents=[Review.movie_id, MovieCredit.movie_id],
+        )
+        # Genres are ranked by how many movies they have.
+        self.add_write_listener(lambda action, ids: genre_autocomplete.invalidate())
+        # Deleting a movie deletes its credits, which people are ranked by.
+        self.add_write_listener(
+            lambda action, ids: cast_and_crew_autocomplete.invalidate() if action == 'delete' else None
+        )
+        self.add_write_listener(similar_movies_index.mark_movies_stale)
+
+    def get_by_ids(self, db: Session, ids: Iterable[int]) -> Dict[int, Movie]:
+        """Movies of ``ids`` that exist, with their genres, by id."""
+        return {movie.id: movie for movie in db.scalars(self._select().where(Movie.id.in_(list(ids))))}
+
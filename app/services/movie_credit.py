@@ -0,0 +1,19 @@
+from app.models.movie import MovieCredit
+from app.services.base_service import BaseEntityService
+from app.services.cast_and_crew import cast_and_crew_autocomplete
+from app.services.position import position_autocomplete
+from app.services.similar_movies import similar_movies_index
+
+
+class MovieCreditService(BaseEntityService[MovieCredit]):
+    def __init__(self):
+        super().__init__(
+            MovieCredit,
+            sortable_fields=['id', 'billing_order'],
+            filterable_fields=['movie_id', 'cast_and_crew_id', 'position_id'],
+        )
+        # Positions are ranked by how many credits they have.
+        self.add_write_listener(lambda action, ids: position_autocomplete.invalidate())
+        # People are ranked by how many credits they have.
+        self.add_write_listener(cast_and_crew_autocomplete.mark_counted_stale)
+        self.add_write_listener(similar_movies_index.mark_credits_stale)
@@ -0,0 +1,84 @@
+import base64
+import binascii
+import json
+import os
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Generic, List, Optional, Tuple, TypeVar
+
+from fastapi import HTTPException, status
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_PAGE_LIMIT = int(os.getenv("DEFAULT_PAGE_LIMIT", "100"))
+MAX_PAGE_LIMIT = int(os.getenv("MAX_PAGE_LIMIT", "1000"))
+
+T = TypeVar("T")
+
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+def parse_sort(sort: Optional[str], sortable_fields: List[str]) -> Tuple[str, bool]:
+    """Split ``name`` / ``-name`` into the field and a descending flag."""
+    sort = sort or sortable_fields[0]
+    descending = sort.startswith("-")
+    field = sort.lstrip("-")
+    if field not in sortable_fields:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot sort by '{field}'. Sortable fields: {', '.join(sortable_fields)}"
+        )
+    return field, descending
+
+
+def encode_cursor(sort: str, value: Any, id: int) -> str:
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    payload = json.dumps({"sort": sort, "after": [value, id]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, int]:
+    """Return the ``(sort value, id)`` of the last row of the previous page."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value, id = payload["after"]
+        cursor_sort = payload["sort"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if cursor_sort != sort:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor was issued for a different sort order"
+        )
+    return value, int(id)
+
+
+def coerce_value(column: Any, raw: Any) -> Any:
+    """Convert a query-string or cursor value to the column's Python type."""
+    if raw is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return raw
+    try:
+        if python_type is date:
+            return date.fromisoformat(raw)
+        if python_type is datetime:
+            return datetime.fromisoformat(raw)
+        if python_type is bool and isinstance(raw, str):
+            return raw.lower() in ("1", "true", "yes")
+        return python_type(raw)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid value '{raw}' for '{column.key}'"
+        )
@@ -0,0 +1,190 @@
+import argparse
+import asyncio
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+load_dotenv()
+
+# "thread" relies on bcrypt releasing the GIL while it hashes; "process"
+# sidesteps the GIL entirely at the cost of pickling every call.
+PASSWORD_EXECUTOR = os.getenv("PASSWORD_EXECUTOR", "thread")
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", "0")) or (os.cpu_count() or 1)
+PASSWORD_MAX_PENDING = int(os.getenv("PASSWORD_MAX_PENDING", "0")) or PASSWORD_WORKERS * 4
+PASSWORD_RETRY_AFTER_SECONDS = 1
+# The first scheme hashes new passwords; the others are only accepted for
+# verification and are replaced on the next successful login.
+PASSWORD_SCHEMES = [scheme.strip() for scheme in os.getenv("PASSWORD_SCHEMES", "bcrypt").split(",") if scheme.strip()]
+# Cost of the first scheme (log2 rounds for bcrypt). When set, hashes with
+# any other cost are rehashed on login; unset keeps passlib's default.
+PASSWORD_ROUNDS = int(os.getenv("PASSWORD_ROUNDS", "0")) or None
+
+# Stored hashes predate configurable schemes and are all bcrypt.
+LEGACY_SCHEMES = ["bcrypt"]
+# Schemes whose rounds setting is a log2 cost rather than an iteration count.
+LOG_ROUNDS_SCHEMES = ("bcrypt", "bcrypt_sha256")
+
+
+def build_context(schemes: List[str], rounds: Optional[int] = None) -> CryptContext:
+    schemes = schemes + [scheme for scheme in LEGACY_SCHEMES if scheme not in schemes]
+    options = {}
+    if rounds:
+        for option in ("default_rounds", "min_rounds", "max_rounds"):
+            options[f"{schemes[0]}__{option}"] = rounds
+    return CryptContext(schemes=schemes, deprecated="auto", **options)
+
+
+pwd_context = build_context(PASSWORD_SCHEMES, PASSWORD_ROUNDS)
+
+T = TypeVar("T")
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def password_needs_update(hashed_password: str) -> bool:
+    """Whether a hash uses a deprecated scheme or a cost other than the configured one."""
+    return pwd_context.needs_update(hashed_password)
+
+
+def password_pool_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many password checks in progress, try again shortly",
+        headers={"Retry-After": str(PASSWORD_RETRY_AFTER_SECONDS)},
+    )
+
+
+class PasswordPool:
+    """Dedicated executor for password hashing, separate from the request thread pool.
+
+    At most ``max_pending`` calls may be queued or running. Beyond that a
+    call fails at once with a 503, so a login burst is shed instead of
+    piling up behind the workers and starving every other endpoint.
+    """
+
+    def __init__(self, workers: int, max_pending: int, kind: str = "thread"):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown password executor '{kind}', expected 'thread' or 'process'")
+        self.workers = workers
+        self.max_pending = max_pending
+        self.kind = kind
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> Executor:
+        # Created on first use so that importing the app never forks.
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password")
+        return self._executor
+
+    def _done(self, _future: Future) -> None:
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise password_pool_busy()
+            self.pending += 1
+            executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            with self._lock:
+                self.pending -= 1
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable[..., T], *args: Any) -> T:
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_pool = PasswordPool(PASSWORD_WORKERS, PASSWORD_MAX_PENDING, PASSWORD_EXECUTOR)
+
+
+def time_verify(context: CryptContext, samples: int = 5) -> float:
+    """Median seconds one verify takes with ``context`` on this machine."""
+    hashed = context.hash("calibration-password")
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.verify("calibration-password", hashed)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def calibrate_rounds(scheme: str, target_seconds: float, samples: int = 5) -> int:
+    """Highest cost of ``scheme`` whose verify time stays within ``target_seconds``."""
+    if scheme in LOG_ROUNDS_SCHEMES:
+        # Every extra round doubles the cost, so step up until the target is passed.
+        rounds = 4
+        while rounds < 31 and time_verify(build_context([scheme], rounds + 1), samples) <= target_seconds:
+            rounds += 1
+        return rounds
+    # Iteration counts scale linearly: measure once at the default and extrapolate.
+    context = build_context([scheme])
+    default_rounds = context.handler(scheme).default_rounds
+    seconds = time_verify(context, samples)
+    return max(1, int(default_rounds * target_seconds / seconds))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Pick the password hashing cost that meets a target verify time on this machine.",
+    )
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--scheme", default=PASSWORD_SCHEMES[0])
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    rounds = calibrate_rounds(args.scheme, args.target_ms / 1000, args.samples)
+    seconds = time_verify(build_context([args.scheme], rounds), args.samples)
+    print(f"# {args.scheme} verify takes {seconds * 1000:.0f} ms at this cost")
+    print(f"PASSWORD_SCHEMES={args.scheme}")
+    print(f"PASSWORD_ROUNDS={rounds}")
+
+
+if __name__ == "__main__":
+    main()
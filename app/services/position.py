@@ -1,8 +1,26 @@
+from sqlalchemy import func, select
+
+from app.models.movie import MovieCredit
 from app.models.position import Position
+from app.services.autocomplete import AutocompleteSource, autocomplete_index
 from app.services.base_service import BaseEntityService
+from app.services.cache import reference_cache
+
+position_cache = reference_cache("positions")
+position_autocomplete = autocomplete_index("positions", AutocompleteSource(
+    Position,
+    [Position.name],
+    popularity=select(func.count()).where(MovieCredit.position_id == Position.id).scalar_subquery(),
+))
 
 
 class PositionService(BaseEntityService[Position]):
     def __init__(self):
-        super().__init__(Position)
+        super().__init__(
+            Position,
+            sortable_fields=['id', 'name'],
+            filterable_fields=['name'],
+            cache=position_cache,
+            autocomplete=position_autocomplete,
+        )
 
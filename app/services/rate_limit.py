@@ -0,0 +1,182 @@
+import math
+import os
+import threading
+import time
+from array import array
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+
+load_dotenv()
+
+LOGIN_RATE_LIMIT_ENABLED = os.getenv("LOGIN_RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+LOGIN_RATE_LIMIT_PER_IP = int(os.getenv("LOGIN_RATE_LIMIT_PER_IP", "30"))
+LOGIN_RATE_LIMIT_PER_IDENTIFIER = int(os.getenv("LOGIN_RATE_LIMIT_PER_IDENTIFIER", "10"))
+LOGIN_RATE_LIMIT_WINDOW_SECONDS = float(os.getenv("LOGIN_RATE_LIMIT_WINDOW_SECONDS", "60"))
+# Sketch size: width * depth counters per slot, 4 bytes each. Larger widths
+# make over-counting from hash collisions rarer.
+RATE_LIMIT_SKETCH_WIDTH = int(os.getenv("RATE_LIMIT_SKETCH_WIDTH", "4096"))
+RATE_LIMIT_SKETCH_DEPTH = int(os.getenv("RATE_LIMIT_SKETCH_DEPTH", "4"))
+RATE_LIMIT_SLOTS = int(os.getenv("RATE_LIMIT_SLOTS", "6"))
+
+
+class RateLimitBackend:
+    """Counts hits per key over a sliding window.
+
+    The in-process sketch below is the only implementation; a store shared
+    between workers (Redis, say) would implement hit and reset the same way.
+    """
+
+    window_seconds: float
+
+    def hit(self, key: str) -> int:
+        """Record one hit for ``key`` and return its count in the current window."""
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class SlidingWindowSketch(RateLimitBackend):
+    """Sliding-window counts in fixed memory: a ring of count-min sketches.
+
+    The window is split into ``slots`` sub-windows, each with its own
+    ``depth`` x ``width`` counter table. A hit increments one counter per
+    row in the current slot and in a running total of the whole ring; a
+    key's count is the minimum of its total counters. Like any count-min
+    sketch it may over-count on collisions but never under-counts.
+    Advancing to a new slot subtracts the oldest one from the totals and
+    zeroes it, so memory never grows with the number of keys.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float,
+        slots: int = RATE_LIMIT_SLOTS,
+        width: int = RATE_LIMIT_SKETCH_WIDTH,
+        depth: int = RATE_LIMIT_SKETCH_DEPTH,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.window_seconds = window_seconds
+        self.slots = slots
+        self.width = width
+        self.depth = depth
+        self.slot_seconds = window_seconds / slots
+        self._clock = clock
+        self._tables = [array("I", bytes(4 * width * depth)) for _ in range(slots)]
+        self._totals = array("I", bytes(4 * width * depth))
+        self._current = self._slot_number()
+        self._lock = threading.Lock()
+
+    def _slot_number(self) -> int:
+        return int(self._clock() // self.slot_seconds)
+
+    def _advance(self) -> None:
+        slot = self._slot_number()
+        # Zero every slot that fell out of the window since the last hit.
+        expired = range(self._current + 1, min(slot, self._current + self.slots) + 1)
+        if len(expired) == self.slots:
+            self._zero_all()
+        else:
+            for number in expired:
+                table = self._tables[number % self.slots]
+                self._totals = array("I", map(int.__sub__, self._totals, table))
+                table[:] = array("I", bytes(4 * len(table)))
+        self._current = max(self._current, slot)
+
+    def _zero_all(self) -> None:
+        for table in self._tables + [self._totals]:
+            table[:] = array("I", bytes(4 * len(table)))
+
+    def _cells(self, key: str):
+        return [row * self.width + hash((row, key)) % self.width for row in range(self.depth)]
+
+    def hit(self, key: str) -> int:
+        cells = self._cells(key)
+        with self._lock:
+            self._advance()
+            current = self._tables[self._current % self.slots]
+            totals = self._totals
+            for cell in cells:
+                current[cell] += 1
+                totals[cell] += 1
+            return min(totals[cell] for cell in cells)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._zero_all()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_seconds": self.window_seconds,
+            "slots": self.slots,
+            "width": self.width,
+            "depth": self.depth,
+            "memory_bytes": sum(table.itemsize * len(table) for table in self._tables + [self._totals]),
+        }
+
+
+class LoginRateLimiter:
+    """Per-IP and per-identifier attempt limits for the login endpoint.
+
+    Every attempt counts, successful or not, and the check runs before any
+    database lookup or password verification.
+    """
+
+    def __init__(self, backend: RateLimitBackend, per_ip: int, per_identifier: int):
+        self.backend = backend
+        self.per_ip = per_ip
+        self.per_identifier = per_identifier
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def check(self, ip: Optional[str], identifier: str) -> None:
+        """Raise a 429 when either the client IP or the identifier is over its limit."""
+        over_ip = ip is not None and self.backend.hit(f"ip:{ip}") > self.per_ip
+        over_identifier = self.backend.hit(f"id:{identifier.strip().lower()}") > self.per_identifier
+        if over_ip or over_identifier:
+            with self._lock:
+                self.rejected += 1
+            raise too_many_attempts(self.backend.window_seconds)
+
+    def reset(self) -> None:
+        self.backend.reset()
+        with self._lock:
+            self.rejected = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rejected = self.rejected
+        return {
+            "per_ip": self.per_ip,
+            "per_identifier": self.per_identifier,
+            "rejected": rejected,
+            "backend": self.backend.stats(),
+        }
+
+
+def too_many_attempts(window_seconds: float) -> HTTPException:
+    # Counts slide out gradually; a full window is the longest wait.
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many login attempts, try again later",
+        headers={"Retry-After": str(math.ceil(window_seconds))},
+    )
+
+
+def login_rate_limiter() -> Optional[LoginRateLimiter]:
+    """The configured login limiter, or None when rate limiting is off."""
+    if not LOGIN_RATE_LIMIT_ENABLED:
+        return None
+    return LoginRateLimiter(
+        SlidingWindowSketch(LOGIN_RATE_LIMIT_WINDOW_SECONDS),
+        LOGIN_RATE_LIMIT_PER_IP,
+        LOGIN_RATE_LIMIT_PER_IDENTIFIER,
+    )
+
+
+login_limiter = login_rate_limiter()
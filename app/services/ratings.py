@@ -0,0 +1,161 @@
+"""Verify, and repair, the rating aggregates stored on movies.
+
+The aggregates are maintained by database triggers, so drift should only
+come from writes that bypassed them: rows loaded with triggers disabled, a
+restore, or manual SQL. The job walks movies in id order, one batch per
+transaction, compares each batch with its reviews in one grouped query and
+rewrites only the rows that differ.
+
+    python -m app.services.ratings --batch-size 1000 [--check-only]
+"""
+import argparse
+import logging
+import math
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import Float, case, cast, func, select, update
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.base_entity import utcnow
+from app.models.movie import Movie, RATING_VALUES
+from app.models.review import Review
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+RATING_RECONCILE_BATCH_SIZE = int(os.getenv("RATING_RECONCILE_BATCH_SIZE", "1000"))
+
+HISTOGRAM_COLUMNS = [getattr(Movie, f"rating_{value}") for value in RATING_VALUES]
+
+# (count, sum, mean, *histogram)
+Aggregates = Tuple[Any, ...]
+
+
+@dataclass
+class ReconcileReport:
+    checked: int = 0
+    drifted: List[int] = field(default_factory=list)
+    repaired: int = 0
+
+
+def actual_aggregates(db: Session, movie_ids: List[int]) -> Dict[int, Aggregates]:
+    """Aggregates computed from the reviews of ``movie_ids``, one grouped query."""
+    rows = db.execute(
+        select(
+            Review.movie_id,
+            func.count(),
+            func.sum(Review.rating),
+            *(func.sum(case((Review.rating == value, 1), else_=0)) for value in RATING_VALUES),
+        )
+        .where(Review.movie_id.in_(movie_ids))
+        .group_by(Review.movie_id)
+    )
+    return {
+        movie_id: (count, total, total / count, *histogram)
+        for movie_id, count, total, *histogram in rows
+    }
+
+
+def _matches(stored: Aggregates, actual: Aggregates) -> bool:
+    count, total, mean, *histogram = stored
+    actual_count, actual_total, actual_mean, *actual_histogram = actual
+    if (count, total, histogram) != (actual_count, actual_total, list(actual_histogram)):
+        return False
+    if mean is None or actual_mean is None:
+        return mean is actual_mean
+    return math.isclose(mean, actual_mean, rel_tol=1e-9)
+
+
+def drifted_movie_ids(db: Session, movie_ids: List[int]) -> List[int]:
+    """Those of ``movie_ids`` whose stored aggregates differ from their reviews."""
+    actual = actual_aggregates(db, movie_ids)
+    empty = (0, 0, None, *(0 for _ in RATING_VALUES))
+    stored = db.execute(
+        select(Movie.id, Movie.rating_count, Movie.rating_sum, Movie.rating_mean, *HISTOGRAM_COLUMNS)
+        .where(Movie.id.in_(movie_ids))
+        .order_by(Movie.id)
+    )
+    return [movie_id for movie_id, *values in stored if not _matches(tuple(values), actual.get(movie_id, empty))]
+
+
+def repair_movies(db: Session, movie_ids: List[int]) -> int:
+    """Recompute the aggregates of ``movie_ids`` from their reviews.
+
+    The recomputation is part of the UPDATE itself, so it reads the reviews
+    as of the statement, not as of the earlier check.
+    """
+    reviews = select(Review).where(Review.movie_id == Movie.id)
+    count = reviews.with_only_columns(func.count()).scalar_subquery()
+    total = reviews.with_only_columns(func.coalesce(func.sum(Review.rating), 0)).scalar_subquery()
+    mean = reviews.with_only_columns(func.avg(cast(Review.rating, Float))).scalar_subquery()
+    histogram = {
+        column.key: reviews.with_only_columns(func.count()).where(Review.rating == value).scalar_subquery()
+        for column, value in zip(HISTOGRAM_COLUMNS, RATING_VALUES)
+    }
+    result = db.execute(
+        update(Movie)
+        .where(Movie.id.in_(movie_ids))
+        .values(
+            rating_count=count,
+            rating_sum=total,
+            rating_mean=mean,
+            version=Movie.version + 1,
+            updated_at=utcnow(),
+            **histogram,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def reconcile_ratings(
+    db: Session,
+    batch_size: int = RATING_RECONCILE_BATCH_SIZE,
+    repair: bool = True,
+    after_id: int = 0,
+    max_batches: Optional[int] = None,
+) -> ReconcileReport:
+    """Check every movie after ``after_id`` in batches, repairing drift
+    unless ``repair`` is off. Each batch is its own short transaction."""
+    report = ReconcileReport()
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        movie_ids = list(db.scalars(
+            select(Movie.id).where(Movie.id > after_id).order_by(Movie.id).limit(batch_size)
+        ))
+        if not movie_ids:
+            break
+        drifted = drifted_movie_ids(db, movie_ids)
+        if drifted:
+            logger.warning("Rating aggregates drifted for movies %s", drifted)
+            report.drifted.extend(drifted)
+            if repair:
+                report.repaired += repair_movies(db, drifted)
+        db.commit()
+        report.checked += len(movie_ids)
+        after_id = movie_ids[-1]
+        batches += 1
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=RATING_RECONCILE_BATCH_SIZE)
+    parser.add_argument("--check-only", action="store_true", help="Report drift without repairing it")
+    parser.add_argument("--after-id", type=int, default=0, help="Resume after this movie id")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        report = reconcile_ratings(db, args.batch_size, repair=not args.check_only, after_id=args.after_id)
+    print(f"checked {report.checked} movies, {len(report.drifted)} drifted, {report.repaired} repaired")
+    if report.drifted:
+        print("drifted ids:", " ".join(map(str, report.drifted)))
+
+
+if __name__ == "__main__":
+    main()
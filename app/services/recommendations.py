@@ -0,0 +1,199 @@
+"""Item-item collaborative filtering over reviews.
+
+The offline build streams every review with a user into a sparse item x user
+matrix (CSR held in plain NumPy arrays, see app.services.sparse), centres each user's ratings on
+their mean and takes the adjusted cosine similarity between item columns.
+Similarities are shrunk towards zero when few users rated both items, and
+each item keeps its ``RECOMMENDER_NEIGHBORS`` most similar items. The
+neighbour lists go to a versioned model file:
+
+    python -m app.services.recommendations [--neighbors 50] [--shrinkage 10]
+
+Serving maps the newest file and scores a user's history against it: every
+neighbour of a reviewed movie gains the similarity times how far the
+review's rating is from the middle of the scale, so disliked movies push
+their neighbours down.
+"""
+import argparse
+import logging
+import os
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.movie import Movie, RATING_VALUES
+from app.models.review import Review
+from app.services.model_files import ModelFile, model_store, open_model, prune_models, write_model
+from app.services.movie import MovieService
+from app.services.sparse import CSR, fetch_array, offsets_of, top_k_similar
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+RECOMMENDER_NEIGHBORS = int(os.getenv("RECOMMENDER_NEIGHBORS", "50"))
+RECOMMENDER_SHRINKAGE = float(os.getenv("RECOMMENDER_SHRINKAGE", "10"))
+RECOMMENDER_MAX_USER_RATINGS = int(os.getenv("RECOMMENDER_MAX_USER_RATINGS", "500"))
+RECOMMENDER_BLOCK_CELLS = int(os.getenv("RECOMMENDER_BLOCK_CELLS", str(4 * 1024 * 1024)))
+RECOMMENDER_BATCH_SIZE = int(os.getenv("RECOMMENDER_BATCH_SIZE", "50000"))
+RECOMMENDATIONS_MAX_LIMIT = 100
+
+MODEL_KIND = "item_cf"
+NEUTRAL_RATING = (min(RATING_VALUES) + max(RATING_VALUES)) / 2
+
+item_cf_models = model_store(MODEL_KIND)
+movie_service = MovieService()
+
+
+def stream_ratings(db: Session, batch_size: int = RECOMMENDER_BATCH_SIZE) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """User ids, movie ids and ratings of every review with a user, in
+    review order, as int32 arrays packed batch by batch."""
+    columns = fetch_array(
+        db,
+        select(Review.user_id, Review.movie_id, Review.rating).where(Review.user_id.is_not(None)).order_by(Review.id),
+        width=3,
+        batch_size=batch_size,
+        dtype=np.int32,
+    )
+    return columns[:, 0].copy(), columns[:, 1].copy(), columns[:, 2].copy()
+
+
+def build_item_neighbors(
+    user_ids: np.ndarray,
+    movie_ids: np.ndarray,
+    ratings: np.ndarray,
+    neighbors: int = RECOMMENDER_NEIGHBORS,
+    shrinkage: float = RECOMMENDER_SHRINKAGE,
+    max_user_ratings: int = RECOMMENDER_MAX_USER_RATINGS,
+    block_cells: int = RECOMMENDER_BLOCK_CELLS,
+) -> Dict[str, np.ndarray]:
+    """Model arrays for ratings given in review order: ``movie_ids`` (sorted)
+    and, per movie, the positions of its most similar movies in
+    ``neighbors`` (-1 past the last one) with their ``similarities``.
+
+    The similarities come from ``top_k_similar`` over the item x user
+    matrix, block by block, so the work follows the number of co-rated
+    pairs and memory stays within ``block_cells`` whatever the number of
+    ratings. Only the ``max_user_ratings`` newest ratings of a user count,
+    which bounds the pairs a single prolific user adds.
+    """
+    movie_index, item = np.unique(movie_ids, return_inverse=True)
+    _, user = np.unique(user_ids, return_inverse=True)
+    n_items, n_users = len(movie_index), int(user.max()) + 1 if len(user) else 0
+
+    # User-major order; the stable sort keeps each user's ratings in review order.
+    order = np.argsort(user, kind="stable")
+    user, item, rating = user[order], item[order], ratings[order].astype(np.float64)
+    if max_user_ratings:
+        offsets = offsets_of(user, n_users)
+        newest = offsets[user + 1] - np.arange(len(user)) <= max_user_ratings
+        user, item, rating = user[newest], item[newest], rating[newest]
+
+    # Adjusted cosine: centre on each user's mean. Zero deviations add
+    # nothing to any product, so they are dropped from the matrix.
+    counts = np.bincount(user, minlength=n_users)
+    means = np.bincount(user, weights=rating, minlength=n_users) / np.maximum(counts, 1)
+    value = rating - means[user]
+    nonzero = value != 0
+    matrix = CSR.from_coo(item[nonzero], user[nonzero], value[nonzero], n_items, n_users)
+
+    k = min(neighbors, max(n_items - 1, 0))
+    neighbor_ids, similarities = top_k_similar(matrix, k, shrinkage, block_cells)
+    return {"movie_ids": movie_index.astype(np.int64), "neighbors": neighbor_ids, "similarities": similarities}
+
+
+def build_model(db: Session, **options) -> ModelFile:
+    """Build from the current reviews, write it as a new model version and
+    prune the old ones."""
+    started = time.perf_counter()
+    user_ids, movie_ids, ratings = stream_ratings(db)
+    db.rollback()
+    loaded = time.perf_counter()
+    arrays = build_item_neighbors(user_ids, movie_ids, ratings, **options)
+    meta = {
+        "ratings": len(ratings),
+        "users": len(np.unique(user_ids)),
+        "movies": len(arrays["movie_ids"]),
+        "neighbors": arrays["neighbors"].shape[1],
+        "load_seconds": round(loaded - started, 3),
+        "build_seconds": round(time.perf_counter() - loaded, 3),
+    }
+    path = write_model(MODEL_KIND, arrays, meta, item_cf_models.directory)
+    prune_models(MODEL_KIND, directory=item_cf_models.directory)
+    logger.info("Wrote %s: %s", path, meta)
+    return open_model(path)
+
+
+def score_history(model: ModelFile, movie_ids: List[int], ratings: List[int], limit: int) -> List[Tuple[int, float]]:
+    """``(movie_id, score)`` of the best ``limit`` movies for a user who gave
+    ``ratings`` to ``movie_ids``, excluding those movies. Only the model
+    rows of the history are read from the mapping."""
+    known = model["movie_ids"]
+    history = np.asarray(movie_ids, dtype=np.int64)
+    positions = np.minimum(np.searchsorted(known, history), max(len(known) - 1, 0))
+    found = known[positions] == history if len(known) else np.zeros(len(history), dtype=bool)
+    items = positions[found]
+    weights = np.asarray(ratings, dtype=np.float64)[found] - NEUTRAL_RATING
+
+    neighbors = model["neighbors"][items]
+    contributions = model["similarities"][items] * weights[:, None]
+    valid = neighbors >= 0
+    candidates, inverse = np.unique(neighbors[valid], return_inverse=True)
+    scores = np.bincount(inverse, weights=contributions[valid], minlength=len(candidates))
+    keep = (scores > 0) & ~np.isin(candidates, items)
+    candidates, scores = candidates[keep], scores[keep]
+    if len(candidates) > limit:
+        best = np.argpartition(-scores, limit - 1)[:limit]
+        candidates, scores = candidates[best], scores[best]
+    order = np.argsort(-scores, kind="stable")
+    return list(zip(known[candidates[order]].tolist(), scores[order].tolist()))
+
+
+def recommend_movies(db: Session, model: ModelFile, user_id: int, limit: int) -> List[Tuple[Movie, float]]:
+    """Movies for ``user_id`` from their newest reviews, best first. Movies
+    deleted since the build are skipped."""
+    history = db.execute(
+        select(Review.movie_id, Review.rating)
+        .where(Review.user_id == user_id)
+        .order_by(Review.id.desc())
+        .limit(RECOMMENDER_MAX_USER_RATINGS)
+    ).all()
+    if not history:
+        return []
+    movie_ids, ratings = zip(*history)
+    scored = score_history(model, list(movie_ids), list(ratings), limit)
+    if not scored:
+        return []
+    movies = movie_service.get_by_ids(db, [id for id, _ in scored])
+    return [(movies[id], score) for id, score in scored if id in movies]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--neighbors", type=int, default=RECOMMENDER_NEIGHBORS)
+    parser.add_argument("--shrinkage", type=float, default=RECOMMENDER_SHRINKAGE)
+    parser.add_argument("--max-user-ratings", type=int, default=RECOMMENDER_MAX_USER_RATINGS,
+                        help="Newest ratings per user that count, 0 for all")
+    parser.add_argument("--block-cells", type=int, default=RECOMMENDER_BLOCK_CELLS,
+                        help="Upper bound on the similarity cells computed at once")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with SessionLocal() as db:
+        model = build_model(
+            db,
+            neighbors=args.neighbors,
+            shrinkage=args.shrinkage,
+            max_user_ratings=args.max_user_ratings,
+            block_cells=args.block_cells,
+        )
+    print(f"wrote {model.path}: {model.meta}")
+
+
+if __name__ == "__main__":
+    main()
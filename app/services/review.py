@@ -0,0 +1,18 @@
+from app.models.review import Review
+from app.services.base_service import BaseEntityService
+
+
+class ReviewService(BaseEntityService[Review]):
+    """Reviews. Writes need nothing extra for the movie's rating aggregates:
+    the database applies them in the same statement (see RatingAggregates).
+
+    Each review belongs to the user who wrote it, and only they can change
+    or delete it."""
+
+    def __init__(self):
+        super().__init__(
+            Review,
+            sortable_fields=['id', 'rating'],
+            filterable_fields=['movie_id', 'user_id', 'rating'],
+            owner_field='user_id',
+        )
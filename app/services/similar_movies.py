@@ -0,0 +1,548 @@
+"""Content-based "more like this" from genres, cast and crew, and countries.
+
+Each movie is a TF-IDF vector over tokens of what it is linked to:
+
+    genre     each genre of the movie
+    person    each credited person, whatever their part
+    role      each person in each position, so a shared director weighs
+              more than the same person acting in both
+    country   the countries of the credited people, 1 + log(people) each
+
+Token weights are ``tf x idf x FEATURE_WEIGHTS[kind]`` and every vector is
+normalised, so the similarity of two movies is the dot product of their
+vectors. Movies without reviews get neighbours as soon as they have a genre
+or a credit, which is what the collaborative recommender cannot do.
+
+The index answers from memory. Vectors are split by column: the
+``SIMILAR_MOVIES_DENSE_FEATURES`` most frequent tokens (genres, big
+countries, prolific people) form a dense float32 matrix multiplied block by
+block with BLAS, and the long tail is a CSR matrix whose products are
+gathered through its transpose (see app.services.sparse). Every movie keeps
+its ``SIMILAR_MOVIES_NEIGHBORS`` best neighbours.
+
+Writes to movies, credits and people mark movies stale, and the next lookup
+re-encodes only those. Their new vectors are patched over the built
+matrices, their neighbour lists are recomputed, and in every other list
+only their own entries are inserted, rescored or dropped; a list is
+recomputed only when a changed movie falls out of a full list, since its
+successor is unknown. Document frequencies stay as they were at the build
+until more than ``SIMILAR_MOVIES_MAX_PATCHES`` movies are patched, which
+triggers a rebuild.
+
+Builds are quadratic in the number of movies, so they never run inside a
+lookup. The app starts one in a background thread at startup, and rebuilds
+run there too while the old index keeps answering. Writes made while a
+build reads its snapshot are replayed as patches once it is swapped in.
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy import distinct, func, select
+from sqlalchemy.orm import Session
+
+from app.models.cast_and_crew import cast_and_crew_countries
+from app.models.movie import Movie, MovieCredit, movie_genres
+from app.services.sparse import CSR, fetch_array
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SIMILAR_MOVIES_NEIGHBORS = int(os.getenv("SIMILAR_MOVIES_NEIGHBORS", "50"))
+SIMILAR_MOVIES_DENSE_FEATURES = int(os.getenv("SIMILAR_MOVIES_DENSE_FEATURES", "256"))
+SIMILAR_MOVIES_BLOCK_CELLS = int(os.getenv("SIMILAR_MOVIES_BLOCK_CELLS", str(4 * 1024 * 1024)))
+SIMILAR_MOVIES_MAX_PATCHES = int(os.getenv("SIMILAR_MOVIES_MAX_PATCHES", "1000"))
+SIMILAR_MOVIES_BATCH_SIZE = 50_000
+
+GENRE, PERSON, ROLE, COUNTRY = range(4)
+FEATURE_WEIGHTS = np.array([1.0, 1.0, 0.5, 0.5])
+
+
+def token_keys(kind: int, ids: np.ndarray, sub_ids: Optional[np.ndarray] = None) -> np.ndarray:
+    """One int64 per token: the kind in the low two bits, then the id, then
+    for roles the position id."""
+    keys = ids.astype(np.int64) << 2 | kind
+    if sub_ids is not None:
+        keys |= sub_ids.astype(np.int64) << 34
+    return keys
+
+
+@dataclass
+class Features:
+    movie_ids: np.ndarray
+    # One entry per token of a movie.
+    movies: np.ndarray
+    keys: np.ndarray
+    tf: np.ndarray
+    # (credit id, movie id), to map credit writes back to movies.
+    credits: np.ndarray
+
+
+def load_features(db: Session, movie_ids: Optional[Iterable[int]] = None) -> Features:
+    """Tokens of every movie, or of ``movie_ids``; four streamed queries."""
+    def restrict(stmt, column):
+        return stmt if movie_ids is None else stmt.where(column.in_(list(movie_ids)))
+
+    fetch = partial(fetch_array, db, batch_size=SIMILAR_MOVIES_BATCH_SIZE)
+    ids = fetch(restrict(select(Movie.id), Movie.id).order_by(Movie.id), 1)[:, 0]
+    genres = fetch(restrict(select(movie_genres.c.movie_id, movie_genres.c.genre_id), movie_genres.c.movie_id), 2)
+    credits = fetch(restrict(
+        select(MovieCredit.id, MovieCredit.movie_id, MovieCredit.cast_and_crew_id, MovieCredit.position_id),
+        MovieCredit.movie_id,
+    ).order_by(MovieCredit.id), 4)
+    countries = fetch(restrict(
+        select(MovieCredit.movie_id, cast_and_crew_countries.c.country_id, func.count(distinct(MovieCredit.cast_and_crew_id)))
+        .join(cast_and_crew_countries, cast_and_crew_countries.c.cast_and_crew_id == MovieCredit.cast_and_crew_id)
+        .group_by(MovieCredit.movie_id, cast_and_crew_countries.c.country_id),
+        MovieCredit.movie_id,
+    ), 3)
+    people = np.unique(credits[:, 1:3], axis=0)
+    return Features(
+        movie_ids=ids,
+        movies=np.concatenate([genres[:, 0], people[:, 0], credits[:, 1], countries[:, 0]]),
+        keys=np.concatenate([
+            token_keys(GENRE, genres[:, 1]),
+            token_keys(PERSON, people[:, 1]),
+            token_keys(ROLE, credits[:, 2], credits[:, 3]),
+            token_keys(COUNTRY, countries[:, 1]),
+        ]),
+        tf=np.concatenate([np.ones(len(genres) + len(people) + len(credits)), 1 + np.log(countries[:, 2])]),
+        credits=credits[:, :2],
+    )
+
+
+def tfidf(rows: np.ndarray, keys: np.ndarray, tf: np.ndarray, idf: np.ndarray, n_rows: int) -> np.ndarray:
+    """Token weights, normalised per row."""
+    values = FEATURE_WEIGHTS[keys & 3] * tf * idf
+    norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=n_rows))[rows]
+    return values / np.where(norms > 0, norms, 1)
+
+
+class MovieVectors:
+    """Encoded movies and their neighbour lists; one build plus patches.
+
+    Rows are positions in ``ids``. Columns are positions in the build's
+    ``vocabulary``, then tokens first seen later, which count as unique
+    (idf of a single movie) until the next build.
+    """
+
+    def __init__(self, features: Features, neighbors: int, dense_features: int, block_cells: int):
+        self.k = neighbors
+        self.block_cells = block_cells
+        self.n = len(features.movie_ids)
+        self.ids = features.movie_ids.astype(np.int64)
+        self.positions = {id: row for row, id in enumerate(self.ids.tolist())}
+        self.removed = np.zeros(self.n, dtype=bool)
+        self.patched = np.zeros(self.n, dtype=bool)
+
+        rows = np.searchsorted(self.ids, features.movies)
+        self.vocabulary, columns = np.unique(features.keys, return_inverse=True)
+        frequency = np.bincount(columns, minlength=len(self.vocabulary))
+        self.idf = np.log(max(self.n, 1) / np.maximum(frequency, 1))
+        self.new_token_idf = np.log(max(self.n, 1))
+        self.new_columns: Dict[int, int] = {}
+        values = tfidf(rows, features.keys, features.tf, self.idf[columns], self.n)
+
+        dense_columns = np.argsort(-frequency, kind="stable")[:dense_features]
+        self.dense_column = np.full(len(self.vocabulary), -1, dtype=np.int64)
+        self.dense_column[dense_columns] = np.arange(len(dense_columns))
+        is_dense = self.dense_column[columns] >= 0
+        self.dense = np.zeros((self.n, len(dense_columns)), dtype=np.float32)
+        self.dense[rows[is_dense], self.dense_column[columns[is_dense]]] = values[is_dense]
+        self.sparse = CSR.from_coo(rows[~is_dense], columns[~is_dense], values[~is_dense], self.n, len(self.vocabulary))
+        self.postings = self.sparse.transpose()
+        # Sparse entries of patched rows, by row and by column.
+        self.patches: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self.patch_postings: Dict[int, Dict[int, float]] = {}
+
+        self.neighbors = np.full((self.n, neighbors), -1, dtype=np.int32)
+        self.scores = np.zeros((self.n, neighbors), dtype=np.float32)
+        self.credit_ids, self.credit_movies = features.credits[:, 0], features.credits[:, 1]
+        self.moved_credits: Dict[int, int] = {}
+        self.reranked = 0
+        self.rank(np.arange(self.n))
+        # Lists recomputed by updates since the build.
+        self.reranked = 0
+
+    def _sparse_entries(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """``(owner, column, value)`` of the sparse entries of ``rows``."""
+        plain = np.flatnonzero(~self.patched[rows])
+        owner, positions = self.sparse.entries(rows[plain])
+        parts = [(plain[owner], self.sparse.columns[positions], self.sparse.values[positions])]
+        for index in np.flatnonzero(self.patched[rows]).tolist():
+            columns, values = self.patches.get(int(rows[index]), (np.empty(0, np.int64), np.empty(0)))
+            parts.append((np.full(len(columns), index), columns, values))
+        return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+
+    def similarities(self, rows: np.ndarray) -> np.ndarray:
+        """Similarity of ``rows`` with every movie, as a rows x movies array;
+        zero with themselves and with removed movies."""
+        n = self.n
+        result = self.dense[rows] @ self.dense[:n].T
+        owner, columns, values = self._sparse_entries(rows)
+        built = columns < self.postings.n_rows
+        via, expanded = self.postings.entries(columns[built])
+        others = self.postings.columns[expanded]
+        current = ~self.patched[others]
+        cells = [(owner[built][via] * n + others)[current]]
+        products = [(self.postings.values[expanded] * values[built][via])[current]]
+        if self.patch_postings:
+            patched = [
+                (index * n + row, value * weight)
+                for index, column, value in zip(owner.tolist(), columns.tolist(), values.tolist())
+                for row, weight in self.patch_postings.get(column, {}).items()
+            ]
+            if patched:
+                patched_cells, patched_products = zip(*patched)
+                cells.append(np.array(patched_cells, dtype=np.int64))
+                products.append(np.array(patched_products))
+        result += np.bincount(
+            np.concatenate(cells), weights=np.concatenate(products), minlength=len(rows) * n,
+        ).reshape(len(rows), n).astype(np.float32)
+        result[np.arange(len(rows)), rows] = 0
+        result[:, self.removed[:n]] = 0
+        return result
+
+    def rank(self, rows: np.ndarray) -> None:
+        """Recompute the neighbour lists of ``rows``."""
+        k = min(self.k, self.n)
+        size = max(1, self.block_cells // max(self.n, 1))
+        for start in range(0, len(rows), size):
+            block = rows[start:start + size]
+            similarity = self.similarities(block)
+            top = np.argpartition(-similarity, k - 1, axis=1)[:, :k] if k else np.empty((len(block), 0), np.int64)
+            scores = np.take_along_axis(similarity, top, axis=1)
+            order = np.argsort(-scores, axis=1, kind="stable")
+            top, scores = np.take_along_axis(top, order, axis=1), np.take_along_axis(scores, order, axis=1)
+            top[scores <= 0] = -1
+            scores[scores <= 0] = 0
+            self.neighbors[block] = -1
+            self.scores[block] = 0
+            self.neighbors[block, :k] = top
+            self.scores[block, :k] = scores
+        self.reranked += len(rows)
+
+    def _grow(self, rows: int) -> None:
+        capacity = len(self.ids)
+        if self.n + rows <= capacity:
+            return
+        extra = max(self.n + rows, 2 * capacity) - capacity
+        self.ids = np.concatenate([self.ids, np.zeros(extra, dtype=np.int64)])
+        self.removed = np.concatenate([self.removed, np.zeros(extra, dtype=bool)])
+        self.patched = np.concatenate([self.patched, np.zeros(extra, dtype=bool)])
+        self.dense = np.concatenate([self.dense, np.zeros((extra, self.dense.shape[1]), dtype=np.float32)])
+        self.neighbors = np.concatenate([self.neighbors, np.full((extra, self.k), -1, dtype=np.int32)])
+        self.scores = np.concatenate([self.scores, np.zeros((extra, self.k), dtype=np.float32)])
+
+    def _columns(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Columns and idf of ``keys``, adding columns for unseen tokens."""
+        size = len(self.vocabulary)
+        positions = np.searchsorted(self.vocabulary, keys)
+        known = positions < size
+        known[known] = self.vocabulary[positions[known]] == keys[known]
+        columns, idf = positions.copy(), np.full(len(keys), self.new_token_idf)
+        idf[known] = self.idf[positions[known]]
+        for index in np.flatnonzero(~known).tolist():
+            columns[index] = self.new_columns.setdefault(int(keys[index]), size + len(self.new_columns))
+        return columns, idf
+
+    def movies_of_credits(self, credit_ids: Iterable[int]) -> Set[int]:
+        """Movies the credits belonged to when last seen."""
+        movies = set()
+        for credit_id in credit_ids:
+            if credit_id in self.moved_credits:
+                movies.add(self.moved_credits[credit_id])
+                continue
+            position = np.searchsorted(self.credit_ids, credit_id)
+            if position < len(self.credit_ids) and self.credit_ids[position] == credit_id:
+                movies.add(int(self.credit_movies[position]))
+        return movies
+
+    def _patch(self, rows: np.ndarray, features: Features) -> None:
+        """Replace the vectors of ``rows`` with their tokens in ``features``."""
+        for row in rows.tolist():
+            columns, _ = self.patches.pop(row, (np.empty(0, np.int64), None))
+            for column in columns.tolist():
+                self.patch_postings[column].pop(row, None)
+                if not self.patch_postings[column]:
+                    del self.patch_postings[column]
+            self.patches[row] = (np.empty(0, np.int64), np.empty(0))
+        self.patched[rows] = True
+        self.dense[rows] = 0
+
+        token_rows = np.array([self.positions[id] for id in features.movies.tolist()], dtype=np.int64)
+        local = np.searchsorted(features.movie_ids, features.movies)
+        columns, idf = self._columns(features.keys)
+        values = tfidf(local, features.keys, features.tf, idf, len(features.movie_ids))
+        dense = np.zeros(len(columns), dtype=bool)
+        built = columns < len(self.vocabulary)
+        dense[built] = self.dense_column[columns[built]] >= 0
+        self.dense[token_rows[dense], self.dense_column[columns[dense]]] = values[dense]
+        for row, column, value in zip(token_rows[~dense].tolist(), columns[~dense].tolist(), values[~dense].tolist()):
+            self.patch_postings.setdefault(column, {})[row] = value
+        order = np.argsort(token_rows[~dense], kind="stable")
+        sparse_rows, sparse_columns, sparse_values = token_rows[~dense][order], columns[~dense][order], values[~dense][order]
+        for row in np.unique(sparse_rows).tolist():
+            span = slice(np.searchsorted(sparse_rows, row), np.searchsorted(sparse_rows, row, side="right"))
+            self.patches[row] = (sparse_columns[span], sparse_values[span])
+        for credit_id, movie_id in features.credits.tolist():
+            self.moved_credits[credit_id] = movie_id
+
+    def _merge(self, row: int, similarity: np.ndarray, skip: np.ndarray, rerank: Set[int]) -> None:
+        """Bring every list up to date with the new similarities to ``row``."""
+        n = self.n
+        neighbors, scores = self.neighbors[:n], self.scores[:n]
+        full = neighbors[:, -1] >= 0
+        tail = np.where(full, scores[:, -1], 0)
+
+        listed, slots = np.nonzero(neighbors == row)
+        contains = np.zeros(n, dtype=bool)
+        contains[listed] = True
+        kept = ~skip[listed]
+        listed, slots = listed[kept], slots[kept]
+        new = similarity[listed]
+        # Below the tail of a full list its successor is unknown.
+        lost = full[listed] & (new < tail[listed])
+        rerank.update(listed[lost].tolist())
+        listed, slots, new = listed[~lost], slots[~lost], new[~lost]
+        scores[listed, slots] = np.maximum(new, 0)
+        neighbors[listed[new <= 0], slots[new <= 0]] = -1
+
+        entering = np.flatnonzero((similarity > tail) & (similarity > 0) & ~contains & ~skip)
+        neighbors[entering, -1] = row
+        scores[entering, -1] = similarity[entering]
+
+        touched = np.concatenate([listed, entering])
+        order = np.argsort(-scores[touched], axis=1, kind="stable")
+        neighbors[touched] = np.take_along_axis(neighbors[touched], order, axis=1)
+        scores[touched] = np.take_along_axis(scores[touched], order, axis=1)
+
+    def update(self, movie_ids: Iterable[int], features: Features) -> None:
+        """Re-encode ``movie_ids`` from ``features``; ids without features
+        were deleted."""
+        present = set(features.movie_ids.tolist())
+        added = [id for id in features.movie_ids.tolist() if id not in self.positions]
+        self._grow(len(added))
+        for id in added:
+            self.ids[self.n] = id
+            self.positions[id] = self.n
+            self.n += 1
+        deleted = np.array([self.positions.pop(id) for id in movie_ids if id not in present and id in self.positions],
+                           dtype=np.int64)
+        changed = np.array(sorted({self.positions[id] for id in present} | set(deleted.tolist())), dtype=np.int64)
+        if not len(changed):
+            return
+        self._patch(changed, features)
+        self.removed[deleted] = True
+        self.neighbors[deleted] = -1
+        self.scores[deleted] = 0
+
+        skip = np.zeros(self.n, dtype=bool)
+        skip[changed] = True
+        skip |= self.removed[:self.n]
+        rerank: Set[int] = set()
+        size = max(1, self.block_cells // max(self.n, 1))
+        for start in range(0, len(changed), size):
+            block = changed[start:start + size]
+            for row, similarity in zip(block.tolist(), self.similarities(block)):
+                if self.k:
+                    self._merge(row, similarity, skip, rerank)
+        rerank.update(changed.tolist())
+        rerank.difference_update(deleted.tolist())
+        self.rank(np.array(sorted(rerank), dtype=np.int64))
+
+    def similar(self, movie_id: int, limit: int) -> Optional[List[Tuple[int, float]]]:
+        row = self.positions.get(movie_id)
+        if row is None:
+            return None
+        neighbors, scores = self.neighbors[row, :limit], self.scores[row, :limit]
+        valid = neighbors >= 0
+        return list(zip(self.ids[neighbors[valid]].tolist(), scores[valid].tolist()))
+
+
+STALE_SETS = ("_stale_movies", "_stale_credits", "_stale_people")
+
+
+class SimilarMoviesIndex:
+    """Neighbour lists of every movie, built in the background and kept
+    current by write listeners, like the autocomplete indexes."""
+
+    def __init__(
+        self,
+        neighbors: int = SIMILAR_MOVIES_NEIGHBORS,
+        dense_features: int = SIMILAR_MOVIES_DENSE_FEATURES,
+        block_cells: int = SIMILAR_MOVIES_BLOCK_CELLS,
+        max_patches: int = SIMILAR_MOVIES_MAX_PATCHES,
+    ):
+        self.neighbors = neighbors
+        self.dense_features = dense_features
+        self.block_cells = block_cells
+        self.max_patches = max_patches
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        # While a background build runs: the marks made since it started
+        # reading, by stale set. They are what its snapshot may miss.
+        self._build_marks: Optional[Dict[str, Set[int]]] = None
+        self._build_thread: Optional[threading.Thread] = None
+        self._rebuild = False
+        self._clear_state()
+        self.builds = 0
+        self.refreshes = 0
+        self.build_seconds = 0.0
+
+    def _clear_state(self) -> None:
+        self._vectors: Optional[MovieVectors] = None
+        self._stale_movies: Set[int] = set()
+        self._stale_credits: Set[int] = set()
+        self._stale_people: Set[int] = set()
+
+    def _mark(self, stale: str, ids: List[int]) -> None:
+        with self._lock:
+            if self._vectors is not None:
+                getattr(self, stale).update(ids)
+            if self._build_marks is not None:
+                self._build_marks[stale].update(ids)
+
+    def mark_movies_stale(self, action: str, ids: List[int]) -> None:
+        self._mark("_stale_movies", ids)
+
+    def mark_credits_stale(self, action: str, ids: List[int]) -> None:
+        self._mark("_stale_credits", ids)
+
+    def mark_people_stale(self, action: str, ids: List[int]) -> None:
+        self._mark("_stale_people", ids)
+
+    def invalidate(self) -> None:
+        """Start a rebuild on the next lookup."""
+        with self._lock:
+            self._rebuild = True
+
+    @property
+    def ready(self) -> bool:
+        return self._vectors is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear_state()
+            self._rebuild = False
+
+    def _has_stale(self) -> bool:
+        return bool(self._stale_movies or self._stale_credits or self._stale_people)
+
+    def build(self, features: Features) -> None:
+        """Replace the index with one built from ``features``. During a
+        background build, the marks made since its snapshot was read stay
+        stale for the next lookup; otherwise all marks are dropped."""
+        started = time.perf_counter()
+        vectors = MovieVectors(features, self.neighbors, self.dense_features, self.block_cells)
+        with self._lock:
+            marks = self._build_marks
+            self._clear_state()
+            if marks is not None:
+                for stale, ids in marks.items():
+                    setattr(self, stale, set(ids))
+            self._vectors = vectors
+            self.builds += 1
+            self.build_seconds = round(time.perf_counter() - started, 3)
+        logger.info("Built similar movies for %d movies in %.1fs", vectors.n, self.build_seconds)
+
+    def start_build(self, session_factory: Callable[[], Session]) -> bool:
+        """Build from a new snapshot in a background thread; the current
+        index, if any, answers until then. False if a build is running."""
+        with self._lock:
+            if self._build_marks is not None:
+                return False
+            self._build_marks = {stale: set() for stale in STALE_SETS}
+            self._rebuild = False
+        self._build_thread = threading.Thread(
+            target=self._build_in_background, args=(session_factory,), name="similar-movies-build", daemon=True,
+        )
+        self._build_thread.start()
+        return True
+
+    def _build_in_background(self, session_factory: Callable[[], Session]) -> None:
+        try:
+            with session_factory() as db:
+                features = load_features(db)
+            self.build(features)
+        except Exception:
+            logger.exception("Building similar movies failed")
+        finally:
+            with self._lock:
+                self._build_marks = None
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait for the running background build, if any."""
+        thread = self._build_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _stale_movie_ids(self, db: Session, vectors: MovieVectors, credits: Set[int], people: Set[int]) -> Set[int]:
+        """Movies whose tokens may have changed: those of the credits before
+        and after the writes, and those crediting the people."""
+        movie_ids = vectors.movies_of_credits(credits)
+        if credits:
+            movie_ids.update(db.scalars(select(MovieCredit.movie_id).where(MovieCredit.id.in_(credits))))
+        if people:
+            movie_ids.update(db.scalars(
+                select(MovieCredit.movie_id).where(MovieCredit.cast_and_crew_id.in_(people)).distinct()
+            ))
+        return movie_ids
+
+    def ensure_current(self, db: Session) -> None:
+        """Re-encode the movies written since the last lookup. Without an
+        index, or past ``max_patches``, start a background build instead."""
+        if self._vectors is not None and not self._has_stale() and not self._rebuild:
+            return
+        build_session = partial(Session, bind=db.get_bind())
+        if self._vectors is None or self._rebuild:
+            self.start_build(build_session)
+        with self._load_lock:
+            if self._vectors is None or not self._has_stale():
+                return
+            with self._lock:
+                movie_ids, self._stale_movies = self._stale_movies, set()
+                credits, self._stale_credits = self._stale_credits, set()
+                people, self._stale_people = self._stale_people, set()
+            vectors = self._vectors
+            movie_ids |= self._stale_movie_ids(db, vectors, credits, people)
+            if len(vectors.patches) + len(movie_ids) > self.max_patches:
+                # Still patched: it answers until the rebuild, with current
+                # document frequencies, is swapped in.
+                self.start_build(build_session)
+            features = load_features(db, movie_ids)
+            with self._lock:
+                vectors.update(movie_ids, features)
+                self.refreshes += 1
+
+    def similar(self, movie_id: int, limit: int) -> Optional[List[Tuple[int, float]]]:
+        """``(movie_id, similarity)`` of the closest movies, best first, or
+        None for an unknown movie."""
+        with self._lock:
+            if self._vectors is None:
+                return None
+            return self._vectors.similar(movie_id, limit)
+
+    def stats(self) -> Dict[str, Any]:
+        vectors = self._vectors
+        return {
+            "movies": len(vectors.positions) if vectors else 0,
+            "tokens": len(vectors.vocabulary) + len(vectors.new_columns) if vectors else 0,
+            "dense_tokens": vectors.dense.shape[1] if vectors else 0,
+            "patched_movies": len(vectors.patches) if vectors else 0,
+            "reranked_lists": vectors.reranked if vectors else 0,
+            "builds": self.builds,
+            "refreshes": self.refreshes,
+            "build_seconds": self.build_seconds,
+            "building": self._build_marks is not None,
+        }
+
+
+similar_movies_index = SimilarMoviesIndex()
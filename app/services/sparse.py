@@ -0,0 +1,142 @@
+"""Sparse matrices in plain NumPy arrays and blocked similarity over them.
+
+``CSR`` holds a row-major sparse matrix as three arrays. Dot products
+between its rows are computed with the transpose: each row's entries are
+expanded into the entries of the columns they touch, and the products are
+summed per (row, other row) cell with one ``bincount``. The work is the
+number of co-occurring pairs rather than rows x rows, and the rows are
+processed in blocks so that memory stays bounded.
+"""
+from dataclasses import dataclass
+from typing import Iterator, Tuple
+
+import numpy as np
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+
+
+def fetch_array(db: Session, stmt: Select, width: int, batch_size: int, dtype=np.int64) -> np.ndarray:
+    """Rows of ``stmt`` as a ``(rows, width)`` array, fetched ``batch_size``
+    at a time (a server-side cursor on Postgres) and packed as they arrive."""
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    chunks = [np.array(rows, dtype=dtype).reshape(-1, width) for rows in result.partitions()]
+    return np.concatenate(chunks) if chunks else np.empty((0, width), dtype=dtype)
+
+
+def offsets_of(keys: np.ndarray, size: int) -> np.ndarray:
+    """CSR row pointers of ``keys``, which must already be sorted."""
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=size), out=offsets[1:])
+    return offsets
+
+
+@dataclass
+class CSR:
+    offsets: np.ndarray
+    columns: np.ndarray
+    values: np.ndarray
+    n_columns: int
+
+    @classmethod
+    def from_coo(cls, rows: np.ndarray, columns: np.ndarray, values: np.ndarray, n_rows: int, n_columns: int) -> "CSR":
+        """Entries given in any order; entries of a row keep their relative order."""
+        order = np.argsort(rows, kind="stable")
+        return cls(offsets_of(rows[order], n_rows), columns[order], values[order], n_columns)
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.offsets) - 1
+
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def row_ids(self) -> np.ndarray:
+        """The row of every entry."""
+        return np.repeat(np.arange(self.n_rows), self.lengths())
+
+    def transpose(self) -> "CSR":
+        return CSR.from_coo(self.columns, self.row_ids(), self.values, self.n_columns, self.n_rows)
+
+    def row_norms(self) -> np.ndarray:
+        return np.sqrt(np.bincount(self.row_ids(), weights=self.values * self.values, minlength=self.n_rows))
+
+    def entries(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """``(owner, position)`` of every entry of ``rows``: which of ``rows``
+        it belongs to and where it is in ``columns``/``values``. A
+        vectorised concatenation of one arange per row."""
+        lengths = self.lengths()[rows]
+        ends = np.cumsum(lengths)
+        total = int(ends[-1]) if len(ends) else 0
+        owner = np.repeat(np.arange(len(rows)), lengths)
+        return owner, np.arange(total) - np.repeat(ends - lengths - self.offsets[rows], lengths)
+
+
+def blocks(costs: np.ndarray, budget: int) -> Iterator[Tuple[int, int]]:
+    """Consecutive ranges of rows whose summed cost fits ``budget``; a row
+    over budget gets a block of its own."""
+    total = np.cumsum(costs)
+    start = 0
+    while start < len(costs):
+        spent = total[start - 1] if start else 0
+        end = max(start + 1, int(np.searchsorted(total, spent + budget, side="right")))
+        yield start, end
+        start = end
+
+
+def top_k(rows: np.ndarray, columns: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, ...]:
+    """The ``k`` best ``scores`` of each row as ``(rows, ranks, columns, scores)``."""
+    order = np.lexsort((-scores, rows))
+    rows, columns, scores = rows[order], columns[order], scores[order]
+    ranks = np.arange(len(rows)) - np.searchsorted(rows, rows)
+    best = ranks < k
+    return rows[best], ranks[best], columns[best], scores[best]
+
+
+def pair_costs(matrix: CSR, transposed: CSR) -> np.ndarray:
+    """Co-occurring pairs each row of ``matrix`` expands into."""
+    return np.bincount(
+        matrix.row_ids(), weights=transposed.lengths()[matrix.columns], minlength=matrix.n_rows,
+    ).astype(np.int64)
+
+
+def row_dots(matrix: CSR, transposed: CSR, rows: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Dot products of ``rows`` with every row they share a column with, as
+    ``(owner, other, dot, support)``: ``owner`` indexes ``rows`` and
+    ``support`` counts the shared columns."""
+    owner, positions = matrix.entries(rows)
+    via, expanded = transposed.entries(matrix.columns[positions])
+    n_rows = matrix.n_rows
+    cells = owner[via] * n_rows + transposed.columns[expanded]
+    products = transposed.values[expanded] * matrix.values[positions][via]
+    dots = np.bincount(cells, weights=products, minlength=len(rows) * n_rows)
+    support = np.bincount(cells, minlength=len(rows) * n_rows)
+    cells = np.flatnonzero(support)
+    owner, other = np.divmod(cells, n_rows)
+    return owner, other, dots[cells], support[cells]
+
+
+def top_k_similar(matrix: CSR, k: int, shrinkage: float = 0.0, block_cells: int = 4 * 1024 * 1024) -> Tuple[np.ndarray, ...]:
+    """The ``k`` rows most cosine-similar to each row of ``matrix``, as
+    ``(neighbors, similarities)`` arrays of shape rows x ``k``, best first
+    and padded with -1 and 0. Only positive similarities are kept; with
+    ``shrinkage`` a similarity backed by ``n`` shared columns is scaled by
+    ``n / (n + shrinkage)``."""
+    n_rows = matrix.n_rows
+    neighbors = np.full((n_rows, k), -1, dtype=np.int32)
+    similarities = np.zeros((n_rows, k), dtype=np.float32)
+    if k == 0:
+        return neighbors, similarities
+    transposed = matrix.transpose()
+    norms = matrix.row_norms()
+    for start, end in blocks(pair_costs(matrix, transposed) + n_rows, block_cells):
+        owner, other, dots, support = row_dots(matrix, transposed, np.arange(start, end))
+        rows = owner + start
+        denominator = norms[rows] * norms[other]
+        similarity = np.divide(dots, denominator, out=np.zeros_like(dots), where=denominator > 0)
+        if shrinkage:
+            similarity *= support / (support + shrinkage)
+        similar = (similarity > 0) & (rows != other)
+        rows, ranks, other, similarity = top_k(rows[similar], other[similar], similarity[similar], k)
+        neighbors[rows, ranks] = other
+        similarities[rows, ranks] = similarity
+    return neighbors, similarities
@@ -1,46 +1,158 @@
+import logging
+from concurrent.futures import Future
+from functools import partial
 from typing import Optional
 
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+from app.db.session import commit_keeping_state
 from app.schemas.user import UserCreate
 from app.models.user import User
+from app.services.passwords import check_password, hash_password, password_needs_update, password_pool
 import re
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_pool.run(hash_password, password)
 
 
-def create_user(db: Session, user: UserCreate) -> User:
-    db_user = User(
-        username=user.username,
-        email=str(user.email),
-        password=get_password_hash(user.password)
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+# Uniqueness is case-insensitive: the unique indexes are on lower(username)
+# and lower(email), and lookups compare the same expressions to use them.
+UNIQUE_FIELDS = ("username", "email")
+
+
+def user_conflict(field: Optional[str]) -> HTTPException:
+    detail = f"{field.capitalize()} already registered" if field else "Username or email already registered"
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def _conflicting_field(e: IntegrityError) -> Optional[str]:
+    # Postgres names the violated index; SQLite names the index or the column.
+    diag = getattr(e.orig, "diag", None)
+    violated = getattr(diag, "constraint_name", None) or str(e.orig)
+    return next((field for field in UNIQUE_FIELDS if field in violated), None)
+
+
+def find_registration_conflict(db: Session, username: str, email: str) -> Optional[str]:
+    """The field of ``username`` / ``email`` that is already taken, if any.
+
+    A cheap indexed lookup run before hashing, so a taken name does not cost
+    a bcrypt round. The unique indexes remain what actually guarantees
+    uniqueness when two registrations race.
+    """
+    username, email = username.lower(), email.lower()
+    row = db.execute(
+        select(func.lower(User.username), func.lower(User.email))
+        .where(or_(func.lower(User.username) == username, func.lower(User.email) == email))
+        .limit(1)
+    ).first()
+    if row is None:
+        return None
+    return "username" if row[0] == username else "email"
+
+
+def _insert_user(db: Session, user: UserCreate, hashed_password: str) -> User:
+    """Insert with RETURNING in one statement and map unique violations to a 400."""
+    try:
+        db_user = db.scalars(
+            insert(User).values(username=user.username, email=str(user.email), password=hashed_password).returning(User)
+        ).one()
+        commit_keeping_state(db)
+    except IntegrityError as e:
+        db.rollback()
+        raise user_conflict(_conflicting_field(e))
 
     return db_user
 
 
+def _ensure_available(db: Session, user: UserCreate) -> None:
+    field = find_registration_conflict(db, user.username, str(user.email))
+    if field is not None:
+        raise user_conflict(field)
+
+
+def create_user(db: Session, user: UserCreate) -> User:
+    _ensure_available(db, user)
+    return _insert_user(db, user, get_password_hash(user.password))
+
+
+async def create_user_async(db: Session, user: UserCreate) -> User:
+    """Hash on the password pool without holding a request thread, then insert."""
+    await run_in_threadpool(_ensure_available, db, user)
+    hashed_password = await password_pool.run_async(hash_password, user.password)
+    return await run_in_threadpool(_insert_user, db, user, hashed_password)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_pool.run(check_password, plain_password, hashed_password)
+
+
+def _store_rehash(bind: Engine | Connection, user_id: int, old_hash: str, done: Future, hashed: Future) -> None:
+    try:
+        with Session(bind=bind) as session:
+            # Only replace the hash that was verified, never a password
+            # changed in the meantime.
+            session.execute(
+                update(User).where(User.id == user_id, User.password == old_hash).values(password=hashed.result())
+            )
+            session.commit()
+    except Exception:
+        logger.exception("Rehashing the password of user %s failed", user_id)
+    finally:
+        done.set_result(None)
+
+
+def rehash_in_background(db: Session, user: User, password: str) -> Optional[Future]:
+    """Replace an outdated hash after a successful login, without delaying it.
+
+    Returns a future that completes once the new hash is stored, or None
+    when the hash is current. A busy password pool skips the rehash; the
+    next login tries again.
+    """
+    if not password_needs_update(user.password):
+        return None
+    try:
+        hashed = password_pool.submit(hash_password, password)
+    except HTTPException:
+        return None
+    done: Future = Future()
+    hashed.add_done_callback(partial(_store_rehash, db.get_bind(), user.id, user.password, done))
+    return done
 
 
-def authenticate_user(db: Session, identifier: str, password: str) -> Optional[User]:
+def get_user_by_identifier(db: Session, identifier: str) -> Optional[User]:
+    """Get a user by email address or username."""
     is_email = bool(re.match(r"[^@]+@[^@]+\.[^@]+", identifier))
 
     if is_email:
-        user = db.query(User).filter(User.email == identifier).first()
-    else:
-        user = db.query(User).filter(User.username == identifier).first()
+        return db.query(User).filter(func.lower(User.email) == identifier.lower()).first()
+    return db.query(User).filter(func.lower(User.username) == identifier.lower()).first()
+
+
+def authenticate_user(db: Session, identifier: str, password: str) -> Optional[User]:
+    user = get_user_by_identifier(db, identifier)
 
     if not user or not verify_password(password, user.password):
         return None
 
+    rehash_in_background(db, user, password)
+    return user
+
+
+async def authenticate_user_async(db: Session, identifier: str, password: str) -> Optional[User]:
+    """Look the user up in the request thread pool and verify on the password pool."""
+    user = await run_in_threadpool(get_user_by_identifier, db, identifier)
+
+    if not user or not await password_pool.run_async(check_password, password, user.password):
+        return None
+
+    rehash_in_background(db, user, password)
     return user
 
 
@@ -51,4 +163,4 @@ def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     """Get a user by their email address."""
-    return db.query(User).filter(User.email == email).first()
+    return db.query(User).filter(func.lower(User.email) == email.lower()).first()
@@ -0,0 +1,142 @@
+"""Compare how sync and async BaseRouter endpoints scale with concurrency.
+
+Runs the genre list endpoint through an in-process ASGI transport at several
+concurrency levels and reports throughput for each mode. By default a
+temporary SQLite file is used and every statement is delayed by
+``--latency-ms`` inside the driver thread to stand in for the network round
+trip to Postgres; pass ``--database-url`` to benchmark a real database.
+
+    python -m benchmarks.async_concurrency --latency-ms 5 --concurrency 10 50 200
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+import anyio
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base, get_db, get_async_db, to_async_url
+from app.models import Genre
+from app.routes.base_routes import BaseRouter
+from app.schemas.genre import GenreCreate, GenreUpdate, GenreOut
+from app.services.genre import GenreService
+
+
+def add_latency(engine, latency_ms: float) -> None:
+    """Sleep inside the DBAPI thread for every statement SQLite executes."""
+    if latency_ms <= 0:
+        return
+
+    def on_statement(_statement):
+        time.sleep(latency_ms / 1000)
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, _record):
+        sqlite_connection = getattr(dbapi_connection, "driver_connection", dbapi_connection)
+        sqlite_connection = getattr(sqlite_connection, "_conn", sqlite_connection)
+        sqlite_connection.set_trace_callback(on_statement)
+
+
+def build_app(database_url: str, async_mode: bool, latency_ms: float, pool_size: int) -> FastAPI:
+    app = FastAPI()
+    app.include_router(BaseRouter(
+        service=GenreService(),
+        schema_create=GenreCreate,
+        schema_update=GenreUpdate,
+        schema_out=GenreOut,
+        prefix="genres",
+        tags=["Genres"],
+        async_mode=async_mode,
+    ).router)
+
+    is_sqlite = database_url.startswith("sqlite")
+    engine_options = {
+        "connect_args": {"check_same_thread": False} if is_sqlite else {},
+        "pool_size": pool_size,
+        "max_overflow": 0,
+    }
+    if async_mode:
+        engine = create_async_engine(to_async_url(database_url), **engine_options)
+        if is_sqlite:
+            add_latency(engine.sync_engine, latency_ms)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+    else:
+        engine = create_engine(database_url, **engine_options)
+        if is_sqlite:
+            add_latency(engine, latency_ms)
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+
+        def override_get_db():
+            session = session_factory()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+    return app
+
+
+async def run_level(app: FastAPI, concurrency: int, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one_request():
+            async with semaphore:
+                response = await client.get("/api/genres/")
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(requests)))
+        return requests / (time.perf_counter() - started)
+
+
+def seed(database_url: str, rows: int) -> None:
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as session:
+        if session.query(Genre).count() == 0:
+            session.add_all(Genre(name=f"Genre {chr(65 + i % 26)}{chr(65 + i // 26)}") for i in range(rows))
+            session.commit()
+    engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Defaults to a temporary SQLite file")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Simulated per-statement latency (SQLite only)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 40, 100, 200])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--pool-size", type=int, default=200, help="Kept large so the pool is not the bottleneck")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{tmp}/bench.db"
+        seed(database_url, args.rows)
+
+        print(f"{'mode':<6} {'concurrency':>11} {'req/s':>10}")
+        for async_mode in (False, True):
+            app = build_app(database_url, async_mode, args.latency_ms, args.pool_size)
+            for concurrency in args.concurrency:
+                throughput = anyio.run(run_level, app, concurrency, args.requests)
+                print(f"{'async' if async_mode else 'sync':<6} {concurrency:>11} {throughput:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
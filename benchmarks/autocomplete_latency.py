@@ -0,0 +1,76 @@
+"""Autocomplete lookup latency over a large in-memory index.
+
+Loads the cast-and-crew autocomplete index with ``--rows`` synthetic
+people (no database involved), then times ``suggest`` for prefixes of one
+to five letters drawn from the loaded names, and the incremental update
+that follows a write. Cold one- and two-letter lookups fill the cached
+rankings; the p50/p99 columns are for the lookups after that.
+
+    python -m benchmarks.autocomplete_latency --rows 100000 1000000
+"""
+import argparse
+import os
+import random
+import time
+from collections import namedtuple
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from app.services.autocomplete import AutocompleteIndex
+from app.services.cast_and_crew import CastAndCrewAutocomplete
+
+Row = namedtuple("Row", "id popularity stage_name first_name last_name")
+CONSONANTS = "bdfghklmnprstvz"
+VOWELS = "aeiou"
+
+
+def word(rng: random.Random) -> str:
+    return "".join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def person(rng: random.Random, id: int) -> Row:
+    stage_name = word(rng) if rng.random() < 0.1 else None
+    return Row(id, int(rng.paretovariate(1.5)), stage_name, word(rng), word(rng))
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--writes", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'build s':>8} {'p50 us':>7} {'p99 us':>7} {'write us':>9}")
+    for rows in args.rows:
+        rng = random.Random(rows)
+        people = [person(rng, id) for id in range(1, rows + 1)]
+        index = AutocompleteIndex("benchmark", CastAndCrewAutocomplete())
+        started = time.perf_counter()
+        index.load(people)
+        build = time.perf_counter() - started
+
+        prefixes = [rng.choice(people).first_name[:rng.randint(1, 5)] for _ in range(args.lookups)]
+        for prefix in prefixes:
+            index.suggest(prefix)
+        samples = []
+        for prefix in prefixes:
+            started = time.perf_counter()
+            index.suggest(prefix)
+            samples.append(time.perf_counter() - started)
+        p50, p99 = percentiles(samples)
+
+        started = time.perf_counter()
+        for _ in range(args.writes):
+            id = rng.randint(1, rows)
+            index.apply([id], [person(rng, id)])
+        write = (time.perf_counter() - started) / args.writes
+        print(f"{rows:>9} {build:>8.1f} {p50 * 1e6:>7.1f} {p99 * 1e6:>7.1f} {write * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Per-row cost of serializing ``CastAndCrewOut`` (with nested countries).
+
+Compares the ways a list of ORM rows can become response bytes:
+
+* response_model: what FastAPI does for ``GET /api/cast_and_crew/`` without
+  fast mode -- validate into the schema, dump to Python, encode with json;
+* prebuilt models: the route builds ``CastAndCrewOut`` models itself and
+  response_model dumps and validates them a second time (the old country
+  route pattern);
+* fast: one validation, then ``TypeAdapter.dump_json`` straight to bytes
+  (``FAST_JSON_RESPONSES=true``);
+* fast + orjson: one validation, dumped to Python and encoded by orjson.
+
+    python -m benchmarks.json_serialization --rows 1000 --repeat 20
+"""
+import argparse
+import json
+import os
+import time
+from datetime import date
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from pydantic import TypeAdapter
+
+from app.models.cast_and_crew import CastAndCrew
+from app.models.country import Country
+from app.routes.responses import dump_validated, orjson, ORJSON_OPTIONS
+from app.schemas.cast_and_crew import CastAndCrewOut
+
+
+def build_rows(rows: int, countries_per_row: int) -> list:
+    countries = [Country(id=i + 1, code=f"{i:02d}", name=f"Country {i}") for i in range(50)]
+    return [
+        CastAndCrew(
+            id=i + 1,
+            first_name=f"First {i}",
+            last_name=f"Last {i}",
+            stage_name=f"Stage {i}",
+            birth_date=date(1980, 1, 1 + i % 28),
+            description="Biography. " * 40,
+            countries=[countries[(i + k) % 50] for k in range(countries_per_row)],
+        )
+        for i in range(rows)
+    ]
+
+
+def encode(content) -> bytes:
+    # Starlette's JSONResponse.render
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--countries", type=int, default=3, help="Countries per row")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows, args.countries)
+    adapter = TypeAdapter(list[CastAndCrewOut])
+
+    def response_model(items):
+        return encode(adapter.dump_python(adapter.validate_python(items, from_attributes=True), mode="json"))
+
+    def prebuilt_models(items):
+        models = [CastAndCrewOut.model_validate(item) for item in items]
+        dumped = [model.model_dump() for model in models]
+        return encode(adapter.dump_python(adapter.validate_python(dumped), mode="json"))
+
+    def fast(items):
+        return dump_validated(adapter, items)
+
+    def fast_orjson(items):
+        validated = adapter.validate_python(items, from_attributes=True)
+        return orjson.dumps(adapter.dump_python(validated), option=ORJSON_OPTIONS)
+
+    variants = {"response_model": response_model, "prebuilt models": prebuilt_models, "fast": fast}
+    if orjson is not None:
+        variants["fast + orjson"] = fast_orjson
+
+    expected = json.loads(response_model(rows))
+    baseline = None
+    for name, serialize in variants.items():
+        assert json.loads(serialize(rows)) == expected, name
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            serialize(rows)
+        per_row = (time.perf_counter() - started) / (args.repeat * args.rows) * 1e6
+        baseline = baseline or per_row
+        print(f"{name:<16}: {per_row:8.2f} us/row ({baseline / per_row:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
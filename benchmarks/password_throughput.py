@@ -0,0 +1,95 @@
+"""Login throughput of the password pool as the number of workers grows.
+
+Registers one user in a temporary SQLite database, then fires ``--requests``
+concurrent logins at ``POST /api/users/login`` through an in-process ASGI
+transport, once per executor kind and worker count. Rejected logins (503
+when the pool's pending limit is reached) are counted separately; raise
+``--max-pending`` to measure raw throughput only.
+
+    python -m benchmarks.password_throughput --workers 1 2 4 8 --kinds thread process
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import anyio
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base, get_db
+from app.routes import user as user_routes
+from app.services import user as user_service
+from app.services.passwords import PasswordPool
+
+PASSWORD = "Benchmark123"
+
+
+def build_app(database_url: str) -> FastAPI:
+    engine = create_engine(database_url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    app.include_router(user_routes.router)
+    app.dependency_overrides[get_db] = override_get_db
+    return app
+
+
+async def run_level(app: FastAPI, concurrency: int, requests: int) -> tuple:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/api/users/register", json={
+            "username": "bench", "email": "bench@example.com", "password": PASSWORD,
+        })
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one_login():
+            async with semaphore:
+                response = await client.post("/api/users/login", json={"identifier": "bench", "password": PASSWORD})
+                return response.status_code
+
+        started = time.perf_counter()
+        codes = await asyncio.gather(*(one_login() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+    succeeded = codes.count(200)
+    return succeeded / elapsed, codes.count(503)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--kinds", nargs="+", choices=["thread", "process"], default=["thread", "process"])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--max-pending", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"cpu count: {os.cpu_count()}")
+    print(f"{'kind':<8} {'workers':>7} {'logins/s':>10} {'rejected':>9}")
+    for kind in args.kinds:
+        for workers in sorted(set(args.workers)):
+            pool = PasswordPool(workers, args.max_pending, kind)
+            user_service.password_pool = pool
+            with tempfile.TemporaryDirectory() as tmp:
+                app = build_app(f"sqlite:///{tmp}/bench.db")
+                throughput, rejected = anyio.run(run_level, app, args.concurrency, args.requests)
+            pool.shutdown()
+            print(f"{kind:<8} {workers:>7} {throughput:>10.1f} {rejected:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Per-request cost of the login rate limiter.
+
+Times ``LoginRateLimiter.check`` (two sketch hits: one per IP, one per
+identifier) over a stream of attempts drawn from ``--ips`` addresses and
+``--identifiers`` account names, for several sketch widths. Limits are set
+high enough that nothing is rejected, so only the counting is measured.
+A plain dict of per-key counters (unbounded memory, no window) is timed
+alongside for reference.
+
+    python -m benchmarks.rate_limit_overhead --attempts 200000 --widths 1024 4096 16384
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from app.services.rate_limit import LoginRateLimiter, SlidingWindowSketch
+
+
+def attempts(count: int, ips: int, identifiers: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [(f"10.{rng.randrange(ips) // 65536}.{rng.randrange(ips) % 65536}", f"user{rng.randrange(identifiers)}")
+            for _ in range(count)]
+
+
+def time_limiter(limiter: LoginRateLimiter, stream) -> float:
+    started = time.perf_counter()
+    for ip, identifier in stream:
+        limiter.check(ip, identifier)
+    return (time.perf_counter() - started) / len(stream)
+
+
+def time_dict(stream) -> float:
+    counts = {}
+    started = time.perf_counter()
+    for ip, identifier in stream:
+        counts[f"ip:{ip}"] = counts.get(f"ip:{ip}", 0) + 1
+        counts[f"id:{identifier}"] = counts.get(f"id:{identifier}", 0) + 1
+    return (time.perf_counter() - started) / len(stream)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--attempts", type=int, default=100_000)
+    parser.add_argument("--ips", type=int, default=5_000)
+    parser.add_argument("--identifiers", type=int, default=20_000)
+    parser.add_argument("--widths", type=int, nargs="+", default=[1024, 4096, 16384])
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--slots", type=int, default=6)
+    args = parser.parse_args()
+
+    stream = attempts(args.attempts, args.ips, args.identifiers)
+    print(f"{'storage':<16} {'memory KiB':>10} {'us/check':>9}")
+    for width in args.widths:
+        sketch = SlidingWindowSketch(60, slots=args.slots, width=width, depth=args.depth)
+        limiter = LoginRateLimiter(sketch, per_ip=args.attempts, per_identifier=args.attempts)
+        seconds = time_limiter(limiter, stream)
+        memory = sketch.stats()["memory_bytes"] / 1024
+        print(f"{f'sketch w={width}':<16} {memory:>10.0f} {seconds * 1e6:>9.2f}")
+    print(f"{'dict (no window)':<16} {'-':>10} {time_dict(stream) * 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
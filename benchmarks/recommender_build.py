@@ -0,0 +1,82 @@
+"""Item-item recommender build time, peak memory and scoring latency.
+
+Generates ``--ratings`` synthetic ratings (no database involved): users
+with a long-tailed number of reviews, movies with Zipf-like popularity and
+ratings that depend on a hidden taste match, so neighbours are not noise.
+Builds the neighbour arrays, writes and maps a model file, then times
+``score_history`` for the histories of random users. Peak memory is the
+largest NumPy allocation total tracemalloc saw during the build.
+
+    python -m benchmarks.recommender_build --ratings 1000000 5000000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+import numpy as np
+
+from app.services.model_files import open_model, write_model
+from app.services.recommendations import build_item_neighbors, score_history
+
+
+def synthetic_ratings(rng: np.random.Generator, count: int, movies: int):
+    users = max(count // 40, 1)
+    activity = rng.pareto(1.2, users) + 1
+    user_ids = rng.choice(users, count, p=activity / activity.sum())
+    popularity = 1 / np.arange(1, movies + 1) ** 0.9
+    movie_ids = rng.choice(movies, count, p=popularity / popularity.sum())
+    taste, genre = rng.integers(0, 8, users), rng.integers(0, 8, movies)
+    match = (taste[user_ids] == genre[movie_ids]).astype(float)
+    ratings = np.clip(np.rint(2.5 + 2 * match + rng.normal(0, 1, count)), 1, 5).astype(np.int32)
+    # A user reviews a movie once; keep the last duplicate like an update would.
+    _, last = np.unique((user_ids.astype(np.int64) * movies + movie_ids)[::-1], return_index=True)
+    keep = np.sort(count - 1 - last)
+    return user_ids[keep].astype(np.int32), movie_ids[keep].astype(np.int32), ratings[keep]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ratings", type=int, nargs="+", default=[1_000_000, 5_000_000])
+    parser.add_argument("--movies", type=int, default=20_000)
+    parser.add_argument("--neighbors", type=int, default=50)
+    parser.add_argument("--lookups", type=int, default=2_000)
+    args = parser.parse_args()
+
+    print(f"{'ratings':>9} {'build s':>8} {'peak MB':>8} {'file MB':>8} {'p50 us':>7} {'p99 us':>7}")
+    for count in args.ratings:
+        rng = np.random.default_rng(count)
+        user_ids, movie_ids, ratings = synthetic_ratings(rng, count, args.movies)
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        arrays = build_item_neighbors(user_ids, movie_ids, ratings, neighbors=args.neighbors)
+        build = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_model("benchmark", arrays, {}, directory)
+            model = open_model(path)
+            order = np.argsort(user_ids, kind="stable")
+            offsets = np.searchsorted(user_ids[order], np.arange(user_ids.max() + 2))
+            samples = []
+            for user in rng.integers(0, user_ids.max() + 1, args.lookups):
+                rows = order[offsets[user]:offsets[user + 1]][-500:]
+                started = time.perf_counter()
+                score_history(model, movie_ids[rows].tolist(), ratings[rows].tolist(), 20)
+                samples.append((time.perf_counter() - started) * 1e6)
+            size = path.stat().st_size
+            del model
+        samples.sort()
+        print(
+            f"{len(ratings):>9} {build:>8.1f} {peak / 2**20:>8.0f} {size / 2**20:>8.1f} "
+            f"{samples[len(samples) // 2]:>7.0f} {samples[int(len(samples) * 0.99)]:>7.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Cast-and-crew search latency as the table grows.
+
+Seeds a fresh SQLite database (FTS5 index maintained by triggers) in
+steps up to the largest ``--rows`` count, and after each step times
+``CastAndCrewService.search`` for a fixed set of full-word and prefix
+queries, including one- and two-letter prefixes that match a large part
+of the table. At most SEARCH_MAX_CANDIDATES name matches plus as many
+matches in any column are ranked, so p95 should stay roughly flat as
+rows grow; the ``short p95`` column is the short prefixes alone and
+``LIKE`` times the unindexed substring scan the index replaces.
+
+    python -m benchmarks.search_latency --rows 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from sqlalchemy import create_engine, insert, or_, select
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401  (registers every table)
+from app.models.base_entity import BaseEntity
+from app.models.cast_and_crew import CastAndCrew
+from app.services.cast_and_crew import CastAndCrewService
+
+CONSONANTS = "bdfghklmnprstvz"
+VOWELS = "aeiou"
+
+
+def word(rng: random.Random) -> str:
+    # Roughly 10^7 distinct words, so like real names most are rare.
+    return "".join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def queries(session: Session, rows: int, count: int = 5):
+    """Full names, single words and three-letter prefixes of seeded people."""
+    ids = random.Random(rows).sample(range(1, rows + 1), count)
+    people = session.execute(select(CastAndCrew.first_name, CastAndCrew.last_name).where(CastAndCrew.id.in_(ids)))
+    return [query for first, last in people for query in (f"{first} {last}", last, first[:3], f"{first} {last[:3]}")]
+
+
+def short_prefixes(rows: int, count: int = 5):
+    rng = random.Random(-rows)
+    return [prefix for _ in range(count) for prefix in (rng.choice(CONSONANTS), word(rng)[:2])]
+
+
+def seed(session: Session, start: int, stop: int, seed_value: int, batch: int = 10_000) -> None:
+    rng = random.Random(seed_value)
+    for offset in range(start, stop, batch):
+        session.execute(insert(CastAndCrew), [
+            {"first_name": word(rng), "last_name": word(rng), "description": f"{word(rng)} {word(rng)}"}
+            for _ in range(min(batch, stop - offset))
+        ])
+    session.commit()
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.95)]
+
+
+def time_search(service: CastAndCrewService, session: Session, query_list, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        for query in query_list:
+            started = time.perf_counter()
+            service.search(session, query, limit=20)
+            samples.append(time.perf_counter() - started)
+    return percentiles(samples)
+
+
+def time_like(session: Session, query_list, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        for query in query_list:
+            pattern = f"%{query}%"
+            started = time.perf_counter()
+            session.execute(select(CastAndCrew.id).where(or_(
+                CastAndCrew.first_name.ilike(pattern), CastAndCrew.last_name.ilike(pattern),
+            )).limit(20)).all()
+            samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    service = CastAndCrewService()
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/search.db")
+        BaseEntity.metadata.create_all(engine)
+        print(f"{'rows':>9} {'p50 ms':>8} {'p95 ms':>8} {'short p95':>10} {'LIKE p50 ms':>12}")
+        seeded = 0
+        with Session(engine) as session:
+            for rows in sorted(args.rows):
+                seed(session, seeded, rows, seed_value=rows)
+                seeded = rows
+                query_list = queries(session, rows)
+                short = short_prefixes(rows)
+                p50, p95 = time_search(service, session, query_list + short, args.repeat)
+                _, short_p95 = time_search(service, session, short, args.repeat)
+                like = time_like(session, query_list, max(1, args.repeat // 10))
+                print(f"{rows:>9} {p50 * 1e3:>8.2f} {p95 * 1e3:>8.2f} {short_p95 * 1e3:>10.2f} {like * 1e3:>12.2f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
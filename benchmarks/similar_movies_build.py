@@ -0,0 +1,98 @@
+"""Similar-movies index build time, incremental update time and lookup latency.
+
+Generates ``--movies`` synthetic movies (no database involved): one to
+three genres each, a Zipf-like pool of people with a director and a few
+actors per movie, and people's countries as country tokens. Builds the
+index, then re-casts ``--updates`` random movies one at a time the way a
+credit write would and times each refresh, then times neighbour lookups.
+
+    python -m benchmarks.similar_movies_build --movies 10000 50000
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+import numpy as np
+
+from app.services.similar_movies import COUNTRY, GENRE, PERSON, ROLE, Features, MovieVectors, token_keys
+
+
+def synthetic_tokens(rng: np.random.Generator, movie_ids: np.ndarray, people: int):
+    """``(movies, keys, tf)`` of every token of ``movie_ids``."""
+    count = len(movie_ids)
+    genres = rng.integers(1, 4, count)
+    genre_movies = np.repeat(movie_ids, genres)
+    genre_keys = token_keys(GENRE, rng.integers(0, 20, len(genre_movies)))
+
+    cast = rng.integers(3, 9, count)
+    credit_movies = np.repeat(movie_ids, cast)
+    popularity = 1 / np.arange(1, people + 1) ** 0.8
+    person_ids = rng.choice(people, len(credit_movies), p=popularity / popularity.sum())
+    # The first credit of a movie is its director, the rest are actors.
+    positions = np.ones(len(credit_movies), dtype=np.int64)
+    positions[np.cumsum(cast) - cast] = 0
+    pairs = np.unique(np.stack([credit_movies, person_ids], axis=1), axis=0)
+
+    person_country = rng.integers(0, 60, people)
+    country_pairs, counts = np.unique(
+        np.stack([credit_movies, person_country[person_ids]], axis=1), axis=0, return_counts=True,
+    )
+    return (
+        np.concatenate([genre_movies, pairs[:, 0], credit_movies, country_pairs[:, 0]]),
+        np.concatenate([genre_keys, token_keys(PERSON, pairs[:, 1]), token_keys(ROLE, person_ids, positions),
+                        token_keys(COUNTRY, country_pairs[:, 1])]),
+        np.concatenate([np.ones(len(genre_movies) + len(pairs) + len(credit_movies)), 1 + np.log(counts)]),
+    )
+
+
+def features_for(rng: np.random.Generator, movie_ids: np.ndarray, people: int) -> Features:
+    movies, keys, tf = synthetic_tokens(rng, movie_ids, people)
+    return Features(movie_ids, movies, keys, tf, np.empty((0, 2), dtype=np.int64))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--movies", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--neighbors", type=int, default=50)
+    parser.add_argument("--dense-features", type=int, default=256)
+    parser.add_argument("--updates", type=int, default=200)
+    parser.add_argument("--lookups", type=int, default=5_000)
+    args = parser.parse_args()
+
+    print(f"{'movies':>7} {'build s':>8} {'peak MB':>8} {'update ms':>10} {'reranked':>9} {'lookup us':>10}")
+    for count in args.movies:
+        rng = np.random.default_rng(count)
+        people = max(count * 2, 100)
+        movie_ids = np.arange(1, count + 1, dtype=np.int64)
+        features = features_for(rng, movie_ids, people)
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        vectors = MovieVectors(features, args.neighbors, args.dense_features, 4 * 1024 * 1024)
+        build = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        updates = []
+        for movie_id in rng.choice(movie_ids, args.updates):
+            changed = features_for(rng, np.array([movie_id]), people)
+            started = time.perf_counter()
+            vectors.update([int(movie_id)], changed)
+            updates.append((time.perf_counter() - started) * 1e3)
+
+        lookups = []
+        for movie_id in rng.choice(movie_ids, args.lookups).tolist():
+            started = time.perf_counter()
+            vectors.similar(movie_id, 20)
+            lookups.append((time.perf_counter() - started) * 1e6)
+        print(
+            f"{count:>7} {build:>8.1f} {peak / 2**20:>8.0f} {np.median(updates):>10.1f} "
+            f"{vectors.reranked:>9} {np.median(lookups):>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Rows per second of the full list path vs the sparse-fieldset path.
+
+Seeds a ``cast_and_crew`` table (100k rows by default, each with countries
+and a long description) and pages through it both ways:
+
+* full: ORM instances, validated into ``CastAndCrewOut`` and dumped to JSON,
+  which is what ``response_model`` does for ``GET /api/cast_and_crew/``;
+* sparse: ``?fields=id,stage_name`` -- a column-only select dumped straight
+  to JSON.
+
+    python -m benchmarks.sparse_fields --rows 100000 --page-size 1000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.db.session import Base
+from app.models.cast_and_crew import CastAndCrew, cast_and_crew_countries
+from app.models.country import Country
+from app.schemas.cast_and_crew import CastAndCrewOut
+from app.services.cast_and_crew import CastAndCrewService
+
+
+def seed(engine, rows: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        session.execute(insert(Country), [{"code": f"{i:02d}", "name": f"Country {i}"} for i in range(50)])
+        session.execute(insert(CastAndCrew), [
+            {
+                "first_name": f"First {i}",
+                "last_name": f"Last {i}",
+                "stage_name": f"Stage {i}",
+                "description": "Biography. " * 40,
+            }
+            for i in range(rows)
+        ])
+        session.execute(insert(cast_and_crew_countries), [
+            {"cast_and_crew_id": i + 1, "country_id": i % 50 + 1} for i in range(rows)
+        ])
+        session.commit()
+
+
+def walk(engine, page_size: int, fetch_page) -> float:
+    started = time.perf_counter()
+    total, cursor = 0, None
+    with Session(engine) as session:
+        while True:
+            page, body = fetch_page(session, cursor)
+            total += len(page.items)
+            assert body
+            cursor = page.next_cursor
+            if not cursor:
+                break
+    return total / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--fields", default="id,stage_name")
+    args = parser.parse_args()
+
+    service = CastAndCrewService()
+    adapter = TypeAdapter(list[CastAndCrewOut])
+    fields = args.fields.split(",")
+
+    def full_page(session, cursor):
+        page = service.get_page(session, args.page_size, cursor)
+        body = adapter.dump_json(adapter.validate_python(page.items, from_attributes=True))
+        session.expunge_all()
+        return page, body
+
+    def sparse_page(session, cursor):
+        page = service.get_page_fields(session, fields, args.page_size, cursor)
+        return page, to_json(page.items)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        seed(engine, args.rows)
+
+        full = walk(engine, args.page_size, full_page)
+        sparse = walk(engine, args.page_size, sparse_page)
+        print(f"full ORM + response_model : {full:>12,.0f} rows/s")
+        print(f"sparse ?fields={args.fields:<10}: {sparse:>12,.0f} rows/s ({sparse / full:.1f}x)")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
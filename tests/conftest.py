@@ -1,12 +1,38 @@
+import itertools
+import os
+
+# Minimum bcrypt cost: hashing at the production cost would dominate the suite.
+os.environ.setdefault("PASSWORD_ROUNDS", "4")
+# The app's own database is not the test database; tests start builds themselves.
+os.environ.setdefault("BUILD_SIMILAR_MOVIES_ON_STARTUP", "false")
+
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
 from app.main import app
-from app.db.session import get_db
+from app.auth.dependencies import clear_auth_caches
+from app.auth.jwt import create_access_token
+from app.db.session import get_db, get_async_db
+from app.routes.base_routes import BaseRouter
+from app.schemas.cast_and_crew import CastAndCrewCreate, CastAndCrewUpdate, CastAndCrewOut
+from app.schemas.genre import GenreCreate, GenreUpdate, GenreOut
+from app.services.base_service import BaseEntityService
+from app.services import country as country_service, rate_limit
+from app.services.autocomplete import autocomplete_indexes
+from app.services.cache import caches
+from app.services.compression import compression_stats
+from app.services.model_files import model_stores
+from app.services.similar_movies import similar_movies_index
+from app.services.cast_and_crew import CastAndCrewService
+from app.services.genre import GenreService
 from app.models.user import BaseEntity as UserBase
+from app.schemas.user import UserCreate
+from app.services.user import create_user
 from app.models.position import BaseEntity as GenreBase
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -18,6 +44,59 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+class QueryCounter:
+    """Counts statements sent to the test database."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def reset(self):
+        self.statements.clear()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+@pytest.fixture(autouse=True)
+def raise_on_lazy_load(monkeypatch):
+    """Fail any relationship access that a service did not load eagerly."""
+    monkeypatch.setattr(BaseEntityService, "raise_on_lazy_load", True)
+
+@pytest.fixture(autouse=True)
+def clear_caches(monkeypatch):
+    """Each test starts with empty caches, indexes and no country snapshot."""
+    for cache in caches.values():
+        cache.clear()
+    for index in autocomplete_indexes.values():
+        index.clear()
+    similar_movies_index.clear()
+    compression_stats.reset()
+    clear_auth_caches()
+    if rate_limit.login_limiter is not None:
+        rate_limit.login_limiter.reset()
+    monkeypatch.setattr(country_service, "_snapshot", None)
+
+@pytest.fixture(autouse=True)
+def model_dir(tmp_path, monkeypatch):
+    """Model files are read from and written to a per-test directory, which
+    is listed on every call."""
+    for store in model_stores.values():
+        store.clear()
+        monkeypatch.setattr(store, "directory", str(tmp_path))
+        monkeypatch.setattr(store, "check_seconds", 0)
+    return tmp_path
+
+@pytest.fixture
+def query_counter():
+    """Record the SQL statements executed against the test engine."""
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(engine, "before_cursor_execute", counter)
+
 @pytest.fixture(scope="function")
 def db_session():
     """Create a fresh database session for each test."""
@@ -33,6 +112,21 @@ def db_session():
         UserBase.metadata.drop_all(bind=engine)
         GenreBase.metadata.drop_all(bind=engine)
 
+@pytest.fixture(scope="function")
+def session_client(db_session):
+    """A test client that opens and closes a session per request, like get_db."""
+    def override_get_db():
+        session = TestingSessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
 @pytest.fixture(scope="function")
 def client(db_session):
     """Create a test client with database dependency override."""
@@ -47,6 +141,51 @@ def client(db_session):
         yield test_client
     app.dependency_overrides.clear()
 
+@pytest.fixture(scope="function")
+def async_sqlite_path(tmp_path):
+    """Create a file-backed SQLite database that sync and async engines can share."""
+    database_path = tmp_path / "async_test.db"
+    sync_engine = create_engine(f"sqlite:///{database_path}")
+    UserBase.metadata.create_all(bind=sync_engine)
+    try:
+        yield database_path
+    finally:
+        sync_engine.dispose()
+
+@pytest.fixture(scope="function")
+def async_client(async_sqlite_path):
+    """Create a test client whose BaseRouter endpoints run in async mode."""
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{async_sqlite_path}", poolclass=NullPool)
+    AsyncTestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as session:
+            yield session
+
+    async_app = FastAPI()
+    async_app.include_router(BaseRouter(
+        service=GenreService(),
+        schema_create=GenreCreate,
+        schema_update=GenreUpdate,
+        schema_out=GenreOut,
+        prefix="genres",
+        tags=["Genres"],
+        async_mode=True,
+    ).router)
+    async_app.include_router(BaseRouter(
+        service=CastAndCrewService(),
+        schema_create=CastAndCrewCreate,
+        schema_update=CastAndCrewUpdate,
+        schema_out=CastAndCrewOut,
+        prefix="cast_and_crew",
+        tags=["CastAndCrew"],
+        async_mode=True,
+    ).router)
+    async_app.dependency_overrides[get_async_db] = override_get_async_db
+
+    with TestClient(async_app) as test_client:
+        yield test_client
+
 @pytest.fixture
 def sample_user_data():
     """Sample user data for testing."""
@@ -56,6 +195,19 @@ def sample_user_data():
         "password": "Testpassword123"
     }
 
+@pytest.fixture
+def new_user(db_session, sample_user_data):
+    """Creates a user per call and returns its id and bearer token headers."""
+    numbers = itertools.count()
+
+    def create():
+        number = next(numbers)
+        user = create_user(db_session, UserCreate(**{
+            **sample_user_data, "username": f"user{number}", "email": f"user{number}@example.com",
+        }))
+        return user.id, {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+    return create
+
 @pytest.fixture
 def sample_genre_data():
     """Sample genre data for testing."""
@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.db.pool import InstrumentedQueuePool, WaitHistogram, pool_status, warm_up_pool
+
+@pytest.fixture
+def pooled_engine(tmp_path):
+    """Create a small instrumented QueuePool over a SQLite file."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=2,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    yield engine
+    engine.dispose()
+
+def test_wait_histogram_buckets_and_percentiles():
+    """Test wait times land in the right buckets."""
+    histogram = WaitHistogram(buckets_ms=(1, 10, 100))
+    for wait_ms in (0.5, 0.7, 5, 50, 500):
+        histogram.observe(wait_ms)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 5
+    assert snapshot["buckets"] == {"le_1ms": 2, "le_10ms": 1, "le_100ms": 1, "le_inf": 1}
+    assert snapshot["p50_ms"] == 10
+    assert snapshot["max_ms"] == 500
+
+def test_warm_up_opens_pool_size_connections(pooled_engine):
+    """Test warm-up leaves the minimum connections idle in the pool."""
+    assert warm_up_pool(pooled_engine, connections=5) == 2
+
+    status = pool_status(pooled_engine)
+    assert status["idle"] == 2
+    assert status["checked_out"] == 0
+
+def test_pool_status_reports_overflow_and_timeouts(pooled_engine):
+    """Test checked-out, overflow and timeout numbers while the pool is exhausted."""
+    held = [pooled_engine.connect() for _ in range(3)]
+    try:
+        status = pool_status(pooled_engine)
+        assert status["checked_out"] == 3
+        assert status["overflow"] == 1
+
+        with pytest.raises(exc.TimeoutError):
+            pooled_engine.connect()
+    finally:
+        for connection in held:
+            connection.close()
+
+    wait = pool_status(pooled_engine)["wait"]
+    assert wait["count"] == 4
+    assert wait["timeouts"] == 1
+    assert wait["max_ms"] >= 50
+
+def test_pool_diagnostics_endpoint(client):
+    """Test the diagnostics endpoint reports the primary engine."""
+    response = client.get("/api/diagnostics/pool")
+    assert response.status_code == 200
+    assert "primary" in response.json()
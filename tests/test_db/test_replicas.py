@@ -0,0 +1,104 @@
+import pytest
+from fastapi import Request, status
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.db import replicas
+from app.db.replicas import ReplicaSet, WriteTracker
+from app.models.base_entity import BaseEntity
+from app.models.genre import Genre
+from app.routes.genre import genre_service
+
+def create_replica(path, genre_name):
+    engine = create_engine(f"sqlite:///{path}")
+    BaseEntity.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        session.add(Genre(name=genre_name))
+        session.commit()
+    engine.dispose()
+    return f"sqlite:///{path}"
+
+@pytest.fixture
+def replica_urls(tmp_path):
+    """Two SQLite files standing in for read replicas, each with one distinct genre."""
+    return [
+        create_replica(tmp_path / "replica_a.db", "Replica A"),
+        create_replica(tmp_path / "replica_b.db", "Replica B"),
+    ]
+
+@pytest.fixture
+def replica_client(client, replica_urls, monkeypatch):
+    """Test client whose read endpoints are routed to the replica set, with
+    the genre response cache off so every read reaches a database."""
+    monkeypatch.setattr(genre_service, "cache", None)
+    replica_set = ReplicaSet(replica_urls)
+    monkeypatch.setattr(replicas, "replica_set", replica_set)
+    monkeypatch.setattr(replicas, "write_tracker", WriteTracker(window_seconds=60))
+    yield client
+    replica_set.dispose()
+
+def genre_names(client, limit=None):
+    url = "/api/genres/" if limit is None else f"/api/genres/?limit={limit}"
+    return [genre["name"] for genre in client.get(url).json()]
+
+def test_reads_rotate_across_replicas(replica_client):
+    """Test consecutive reads are spread over all replicas."""
+    seen = {tuple(genre_names(replica_client)) for _ in range(4)}
+    assert seen == {("Replica A",), ("Replica B",)}
+
+def test_down_replica_is_skipped(tmp_path, replica_urls):
+    """Test a replica that cannot be reached is marked down and skipped."""
+    replica_set = ReplicaSet([f"sqlite:///{tmp_path}/missing/dir.db", replica_urls[0]], retry_after=60)
+    for _ in range(3):
+        session = replica_set.open_session()
+        assert session.query(Genre.name).scalar() == "Replica A"
+        session.close()
+    assert replica_set.is_down(0)
+    replica_set.dispose()
+
+def test_falls_back_to_primary_when_all_replicas_down(client, tmp_path, monkeypatch, sample_genre_data):
+    """Test reads use the primary when no replica is healthy."""
+    client.post("/api/genres/", json=sample_genre_data)
+    replica_set = ReplicaSet([f"sqlite:///{tmp_path}/missing/dir.db"])
+    monkeypatch.setattr(replicas, "replica_set", replica_set)
+
+    assert genre_names(client) == [sample_genre_data["name"]]
+
+def test_read_your_writes_pins_client_to_primary(replica_client, sample_genre_data):
+    """Test a client that just wrote reads its own write from the primary."""
+    response = replica_client.post("/api/genres/", json=sample_genre_data)
+    assert response.status_code == status.HTTP_201_CREATED
+
+    assert genre_names(replica_client) == [sample_genre_data["name"]]
+    other_client_reads = replica_client.get("/api/genres/", headers={"Authorization": "Bearer other"})
+    assert other_client_reads.json()[0]["name"].startswith("Replica")
+
+@pytest.fixture
+def async_replica_client(async_client, replica_urls, monkeypatch):
+    """Async-mode test client whose read endpoints are routed to the replica set."""
+    replica_set = ReplicaSet(replica_urls)
+    monkeypatch.setattr(replicas, "replica_set", replica_set)
+    monkeypatch.setattr(replicas, "write_tracker", WriteTracker(window_seconds=60))
+    yield async_client
+    async_client.portal.call(replica_set.dispose_async)
+    replica_set.dispose()
+
+def test_async_reads_use_replicas_and_writes_pin_primary(async_replica_client, sample_genre_data):
+    """Test async endpoints read from replicas and pin a writing client to the primary."""
+    # Each read gets its own limit so the shared genre cache never answers it.
+    seen = {tuple(genre_names(async_replica_client, limit)) for limit in range(1, 5)}
+    assert seen == {("Replica A",), ("Replica B",)}
+
+    response = async_replica_client.post("/api/genres/", json=sample_genre_data)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert genre_names(async_replica_client, 5) == [sample_genre_data["name"]]
+    other_client_reads = async_replica_client.get("/api/genres/?limit=6", headers={"Authorization": "Bearer other"})
+    assert other_client_reads.json()[0]["name"].startswith("Replica")
+
+def test_write_tracker_does_not_keep_tokens():
+    """Test clients are tracked by a hash of their Authorization header, never the token itself."""
+    tracker = WriteTracker(window_seconds=60)
+    request = Request({"type": "http", "headers": [(b"authorization", b"Bearer secret-token")], "client": None})
+    tracker.mark(replicas.client_key(request))
+    assert tracker.wrote_recently(replicas.client_key(request))
+    assert not any("secret-token" in key for key in tracker._last_write)
@@ -0,0 +1,75 @@
+from fastapi import status
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.models.country import Country
+
+def test_async_genre_crud(async_client, sample_genre_data):
+    """Test the full CRUD cycle through async BaseRouter endpoints."""
+    create_response = async_client.post("/api/genres/", json=sample_genre_data)
+    assert create_response.status_code == status.HTTP_201_CREATED
+    genre_id = create_response.json()["id"]
+
+    list_response = async_client.get("/api/genres/")
+    assert list_response.status_code == status.HTTP_200_OK
+    assert [genre["name"] for genre in list_response.json()] == [sample_genre_data["name"]]
+
+    update_response = async_client.put(f"/api/genres/{genre_id}", json={"name": "Updated Action"})
+    assert update_response.status_code == status.HTTP_200_OK
+    assert update_response.json()["name"] == "Updated Action"
+
+    delete_response = async_client.delete(f"/api/genres/{genre_id}")
+    assert delete_response.status_code == status.HTTP_204_NO_CONTENT
+
+    get_response = async_client.get(f"/api/genres/{genre_id}")
+    assert get_response.status_code == status.HTTP_404_NOT_FOUND
+
+def test_async_genre_duplicate_name(async_client, sample_genre_data):
+    """Test async genre creation with duplicate name fails."""
+    async_client.post("/api/genres/", json=sample_genre_data)
+    response = async_client.post("/api/genres/", json=sample_genre_data)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_async_cast_and_crew_relationships(async_client, async_sqlite_path):
+    """Test async create and update handle the countries relationship."""
+    engine = create_engine(f"sqlite:///{async_sqlite_path}")
+    with Session(engine) as session:
+        session.add_all([Country(code="EE", name="Estonia"), Country(code="FI", name="Finland")])
+        session.commit()
+        estonia_id, finland_id = [country.id for country in session.query(Country).order_by(Country.code)]
+    engine.dispose()
+
+    create_response = async_client.post("/api/cast_and_crew/", json={
+        "first_name": "Lembit",
+        "last_name": "Ulfsak",
+        "country_ids": [estonia_id],
+    })
+    assert create_response.status_code == status.HTTP_201_CREATED
+    person = create_response.json()
+    assert [country["code"] for country in person["countries"]] == ["EE"]
+
+    update_response = async_client.put(f"/api/cast_and_crew/{person['id']}", json={
+        "country_ids": [estonia_id, finland_id],
+    })
+    assert update_response.status_code == status.HTTP_200_OK
+    assert sorted(country["code"] for country in update_response.json()["countries"]) == ["EE", "FI"]
+
+    list_response = async_client.get("/api/cast_and_crew/")
+    assert len(list_response.json()[0]["countries"]) == 2
+
+def test_async_cast_and_crew_add_and_remove_ids(async_client, async_sqlite_path):
+    """Test async updates apply add/remove country lists."""
+    engine = create_engine(f"sqlite:///{async_sqlite_path}")
+    with Session(engine) as session:
+        session.add_all([Country(code="EE", name="Estonia"), Country(code="FI", name="Finland")])
+        session.commit()
+        estonia_id, finland_id = [country.id for country in session.query(Country).order_by(Country.code)]
+    engine.dispose()
+
+    person = async_client.post("/api/cast_and_crew/", json={"first_name": "Ita", "country_ids": [estonia_id]}).json()
+    response = async_client.put(f"/api/cast_and_crew/{person['id']}", json={
+        "add_country_ids": [finland_id],
+        "remove_country_ids": [estonia_id],
+    })
+    assert response.status_code == status.HTTP_200_OK
+    assert [country["code"] for country in response.json()["countries"]] == ["FI"]
@@ -0,0 +1,122 @@
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+
+from app.auth.dependencies import claims_cache, user_cache, verification_latency
+from app.auth.jwt import create_access_token
+from app.db.session import get_db
+from app.models.review import Review
+from app.routes.base_routes import BaseRouter
+from app.schemas.genre import GenreCreate, GenreUpdate, GenreOut
+from app.services.cache import ExpiringLRU
+from app.services.genre import GenreService
+from app.services.user import create_user
+from app.schemas.user import UserCreate
+
+
+@pytest.fixture
+def auth_client(db_session):
+    """A genres router whose write routes require a bearer token."""
+    auth_app = FastAPI()
+    auth_app.include_router(BaseRouter(
+        service=GenreService(),
+        schema_create=GenreCreate,
+        schema_update=GenreUpdate,
+        schema_out=GenreOut,
+        prefix="genres",
+        tags=["Genres"],
+        require_auth=True,
+    ).router)
+    auth_app.dependency_overrides[get_db] = lambda: db_session
+    with TestClient(auth_app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def token(db_session, sample_user_data):
+    user = create_user(db_session, UserCreate(**sample_user_data))
+    return create_access_token({"sub": str(user.id)})
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+def test_writes_require_a_valid_token(auth_client, token):
+    """Test writes without or with a bad token get 401 while reads stay open."""
+    genre = {"name": "Drama"}
+    assert auth_client.post("/api/genres/", json=genre).status_code == status.HTTP_401_UNAUTHORIZED
+    bad = auth_client.post("/api/genres/", json=genre, headers=bearer("not-a-token"))
+    assert bad.status_code == status.HTTP_401_UNAUTHORIZED
+    assert bad.headers["www-authenticate"] == "Bearer"
+    assert auth_client.post("/api/genres/bulk", json=[genre]).status_code == status.HTTP_401_UNAUTHORIZED
+
+    created = auth_client.post("/api/genres/", json=genre, headers=bearer(token))
+    assert created.status_code == status.HTTP_201_CREATED
+    assert auth_client.get("/api/genres/").status_code == status.HTTP_200_OK
+    assert auth_client.delete(f"/api/genres/{created.json()['id']}").status_code == status.HTTP_401_UNAUTHORIZED
+
+def test_expired_token_is_rejected(auth_client, db_session, token):
+    """Test an expired token gets 401 and is never cached."""
+    expired = create_access_token({"sub": "1"}, expires_delta=timedelta(seconds=-1))
+    response = auth_client.post("/api/genres/", json={"name": "Drama"}, headers=bearer(expired))
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert claims_cache.stats()["entries"] == 0
+
+def test_burst_costs_one_decode_and_one_lookup(auth_client, token, query_counter):
+    """Test repeated requests with one token reuse the cached claims and user."""
+    before = claims_cache.stats(), user_cache.stats(), verification_latency.snapshot()["count"]
+    query_counter.reset()
+    for name in ("Drama", "Comedy", "Horror"):
+        response = auth_client.post("/api/genres/", json={"name": name}, headers=bearer(token))
+        assert response.status_code == status.HTTP_201_CREATED
+
+    claims_stats, user_stats = claims_cache.stats(), user_cache.stats()
+    assert claims_stats["misses"] - before[0]["misses"] == 1
+    assert claims_stats["hits"] - before[0]["hits"] == 2
+    assert user_stats["misses"] - before[1]["misses"] == 1
+    assert sum("FROM users" in statement for statement in query_counter.statements) == 1
+    assert verification_latency.snapshot()["count"] - before[2] == 3
+
+def test_token_of_deleted_user_is_rejected(auth_client, db_session):
+    """Test a well-formed token for a missing user gets 401."""
+    response = auth_client.post("/api/genres/", json={"name": "Drama"},
+                                headers=bearer(create_access_token({"sub": "999"})))
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+def test_expiring_lru_honours_expiry_and_size():
+    """Test entries expire individually and the oldest entry is evicted first."""
+    cache = ExpiringLRU(max_entries=2)
+    cache.set("a", 1, ttl_seconds=60)
+    cache.set("short", 2, ttl_seconds=0.01)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+    assert cache.stats()["expirations"] == 1
+
+    cache.set("b", 3, ttl_seconds=60)
+    cache.set("c", 4, ttl_seconds=60)
+    assert cache.get("a") is None
+    assert (cache.get("b"), cache.get("c")) == (3, 4)
+    cache.set("never", 5, ttl_seconds=0)
+    assert cache.get("never") is None
+
+def test_auth_diagnostics(client):
+    """Test the diagnostics endpoint reports both caches and the latency histogram."""
+    body = client.get("/api/diagnostics/auth").json()
+    assert set(body) == {"claims_cache", "user_cache", "verification_latency"}
+
+def test_cached_user_outlives_the_request_session(session_client, db_session, new_user):
+    """Test a user cached by a request that committed still serves later requests."""
+    user_id, headers = new_user()
+    movie = session_client.post("/api/movies/", json={"title": "Alien"}).json()["id"]
+    db_session.add(Review(movie_id=movie, user_id=user_id, rating=3))
+    db_session.commit()
+    review = db_session.query(Review.id).scalar()
+
+    # The first authenticated request loads the user and ends with a commit.
+    assert session_client.delete(f"/api/reviews/{review}", headers=headers).status_code == status.HTTP_204_NO_CONTENT
+    response = session_client.post("/api/reviews/", json={"movie_id": movie, "rating": 4}, headers=headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["user_id"] == user_id
+    recommendations = session_client.get(f"/api/users/{user_id}/recommendations", headers=headers)
+    assert recommendations.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
@@ -0,0 +1,163 @@
+import random
+from collections import namedtuple
+
+from fastapi import status
+
+from app.models.country import Country
+from app.models.genre import Genre
+from app.services import autocomplete
+from app.services.autocomplete import AutocompleteIndex, AutocompleteSource, PrefixKeys, fold
+from app.services.country import reload_countries
+
+Row = namedtuple("Row", "id popularity name")
+
+
+def suggest(client, kind, prefix, **params):
+    response = client.get(f"/api/autocomplete/{kind}", params={"prefix": prefix, **params})
+    assert response.status_code == status.HTTP_200_OK
+    return [suggestion["label"] for suggestion in response.json()]
+
+def test_fold():
+    """Test folding drops case, accents and punctuation."""
+    assert fold("  Méliès, GEORGES ") == "melies georges"
+    assert fold("Jean-Luc") == "jean luc"
+    assert fold("--") == ""
+
+def test_prefix_keys_match_a_sorted_list(monkeypatch):
+    """Test bucketed keys agree with a plain sorted list through adds and removes."""
+    monkeypatch.setattr(PrefixKeys, "BUCKET_SIZE", 2)
+    rng = random.Random(0)
+    pairs = sorted((rng.choice(["a", "ab", "abc", "b", "ba"]), id) for id in range(20))
+    keys = PrefixKeys(pairs)
+    for id in range(20, 60):
+        if rng.random() < 0.5:
+            pair = (rng.choice(["a", "ab", "b", "bab", "c"]), id)
+            keys.add(*pair)
+            pairs.append(pair)
+        else:
+            pair = pairs.pop(rng.randrange(len(pairs)))
+            keys.remove(*pair)
+        for prefix in ("a", "ab", "b", "c", "d"):
+            expected = {id for key, id in pairs if key.startswith(prefix)}
+            assert keys.ids(prefix) == expected
+            assert keys.count(prefix) == len(expected)
+    assert len(keys) == len(pairs)
+
+def test_index_ranks_by_popularity_and_matches_every_word():
+    """Test suggestions match any word, rank by popularity and dedupe."""
+    index = AutocompleteIndex("test", AutocompleteSource(Genre, [Genre.name]))
+    index.load([Row(1, 5, "Science Fiction"), Row(2, 9, "Fantasy Fiction"), Row(3, 0, "Film Noir")])
+    assert [s.label for s in index.suggest("fi")] == ["Fantasy Fiction", "Science Fiction", "Film Noir"]
+    assert [s.label for s in index.suggest("FICTION")] == ["Fantasy Fiction", "Science Fiction"]
+    assert [s.label for s in index.suggest("fantasy f")] == ["Fantasy Fiction"]
+    assert [s.label for s in index.suggest("f", limit=1)] == ["Fantasy Fiction"]
+    assert index.suggest("x") == []
+
+def test_cached_rankings_follow_incremental_changes(monkeypatch):
+    """Test cached top results of wide prefixes stay exact across writes."""
+    monkeypatch.setattr(autocomplete, "AUTOCOMPLETE_CACHED_RANGE", 2)
+    index = AutocompleteIndex("test", AutocompleteSource(Genre, [Genre.name]))
+    index.load([Row(i, i, f"Drama {name}") for i, name in enumerate(["a", "b", "c", "d"], start=1)])
+    assert [s.id for s in index.suggest("dr", limit=2)] == [4, 3]
+    assert index.stats()["cached_prefixes"] == 1
+
+    index.apply([5], [Row(5, 10, "Drama e")])
+    assert [s.id for s in index.suggest("dr", limit=2)] == [5, 4]
+    index.apply([5, 4], [Row(4, 0, "Comedy")])
+    assert [s.id for s in index.suggest("dr", limit=2)] == [3, 2]
+    assert [s.id for s in index.suggest("com")] == [4]
+    assert index.stats()["entries"] == 4
+
+def test_autocomplete_follows_service_writes(client, query_counter):
+    """Test creates, updates and deletes show up without a rebuild and reads skip the database."""
+    for name in ("Drama", "Documentary", "Comedy"):
+        client.post("/api/genres/", json={"name": name})
+    assert suggest(client, "genres", "d") == ["Documentary", "Drama"]
+
+    query_counter.reset()
+    assert suggest(client, "genres", "do") == ["Documentary"]
+    assert query_counter.count == 0
+
+    comedy = client.get("/api/genres/", params={"name": "Comedy"}).json()[0]
+    client.put(f"/api/genres/{comedy['id']}", json={"name": "Dark Comedy"})
+    client.post("/api/genres/bulk", json=[{"name": "Disaster"}])
+    assert suggest(client, "genres", "d") == ["Dark Comedy", "Disaster", "Documentary", "Drama"]
+    assert suggest(client, "genres", "comedy") == ["Dark Comedy"]
+
+    client.delete(f"/api/genres/{comedy['id']}")
+    assert suggest(client, "genres", "comedy") == []
+    assert client.get("/api/diagnostics/autocomplete").json()["genres"]["builds"] == 1
+
+def test_cast_and_countries(client, db_session):
+    """Test people match by stage or full name and countries rank by people."""
+    db_session.add_all([Country(code="FR", name="France"), Country(code="FI", name="Finland")])
+    db_session.commit()
+    reload_countries(db_session)
+    france = db_session.query(Country.id).filter_by(code="FR").scalar()
+
+    client.post("/api/cast_and_crew/", json={"stage_name": "Méliès", "first_name": "Georges", "country_ids": [france]})
+    client.post("/api/cast_and_crew/", json={"first_name": "Meryl", "last_name": "Streep"})
+    assert suggest(client, "cast_and_crew", "mel") == ["Méliès"]
+    assert suggest(client, "cast_and_crew", "georges") == ["Méliès"]
+    assert suggest(client, "cast_and_crew", "stre") == ["Meryl Streep"]
+    assert suggest(client, "countries", "f") == ["France", "Finland"]
+    assert suggest(client, "countries", "fi") == ["Finland"]
+
+def test_autocomplete_validation(client):
+    """Test unknown kinds are 404 and a prefix is required."""
+    assert client.get("/api/autocomplete/movies", params={"prefix": "a"}).status_code == status.HTTP_404_NOT_FOUND
+    assert client.get("/api/autocomplete/genres").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert suggest(client, "genres", "!!") == []
+
+def test_writes_during_a_build_are_replayed(client, db_session, monkeypatch):
+    """Test writes committed while the index reads its rows show up after the build."""
+    index = autocomplete.autocomplete_indexes["genres"]
+    client.post("/api/genres/", json={"name": "Drama"})
+    build = index.load
+
+    def load_racing_a_write(rows, generation=None):
+        rows = list(rows)
+        documentary = Genre(name="Documentary")
+        db_session.add(documentary)
+        db_session.commit()
+        index.mark_stale("create", [documentary.id])
+        build(rows, generation)
+
+    monkeypatch.setattr(index, "load", load_racing_a_write)
+    assert suggest(client, "genres", "d") == ["Documentary", "Drama"]
+
+    def load_racing_an_invalidate(rows, generation=None):
+        index.invalidate()
+        build(rows, generation)
+
+    # A build that read its rows before an invalidation is followed by another.
+    builds = index.stats()["builds"]
+    monkeypatch.setattr(index, "load", load_racing_an_invalidate)
+    index.invalidate()
+    suggest(client, "genres", "d")
+    monkeypatch.setattr(index, "load", build)
+    suggest(client, "genres", "d")
+    suggest(client, "genres", "d")
+    assert index.stats()["builds"] == builds + 2
+
+def test_people_rank_by_credits(client):
+    """Test people with more credits come first and credit writes re-rank them."""
+    for first, last in (("Meryl", "Streep"), ("Sharon", "Stone")):
+        stone = client.post("/api/cast_and_crew/", json={"first_name": first, "last_name": last}).json()["id"]
+    movie = client.post("/api/movies/", json={"title": "Casino"}).json()["id"]
+    actor = client.post("/api/positions/", json={"name": "Actor"}).json()["id"]
+    assert suggest(client, "cast_and_crew", "st") == ["Meryl Streep", "Sharon Stone"]
+
+    def credit(person_id):
+        return client.post("/api/movie_credits/", json={
+            "movie_id": movie, "cast_and_crew_id": person_id, "position_id": actor,
+        }).json()["id"]
+
+    stone_credit = credit(stone)
+    assert suggest(client, "cast_and_crew", "st") == ["Sharon Stone", "Meryl Streep"]
+    client.delete(f"/api/movie_credits/{stone_credit}")
+    assert suggest(client, "cast_and_crew", "st") == ["Meryl Streep", "Sharon Stone"]
+    credit(stone)
+    assert suggest(client, "cast_and_crew", "st") == ["Sharon Stone", "Meryl Streep"]
+    client.delete(f"/api/movies/{movie}")
+    assert suggest(client, "cast_and_crew", "st") == ["Meryl Streep", "Sharon Stone"]
@@ -0,0 +1,72 @@
+from fastapi import status
+
+from app.models.country import Country
+
+def test_bulk_create_reports_errors_per_item(client):
+    """Test valid genres are created while invalid and duplicate ones are reported."""
+    items = [
+        {"name": "Drama"},
+        {"name": "Comedy", "description": "Funny"},
+        {"name": "X"},
+        {"name": "Drama"},
+        {"name": "Horror"},
+    ]
+    response = client.post("/api/genres/bulk", params={"chunk_size": 2}, json=items)
+    assert response.status_code == status.HTTP_200_OK
+    result = response.json()
+
+    assert [item["index"] for item in result["succeeded"]] == [0, 1, 4]
+    assert [item["index"] for item in result["failed"]] == [2, 3]
+    assert "already exists" in result["failed"][1]["detail"]
+
+    names = sorted(genre["name"] for genre in client.get("/api/genres/").json())
+    assert names == ["Comedy", "Drama", "Horror"]
+
+def test_bulk_create_links_countries(client, db_session):
+    """Test bulk created cast and crew get their country links."""
+    db_session.add_all([Country(code="EE", name="Estonia"), Country(code="LV", name="Latvia")])
+    db_session.commit()
+    estonia, latvia = db_session.query(Country).order_by(Country.code).all()
+
+    response = client.post("/api/cast_and_crew/bulk", json=[
+        {"first_name": "Ita", "country_ids": [estonia.id, latvia.id]},
+        {"first_name": "Juhan", "country_ids": [latvia.id, 999]},
+        {"first_name": "Nobody"},
+    ])
+    ids = [item["id"] for item in response.json()["succeeded"]]
+    assert len(ids) == 3
+
+    people = {person["id"]: person for person in client.get("/api/cast_and_crew/").json()}
+    assert sorted(country["code"] for country in people[ids[0]]["countries"]) == ["EE", "LV"]
+    assert [country["code"] for country in people[ids[1]]["countries"]] == ["LV"]
+    assert people[ids[2]]["countries"] == []
+
+def test_bulk_update(client):
+    """Test bulk update applies partial changes and reports missing ids."""
+    created = client.post("/api/genres/bulk", json=[{"name": "Drama"}, {"name": "Comedy"}]).json()["succeeded"]
+    drama_id, comedy_id = [item["id"] for item in created]
+
+    response = client.put("/api/genres/bulk", json=[
+        {"id": drama_id, "description": "Serious"},
+        {"id": comedy_id, "name": "Drama"},
+        {"id": 999, "name": "Missing"},
+        {"name": "No id"},
+    ])
+    result = response.json()
+    assert [item["id"] for item in result["succeeded"]] == [drama_id]
+    assert [item["index"] for item in result["failed"]] == [1, 2, 3]
+
+    drama = client.get(f"/api/genres/{drama_id}").json()
+    assert drama == {"id": drama_id, "name": "Drama", "description": "Serious"}
+    assert client.get(f"/api/genres/{comedy_id}").json()["name"] == "Comedy"
+
+def test_bulk_delete(client):
+    """Test bulk delete removes existing rows and their links."""
+    created = client.post("/api/cast_and_crew/bulk", json=[{"first_name": "A"}, {"first_name": "B"}]).json()
+    ids = [item["id"] for item in created["succeeded"]]
+
+    response = client.request("DELETE", "/api/cast_and_crew/bulk", json=ids + [999])
+    result = response.json()
+    assert [item["id"] for item in result["succeeded"]] == ids
+    assert result["failed"] == [{"index": 2, "id": 999, "detail": "Entity not found"}]
+    assert client.get("/api/cast_and_crew/").json() == []
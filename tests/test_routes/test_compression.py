@@ -0,0 +1,106 @@
+import gzip
+import json
+
+from fastapi import status
+
+from app.services.compression import StreamCompressor, negotiate
+from app.services.country import seed_countries
+
+
+def genre_name(index):
+    return f"Genre {chr(65 + index // 26)}{chr(65 + index % 26)}"
+
+def add_genres(client, count):
+    client.post("/api/genres/bulk", json=[
+        {"name": genre_name(i), "description": "A fairly long description of the genre " * 2}
+        for i in range(count)
+    ])
+
+def test_negotiate():
+    """Test Accept-Encoding negotiation honours q-values and wildcards."""
+    assert negotiate(None) is None
+    assert negotiate("identity") is None
+    assert negotiate("gzip, deflate") == "gzip"
+    assert negotiate("gzip;q=0") is None
+    assert negotiate("*") is not None
+
+def test_stream_compressor_output_is_decodable_per_chunk():
+    """Test every flushed chunk can be decoded before the stream ends."""
+    compressor = StreamCompressor("gzip")
+    first = compressor.compress(b'{"a": 1}\n')
+    rest = compressor.compress(b'{"b": 2}\n') + compressor.finish()
+    assert first
+    assert gzip.decompress(first + rest) == b'{"a": 1}\n{"b": 2}\n'
+
+def test_large_response_is_compressed(client):
+    """Test a response above the threshold is gzipped and marked as varying."""
+    add_genres(client, 30)
+    response = client.get("/api/genres/", params={"fields": "name,description"}, headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert len(response.json()) == 30
+
+def test_small_or_unaccepted_response_is_not_compressed(client, sample_genre_data):
+    """Test small bodies and clients without gzip get the identity encoding."""
+    client.post("/api/genres/", json=sample_genre_data)
+    small = client.get("/api/genres/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert small.headers["vary"] == "Accept-Encoding"
+
+    add_genres(client, 30)
+    identity = client.get("/api/genres/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert len(identity.json()) == 31
+
+def test_streamed_export_is_compressed(client):
+    """Test a streamed export is compressed chunk by chunk and decodes whole."""
+    add_genres(client, 30)
+    response = client.get("/api/genres/export", params={"chunk_size": 5}, headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert [json.loads(line)["name"] for line in response.text.splitlines()] == [genre_name(i) for i in range(30)]
+
+def test_cached_list_is_served_precompressed(client):
+    """Test a cache hit serves the stored gzip bytes without compressing again."""
+    add_genres(client, 30)
+    first = client.get("/api/genres/", headers={"Accept-Encoding": "gzip"})
+    second = client.get("/api/genres/", headers={"Accept-Encoding": "gzip"})
+
+    assert second.headers["content-encoding"] == "gzip"
+    assert second.content == first.content
+    stats = client.get("/api/diagnostics/compression").json()["/api/genres/"]
+    assert stats["responses"] == 2
+    assert stats["precompressed_responses"] == 2
+    assert stats["cpu_seconds"] == 0
+    assert stats["bytes_saved"] > 0
+
+def test_encoded_etag_still_validates(client):
+    """Test the ETag of a compressed representation revalidates and matches If-Match."""
+    add_genres(client, 30)
+    response = client.get("/api/genres/", headers={"Accept-Encoding": "gzip"})
+    etag = response.headers["etag"]
+    assert etag.endswith('-gzip"')
+
+    revalidated = client.get("/api/genres/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+
+    genre_id = response.json()[0]["id"]
+    detail_etag = client.get(f"/api/genres/{genre_id}").headers["etag"]
+    updated = client.put(f"/api/genres/{genre_id}", json={"name": "Renamed"},
+                         headers={"If-Match": detail_etag[:-1] + '-gzip"'})
+    assert updated.status_code == status.HTTP_200_OK
+
+def test_country_snapshot_is_precompressed(client, db_session):
+    """Test the country list is compressed once with the snapshot."""
+    seed_countries(db_session)
+    response = client.get("/api/countries/", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"].endswith('-gzip"')
+    assert len(response.json()) > 200
+    stats = client.get("/api/diagnostics/compression").json()["/api/countries/"]
+    assert stats["precompressed_responses"] == 1
+    assert stats["precompress_cpu_seconds"] > 0
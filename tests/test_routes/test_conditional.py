@@ -0,0 +1,153 @@
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+from fastapi import status
+
+from app.models.genre import Genre
+
+def create_person(client, first_name="Ita"):
+    response = client.post("/api/cast_and_crew/", json={"first_name": first_name})
+    return response.json()["id"], response.headers["ETag"]
+
+def test_list_if_none_match_is_one_query(client, query_counter):
+    """Test an unchanged list answers 304 from one query over the page's ids and versions."""
+    create_person(client)
+    etag = client.get("/api/cast_and_crew/").headers["ETag"]
+
+    query_counter.reset()
+    response = client.get("/api/cast_and_crew/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert query_counter.count == 1
+
+def test_list_etag_changes_on_every_kind_of_write(client):
+    """Test create, update and delete all change the collection ETag."""
+    person_id, _ = create_person(client)
+    etags = [client.get("/api/cast_and_crew/").headers["ETag"]]
+    other_id, _ = create_person(client, "Other")
+    etags.append(client.get("/api/cast_and_crew/").headers["ETag"])
+    client.put(f"/api/cast_and_crew/{person_id}", json={"last_name": "Ever"})
+    etags.append(client.get("/api/cast_and_crew/").headers["ETag"])
+    client.delete(f"/api/cast_and_crew/{other_id}")
+    etags.append(client.get("/api/cast_and_crew/").headers["ETag"])
+
+    assert len(set(etags)) == 4
+    response = client.get("/api/cast_and_crew/", headers={"If-None-Match": etags[0]})
+    assert response.status_code == status.HTTP_200_OK
+
+def test_unconditional_list_runs_no_count(client, query_counter):
+    """Test a plain list request only reads its page, and the total is counted on request."""
+    create_person(client)
+    query_counter.reset()
+    response = client.get("/api/cast_and_crew/")
+    assert "ETag" in response.headers and "Last-Modified" not in response.headers
+    assert not any("count(" in statement.lower() for statement in query_counter.statements)
+    assert query_counter.count == 2  # page, countries
+
+    query_counter.reset()
+    response = client.get("/api/cast_and_crew/", params={"include_total": "true"})
+    assert response.headers["X-Total-Count"] == "1"
+    assert query_counter.count == 3  # page, countries, count
+
+def test_list_etag_is_per_page_and_view(client):
+    """Test pages, sorts and fieldsets get their own tags, and a write elsewhere keeps a page's tag."""
+    first_id, _ = create_person(client, "Ann")
+    second_id, _ = create_person(client, "Bob")
+    first = client.get("/api/cast_and_crew/", params={"limit": 1})
+    second = client.get("/api/cast_and_crew/", params={"limit": 1, "cursor": first.headers["X-Next-Cursor"]})
+    views = [
+        first, second,
+        client.get("/api/cast_and_crew/", params={"limit": 1, "sort": "-id"}),
+        client.get("/api/cast_and_crew/", params={"limit": 1, "fields": "id"}),
+    ]
+    assert len({view.headers["ETag"] for view in views}) == 4
+    response = client.get("/api/cast_and_crew/", params={"limit": 1}, headers={"If-None-Match": second.headers["ETag"]})
+    assert response.status_code == status.HTTP_200_OK
+
+    client.put(f"/api/cast_and_crew/{second_id}", json={"last_name": "Later"})
+    response = client.get("/api/cast_and_crew/", params={"limit": 1}, headers={"If-None-Match": first.headers["ETag"]})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    client.put(f"/api/cast_and_crew/{first_id}", json={"last_name": "Later"})
+    response = client.get("/api/cast_and_crew/", params={"limit": 1}, headers={"If-None-Match": first.headers["ETag"]})
+    assert response.status_code == status.HTTP_200_OK
+
+def test_detail_etag_and_last_modified(client, query_counter):
+    """Test detail GETs revalidate by ETag or date without loading the entity."""
+    person_id, created_etag = create_person(client)
+    response = client.get(f"/api/cast_and_crew/{person_id}")
+    assert response.headers["ETag"] == created_etag == '"v1"'
+    last_modified = response.headers["Last-Modified"]
+
+    query_counter.reset()
+    response = client.get(f"/api/cast_and_crew/{person_id}", headers={"If-None-Match": '"v1"'})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert query_counter.count == 1
+
+    response = client.get(f"/api/cast_and_crew/{person_id}", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    earlier = format_datetime(datetime.now(timezone.utc) - timedelta(days=1), usegmt=True)
+    response = client.get(f"/api/cast_and_crew/{person_id}", headers={"If-Modified-Since": earlier})
+    assert response.status_code == status.HTTP_200_OK
+
+def test_sparse_detail_has_its_own_etag(client):
+    """Test a sparse representation is tagged differently from the full one."""
+    person_id, etag = create_person(client)
+    response = client.get(f"/api/cast_and_crew/{person_id}", params={"fields": "first_name"})
+    assert response.json() == {"first_name": "Ita"}
+    assert response.headers["ETag"] not in (etag, None)
+    response = client.get(
+        f"/api/cast_and_crew/{person_id}",
+        params={"fields": "first_name"},
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+def test_cached_response_revalidates_without_queries(client, sample_genre_data, query_counter):
+    """Test a cached list answers If-None-Match from the cache."""
+    client.post("/api/genres/", json=sample_genre_data)
+    etag = client.get("/api/genres/").headers["ETag"]
+
+    query_counter.reset()
+    response = client.get("/api/genres/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert query_counter.count == 0
+
+def test_if_match_guards_update_and_delete(client):
+    """Test PUT and DELETE with a stale If-Match fail with 412."""
+    person_id, etag = create_person(client)
+    response = client.put(f"/api/cast_and_crew/{person_id}", json={"last_name": "Ever"}, headers={"If-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    new_etag = response.headers["ETag"]
+    assert new_etag == '"v2"'
+
+    response = client.put(f"/api/cast_and_crew/{person_id}", json={"last_name": "Lost"}, headers={"If-Match": etag})
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+    response = client.delete(f"/api/cast_and_crew/{person_id}", headers={"If-Match": etag})
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+    assert client.get(f"/api/cast_and_crew/{person_id}").json()["last_name"] == "Ever"
+
+    response = client.delete(f"/api/cast_and_crew/{person_id}", headers={"If-Match": new_etag})
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    response = client.delete(f"/api/cast_and_crew/{person_id}", headers={"If-Match": new_etag})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+def test_bulk_update_bumps_versions(client, db_session):
+    """Test bulk updates move the version like single updates do."""
+    ids = [client.post("/api/genres/", json={"name": name}).json()["id"] for name in ("Drama", "Horror")]
+    client.put("/api/genres/bulk", json=[{"id": ids[0], "name": "Noir"}, {"id": ids[1], "description": "Scary"}])
+
+    versions = dict(db_session.query(Genre.id, Genre.version))
+    assert versions == {ids[0]: 2, ids[1]: 2}
+
+def test_async_routes_answer_conditional_requests(async_client, sample_genre_data):
+    """Test ETags and If-Match behave the same in async mode."""
+    created = async_client.post("/api/genres/", json=sample_genre_data)
+    genre_id, etag = created.json()["id"], created.headers["ETag"]
+
+    response = async_client.get(f"/api/genres/{genre_id}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    list_etag = async_client.get("/api/genres/").headers["ETag"]
+    assert async_client.get("/api/genres/", headers={"If-None-Match": list_etag}).status_code == status.HTTP_304_NOT_MODIFIED
+
+    response = async_client.put(f"/api/genres/{genre_id}", json={"name": "Noir"}, headers={"If-Match": '"v7"'})
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
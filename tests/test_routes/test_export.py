@@ -0,0 +1,74 @@
+import asyncio
+import csv
+import io
+import json
+
+from fastapi import status
+
+from app.models.country import Country
+from app.routes.export import stream_until_disconnect
+
+def add_people(client, db_session, count):
+    db_session.add_all([Country(code="EE", name="Estonia"), Country(code="FI", name="Finland")])
+    db_session.commit()
+    country_ids = [country_id for (country_id,) in db_session.query(Country.id).order_by(Country.id)]
+    client.post("/api/cast_and_crew/bulk", json=[
+        {"first_name": f"First {i}", "country_ids": country_ids[:i % 3]} for i in range(count)
+    ])
+
+def test_ndjson_export_matches_list(client, db_session, query_counter):
+    """Test NDJSON export returns every row, with relationships, one chunk per fetch."""
+    add_people(client, db_session, 5)
+    listed = client.get("/api/cast_and_crew/").json()
+
+    query_counter.reset()
+    response = client.get("/api/cast_and_crew/export", params={"chunk_size": 2})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="cast_and_crew.ndjson"'
+    assert [json.loads(line) for line in response.text.splitlines()] == listed
+    # One streaming SELECT plus a batched countries load per chunk of 2 rows.
+    assert query_counter.count <= 1 + 3
+
+def test_csv_export(client, db_session):
+    """Test CSV export writes a header and JSON-encodes nested values."""
+    add_people(client, db_session, 3)
+    response = client.get("/api/cast_and_crew/export", params={"format": "csv", "first_name": "First 2"})
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["first_name"] for row in rows] == ["First 2"]
+    assert [country["code"] for country in json.loads(rows[0]["countries"])] == ["EE", "FI"]
+
+def test_export_of_empty_table_and_bad_filter(client):
+    """Test an empty export and filter validation before streaming starts."""
+    assert client.get("/api/genres/export").text == ""
+    assert client.get("/api/genres/export", params={"format": "csv"}).text.splitlines() == ["name,description,id"]
+    assert client.get("/api/genres/export", params={"format": "xml"}).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+def test_stream_stops_and_closes_on_disconnect():
+    """Test a client disconnect stops fetching and closes the chunk iterator."""
+    fetched, closed = [], []
+
+    def chunks():
+        try:
+            for i in range(100):
+                fetched.append(i)
+                yield b"chunk"
+        finally:
+            closed.append(True)
+
+    class Request:
+        def __init__(self):
+            self.checks = 0
+
+        async def is_disconnected(self):
+            self.checks += 1
+            return self.checks > 2
+
+    async def consume():
+        return [chunk async for chunk in stream_until_disconnect(Request(), chunks())]
+
+    assert asyncio.run(consume()) == [b"chunk", b"chunk"]
+    assert fetched == [0, 1]
+    assert closed == [True]
@@ -0,0 +1,73 @@
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+
+from app.db.session import get_db
+from app.models.country import Country
+from app.routes import responses
+from app.routes.base_routes import BaseRouter
+from app.schemas.cast_and_crew import CastAndCrewCreate, CastAndCrewUpdate, CastAndCrewOut
+from app.services.cast_and_crew import CastAndCrewService
+
+@pytest.fixture
+def fast_client(db_session):
+    """Test client with a cast_and_crew BaseRouter in fast JSON mode."""
+    fast_app = FastAPI()
+    fast_app.include_router(BaseRouter(
+        service=CastAndCrewService(),
+        schema_create=CastAndCrewCreate,
+        schema_update=CastAndCrewUpdate,
+        schema_out=CastAndCrewOut,
+        prefix="cast_and_crew",
+        tags=["CastAndCrew"],
+        fast_json=True,
+    ).router)
+    fast_app.dependency_overrides[get_db] = lambda: db_session
+    with TestClient(fast_app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def country_ids(db_session):
+    db_session.add_all([Country(code="EE", name="Estonia"), Country(code="FI", name="Finland")])
+    db_session.commit()
+    return [country_id for (country_id,) in db_session.query(Country.id).order_by(Country.id)]
+
+def test_fast_mode_matches_response_model_output(client, fast_client, country_ids):
+    """Test fast responses carry the same JSON and headers as the standard path."""
+    created = fast_client.post("/api/cast_and_crew/", json={"first_name": "Ita", "country_ids": country_ids})
+    assert created.status_code == status.HTTP_201_CREATED
+    assert created.headers["ETag"] == '"v1"'
+    person_id = created.json()["id"]
+
+    for path in ("/api/cast_and_crew/", f"/api/cast_and_crew/{person_id}"):
+        standard, fast = client.get(path), fast_client.get(path)
+        assert fast.json() == standard.json()
+        assert fast.headers["ETag"] == standard.headers["ETag"]
+        assert fast.headers["content-type"] == "application/json"
+
+    updated = fast_client.put(f"/api/cast_and_crew/{person_id}", json={"remove_country_ids": country_ids[:1]})
+    assert updated.status_code == status.HTTP_200_OK
+    assert [country["code"] for country in updated.json()["countries"]] == ["FI"]
+    assert updated.headers["ETag"] == '"v2"'
+
+def test_fast_response_helper(monkeypatch):
+    """Test hand-written routes get bytes only when fast mode is on."""
+    payload = {"id": 1, "username": "ita"}
+    assert responses.fast_response(payload) is payload
+
+    monkeypatch.setattr(responses, "FAST_JSON_RESPONSES", True)
+    response = responses.fast_response(payload, status_code=status.HTTP_201_CREATED)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.body == b'{"id":1,"username":"ita"}'
+
+def test_fast_user_routes(client, sample_user_data, monkeypatch):
+    """Test the user router returns the same payloads in fast mode."""
+    monkeypatch.setattr(responses, "FAST_JSON_RESPONSES", True)
+    response = client.post("/api/users/", json=sample_user_data)
+    assert response.status_code == status.HTTP_201_CREATED
+    user_id = response.json()["id"]
+    assert client.get(f"/api/users/{user_id}").json() == {
+        "id": user_id,
+        "username": sample_user_data["username"],
+        "email": sample_user_data["email"],
+    }
@@ -0,0 +1,153 @@
+from fastapi import status
+from sqlalchemy import text
+
+from app.services.ratings import drifted_movie_ids, reconcile_ratings
+
+
+def add_movie(client, **fields):
+    response = client.post("/api/movies/", json={"title": "Alien", **fields})
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.json()
+
+def add_review(client, headers, movie_id, rating, **fields):
+    response = client.post("/api/reviews/", json={"movie_id": movie_id, "rating": rating, **fields}, headers=headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.json()
+
+def ratings(client, movie_id):
+    movie = client.get(f"/api/movies/{movie_id}").json()
+    return movie["rating_count"], movie["rating_sum"], movie["rating_mean"], movie["rating_histogram"]
+
+def test_movie_with_genres_starts_unrated(client):
+    """Test a new movie links its genres and has empty aggregates."""
+    genre = client.post("/api/genres/", json={"name": "Horror"}).json()
+    movie = add_movie(client, genre_ids=[genre["id"]], release_date="1979-05-25")
+    assert [g["name"] for g in movie["genres"]] == ["Horror"]
+    assert ratings(client, movie["id"]) == (0, 0, None, [0, 0, 0, 0, 0])
+
+def test_review_writes_update_aggregates(client, new_user):
+    """Test create, update and delete of reviews keep the movie aggregates exact."""
+    (_, alice), (_, bob) = new_user(), new_user()
+    movie_id = add_movie(client)["id"]
+    first = add_review(client, alice, movie_id, 5)
+    add_review(client, bob, movie_id, 2)
+    assert ratings(client, movie_id) == (2, 7, 3.5, [0, 1, 0, 0, 1])
+
+    client.put(f"/api/reviews/{first['id']}", json={"rating": 4}, headers=alice)
+    assert ratings(client, movie_id) == (2, 6, 3.0, [0, 1, 0, 1, 0])
+
+    client.put(f"/api/reviews/{first['id']}", json={"title": "Still good"}, headers=alice)
+    client.delete(f"/api/reviews/{first['id']}", headers=alice)
+    assert ratings(client, movie_id) == (1, 2, 2.0, [0, 1, 0, 0, 0])
+
+def test_review_changes_the_movie_etag(client, new_user):
+    """Test a new review changes the movie's ETag, so cached copies revalidate."""
+    _, headers = new_user()
+    movie_id = add_movie(client)["id"]
+    etag = client.get(f"/api/movies/{movie_id}").headers["etag"]
+    add_review(client, headers, movie_id, 3)
+    response = client.get(f"/api/movies/{movie_id}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["rating_count"] == 1
+
+def test_bulk_review_writes_and_failed_rows(client, new_user):
+    """Test bulk writes apply every row's delta and failed rows apply none."""
+    _, headers = new_user()
+    alien, heat = add_movie(client)["id"], add_movie(client, title="Heat")["id"]
+    response = client.post("/api/reviews/bulk", headers=headers, json=[
+        {"movie_id": alien, "rating": 1},
+        {"movie_id": heat, "rating": 3},
+        # A second review by the same user is rejected by the unique index.
+        {"movie_id": alien, "rating": 5},
+        {"movie_id": heat, "rating": 6},
+    ]).json()
+    assert [item["index"] for item in response["failed"]] == [2, 3]
+    assert ratings(client, alien) == (1, 1, 1.0, [1, 0, 0, 0, 0])
+    assert ratings(client, heat) == (1, 3, 3.0, [0, 0, 1, 0, 0])
+
+    ids = [item["id"] for item in response["succeeded"]]
+    client.put("/api/reviews/bulk", json=[{"id": ids[0], "rating": 5}, {"id": ids[1], "rating": 5}], headers=headers)
+    assert ratings(client, alien) == (1, 5, 5.0, [0, 0, 0, 0, 1])
+    client.request("DELETE", "/api/reviews/bulk", json=ids, headers=headers)
+    assert ratings(client, alien) == (0, 0, None, [0, 0, 0, 0, 0])
+    assert ratings(client, heat) == (0, 0, None, [0, 0, 0, 0, 0])
+
+def test_reviews_belong_to_their_author(client, new_user):
+    """Test reviews need a token, take their author from it and only the author can change them."""
+    (alice_id, alice), (_, bob) = new_user(), new_user()
+    movie_id = add_movie(client)["id"]
+    response = client.post("/api/reviews/", json={"movie_id": movie_id, "rating": 4})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    review = add_review(client, alice, movie_id, 4, user_id=alice_id + 1)
+    assert review["user_id"] == alice_id
+    path = f"/api/reviews/{review['id']}"
+    etag = client.get(path).headers["etag"]
+    assert client.put(path, json={"rating": 1}, headers=bob).status_code == status.HTTP_404_NOT_FOUND
+    assert client.put(path, json={"rating": 1}, headers={**bob, "If-Match": etag}).status_code == status.HTTP_404_NOT_FOUND
+    assert client.delete(path, headers=bob).status_code == status.HTTP_404_NOT_FOUND
+    bulk = client.put("/api/reviews/bulk", json=[{"id": review["id"], "rating": 1}], headers=bob).json()
+    assert [item["detail"] for item in bulk["failed"]] == ["Entity not found"]
+    bulk = client.request("DELETE", "/api/reviews/bulk", json=[review["id"]], headers=bob).json()
+    assert bulk["succeeded"] == []
+    assert ratings(client, movie_id) == (1, 4, 4.0, [0, 0, 0, 1, 0])
+    assert client.delete(path, headers=alice).status_code == status.HTTP_204_NO_CONTENT
+
+def test_movies_sort_by_rating(client, new_user):
+    """Test movies can be listed best rated first."""
+    _, headers = new_user()
+    for title, rating in (("Alien", 4), ("Cats", 1), ("Heat", 5)):
+        add_review(client, headers, add_movie(client, title=title)["id"], rating)
+    response = client.get("/api/movies/", params={"sort": "-rating_mean"})
+    assert [movie["title"] for movie in response.json()] == ["Heat", "Alien", "Cats"]
+
+def test_delete_movie_removes_reviews_and_credits(client, db_session, new_user):
+    """Test deleting a movie, conditionally or in bulk, takes its reviews and credits along."""
+    _, headers = new_user()
+    person = client.post("/api/cast_and_crew/", json={"first_name": "Sigourney"}).json()
+    position = client.post("/api/positions/", json={"name": "Actor"}).json()
+    movies = [add_movie(client)["id"] for _ in range(2)]
+    for movie_id in movies:
+        add_review(client, headers, movie_id, 4)
+        credit = client.post("/api/movie_credits/", json={
+            "movie_id": movie_id, "cast_and_crew_id": person["id"], "position_id": position["id"],
+            "character_name": "Ripley",
+        })
+        assert credit.status_code == status.HTTP_201_CREATED
+    listed = client.get("/api/movie_credits/", params={"movie_id": movies[0]}).json()
+    assert [credit["character_name"] for credit in listed] == ["Ripley"]
+
+    etag = client.get(f"/api/movies/{movies[0]}").headers["etag"]
+    assert client.delete(f"/api/movies/{movies[0]}", headers={"If-Match": etag}).status_code == status.HTTP_204_NO_CONTENT
+    assert client.request("DELETE", "/api/movies/bulk", json=[movies[1]]).json()["failed"] == []
+    assert db_session.execute(text("SELECT count(*) FROM reviews")).scalar() == 0
+    assert db_session.execute(text("SELECT count(*) FROM movie_credits")).scalar() == 0
+
+def test_genres_autocomplete_by_movie_count(client):
+    """Test genre suggestions rank genres with more movies first."""
+    drama, documentary = (client.post("/api/genres/", json={"name": name}).json()["id"] for name in ("Drama", "Documentary"))
+    assert [g["label"] for g in client.get("/api/autocomplete/genres", params={"prefix": "d"}).json()] == ["Documentary", "Drama"]
+    add_movie(client, genre_ids=[drama])
+    assert [g["label"] for g in client.get("/api/autocomplete/genres", params={"prefix": "d"}).json()] == ["Drama", "Documentary"]
+
+def test_reconciliation_finds_and_repairs_drift(client, db_session, new_user):
+    """Test the job reports drift in check-only mode and repairs it in batches."""
+    _, headers = new_user()
+    movies = [add_movie(client, title=title)["id"] for title in ("Alien", "Heat", "Cats")]
+    for movie_id, rating in zip(movies, (5, 3, 1)):
+        add_review(client, headers, movie_id, rating)
+    assert drifted_movie_ids(db_session, movies) == []
+
+    db_session.execute(text("UPDATE movies SET rating_sum = 40, rating_mean = 40 WHERE id = :id"), {"id": movies[0]})
+    db_session.execute(text("UPDATE movies SET rating_count = 0, rating_mean = NULL, rating_1 = 0 WHERE id = :id"),
+                       {"id": movies[2]})
+    db_session.commit()
+
+    report = reconcile_ratings(db_session, batch_size=2, repair=False)
+    assert (report.checked, report.drifted, report.repaired) == (3, [movies[0], movies[2]], 0)
+
+    report = reconcile_ratings(db_session, batch_size=2)
+    assert (report.drifted, report.repaired) == ([movies[0], movies[2]], 2)
+    assert ratings(client, movies[0]) == (1, 5, 5.0, [0, 0, 0, 0, 1])
+    assert ratings(client, movies[2]) == (1, 1, 1.0, [1, 0, 0, 0, 0])
+    assert reconcile_ratings(db_session, batch_size=2).drifted == []
@@ -0,0 +1,103 @@
+from datetime import date
+
+import pytest
+from fastapi import status
+
+from app.models.cast_and_crew import CastAndCrew
+from app.services.cast_and_crew import CastAndCrewService
+from app.services.pagination import DEFAULT_PAGE_LIMIT, encode_cursor
+
+@pytest.fixture
+def cast_rows(db_session):
+    """Cast and crew rows with repeated and missing sort values."""
+    rows = [
+        CastAndCrew(
+            first_name=f"First{i % 4}",
+            last_name=f"Last{i % 5}",
+            stage_name=None if i % 3 == 0 else f"Stage{i % 4}",
+            birth_date=date(1950 + i % 7, 1, 1) if i % 2 else None,
+        )
+        for i in range(23)
+    ]
+    db_session.add_all(rows)
+    db_session.commit()
+    return rows
+
+def walk_pages(client, **params):
+    ids, cursor, pages = [], None, 0
+    while True:
+        query = {**params, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/cast_and_crew/", params=query)
+        assert response.status_code == status.HTTP_200_OK
+        ids.extend(person["id"] for person in response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids, pages
+
+def expected_order(rows, field, descending):
+    def key(row):
+        value = getattr(row, field)
+        return (value is None, value if value is not None else 0, row.id)
+    ordered = sorted(rows, key=key)
+    return [row.id for row in (reversed(ordered) if descending else ordered)]
+
+@pytest.mark.parametrize("field", ["id", "last_name", "stage_name", "birth_date"])
+@pytest.mark.parametrize("descending", [False, True])
+def test_keyset_pages_cover_every_row_once(client, cast_rows, field, descending):
+    """Test walking the cursor returns each row exactly once in sort order."""
+    sort = f"-{field}" if descending else field
+    ids, pages = walk_pages(client, limit=4, sort=sort)
+    assert ids == expected_order(cast_rows, field, descending)
+    assert pages == 6
+
+def query_plan(db_session, stmt):
+    compiled = stmt.compile(bind=db_session.get_bind())
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    return [row[-1] for row in db_session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params)]
+
+@pytest.mark.parametrize("field, value", [("last_name", "Last2"), ("stage_name", "Stage1"), ("birth_date", "1953-01-01")])
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("at", ["start", "value", "null"])
+def test_pages_are_index_range_scans(db_session, field, value, descending, at):
+    """Test every page query of a nullable sort column walks its (column, id) index without sorting."""
+    sort = f"-{field}" if descending else field
+    cursor = {"start": None, "value": encode_cursor(sort, value, 7), "null": encode_cursor(sort, None, 7)}[at]
+    statements = CastAndCrewService()._page_statements(4, cursor, sort, None)
+    for stmt in statements:
+        plan = " | ".join(query_plan(db_session, stmt.limit(5)))
+        assert f"ix_cast_and_crew_{field}_id" in plan
+        assert "TEMP B-TREE" not in plan and "MULTI-INDEX OR" not in plan, plan
+
+def test_filter_and_total_count(client, cast_rows):
+    """Test filters restrict rows and the total is only returned on request."""
+    response = client.get("/api/cast_and_crew/", params={"last_name": "Last1", "limit": 2})
+    assert "X-Total-Count" not in response.headers
+    assert all(person["last_name"] == "Last1" for person in response.json())
+
+    response = client.get("/api/cast_and_crew/", params={"last_name": "Last1", "limit": 2, "include_total": True})
+    assert response.headers["X-Total-Count"] == str(sum(1 for row in cast_rows if row.last_name == "Last1"))
+    assert 'rel="next"' in response.headers["Link"]
+
+def test_invalid_sort_and_cursor(client, cast_rows):
+    """Test unknown sort fields and tampered cursors are rejected."""
+    assert client.get("/api/cast_and_crew/", params={"sort": "description"}).status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get("/api/cast_and_crew/", params={"cursor": "not-a-cursor"}).status_code == status.HTTP_400_BAD_REQUEST
+
+    cursor = client.get("/api/cast_and_crew/", params={"limit": 2, "sort": "last_name"}).headers["X-Next-Cursor"]
+    response = client.get("/api/cast_and_crew/", params={"cursor": cursor, "sort": "stage_name"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_default_limit_truncates_with_a_next_link(client):
+    """Test a list without limit returns DEFAULT_PAGE_LIMIT items and links the rest."""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    names = [{"name": f"Genre {letters[i // 26]}{letters[i % 26]}"} for i in range(DEFAULT_PAGE_LIMIT + 5)]
+    assert client.post("/api/genres/bulk", json=names).json()["failed"] == []
+    response = client.get("/api/genres/")
+    assert len(response.json()) == DEFAULT_PAGE_LIMIT
+    assert response.headers["X-Next-Cursor"]
+    next_url = response.headers["Link"].split(">")[0].lstrip("<")
+    rest = client.get(next_url)
+    assert len(rest.json()) == 5
+    assert "Link" not in rest.headers and "X-Next-Cursor" not in rest.headers
+    assert f"{DEFAULT_PAGE_LIMIT} unless given" in client.get("/openapi.json").json()["paths"]["/api/genres/"]["get"]["description"]
@@ -0,0 +1,95 @@
+import pytest
+
+from app.models.country import Country
+from app.models.genre import Genre
+
+# Statements each write endpoint may send to the database (COMMIT excluded).
+# Raising a number here means adding a round trip to every such request.
+QUERY_BUDGETS = {
+    "create_genre": 1,
+    "update_genre": 1,
+    "delete_genre": 1,
+    "delete_missing_genre": 1,
+    "create_cast_without_countries": 1,
+    "create_cast_with_countries": 3,
+    "update_cast_countries": 4,
+    "delete_cast": 2,
+}
+
+@pytest.fixture
+def country_ids(db_session):
+    """Two countries to link cast and crew to."""
+    db_session.add_all([Country(code="EE", name="Estonia"), Country(code="FI", name="Finland")])
+    db_session.commit()
+    return [country_id for (country_id,) in db_session.query(Country.id).order_by(Country.id)]
+
+@pytest.fixture
+def genre_id(client):
+    """An existing genre."""
+    return client.post("/api/genres/", json={"name": "Drama"}).json()["id"]
+
+@pytest.fixture
+def person_id(client, country_ids):
+    """An existing person linked to both countries."""
+    return client.post("/api/cast_and_crew/", json={"first_name": "Ita", "country_ids": country_ids}).json()["id"]
+
+def assert_budget(query_counter, name, response, expected_status):
+    assert response.status_code == expected_status
+    assert query_counter.count == QUERY_BUDGETS[name], query_counter.statements
+
+def test_create_genre_budget(client, query_counter):
+    """Test genre creation is a single INSERT ... RETURNING."""
+    response = client.post("/api/genres/", json={"name": "Drama"})
+    assert_budget(query_counter, "create_genre", response, 201)
+
+def test_update_genre_budget(client, genre_id, query_counter):
+    """Test genre update is a single UPDATE ... RETURNING."""
+    query_counter.reset()
+    response = client.put(f"/api/genres/{genre_id}", json={"description": "Serious"})
+    assert_budget(query_counter, "update_genre", response, 200)
+    assert response.json()["description"] == "Serious"
+
+def test_delete_genre_budget(client, genre_id, query_counter):
+    """Test genre deletion and its 404 are a single DELETE ... RETURNING."""
+    query_counter.reset()
+    assert_budget(query_counter, "delete_genre", client.delete(f"/api/genres/{genre_id}"), 204)
+    query_counter.reset()
+    assert_budget(query_counter, "delete_missing_genre", client.delete(f"/api/genres/{genre_id}"), 404)
+
+def test_create_cast_budgets(client, country_ids, query_counter):
+    """Test cast creation links countries without a separate lookup."""
+    response = client.post("/api/cast_and_crew/", json={"first_name": "Solo"})
+    assert_budget(query_counter, "create_cast_without_countries", response, 201)
+    assert response.json()["countries"] == []
+
+    query_counter.reset()
+    response = client.post("/api/cast_and_crew/", json={"first_name": "Ita", "country_ids": country_ids})
+    assert_budget(query_counter, "create_cast_with_countries", response, 201)
+    assert len(response.json()["countries"]) == 2
+
+def test_update_cast_budget(client, person_id, country_ids, query_counter):
+    """Test updating a column and unlinking a country."""
+    query_counter.reset()
+    response = client.put(f"/api/cast_and_crew/{person_id}", json={
+        "last_name": "Ever",
+        "remove_country_ids": country_ids[:1],
+    })
+    assert_budget(query_counter, "update_cast_countries", response, 200)
+    assert [country["id"] for country in response.json()["countries"]] == country_ids[1:]
+
+def test_delete_cast_budget(client, person_id, query_counter):
+    """Test cast deletion removes links and the row in two statements."""
+    query_counter.reset()
+    assert_budget(query_counter, "delete_cast", client.delete(f"/api/cast_and_crew/{person_id}"), 204)
+
+def test_only_write_paths_keep_state_after_commit(client, db_session):
+    """Test other commits expire loaded rows as usual while write responses need no refresh."""
+    country = Country(code="LV", name="Latvia")
+    db_session.add(country)
+    db_session.commit()
+    assert "name" not in country.__dict__
+
+    genre_id = client.post("/api/genres/", json={"name": "Noir"}).json()["id"]
+    assert db_session.expire_on_commit
+    genre = db_session.get(Genre, genre_id)
+    assert genre.__dict__["name"] == "Noir"
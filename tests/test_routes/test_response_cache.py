@@ -0,0 +1,67 @@
+from fastapi import status
+
+from app.db import replicas
+from app.routes.genre import genre_service
+
+
+def test_repeated_list_is_served_from_cache(client, sample_genre_data, query_counter):
+    """Test a second identical list request runs no queries and returns the same bytes."""
+    client.post("/api/genres/", json=sample_genre_data)
+    first = client.get("/api/genres/?limit=10")
+    query_counter.reset()
+    second = client.get("/api/genres/?limit=10")
+
+    assert second.status_code == status.HTTP_200_OK
+    assert query_counter.count == 0
+    assert second.content == first.content
+    assert second.json()[0]["name"] == sample_genre_data["name"]
+
+def test_cached_list_keeps_page_headers(client, query_counter):
+    """Test pagination headers are replayed on a cache hit."""
+    for name in ("Drama", "Horror"):
+        client.post("/api/genres/", json={"name": name})
+    first = client.get("/api/genres/?limit=1&include_total=true")
+    query_counter.reset()
+    second = client.get("/api/genres/?limit=1&include_total=true")
+
+    assert query_counter.count == 0
+    for header in ("X-Next-Cursor", "Link", "X-Total-Count"):
+        assert second.headers[header] == first.headers[header]
+
+def test_writes_invalidate_cached_responses(client, sample_genre_data):
+    """Test create, update and delete are visible on the next read."""
+    genre_id = client.post("/api/genres/", json=sample_genre_data).json()["id"]
+    assert client.get(f"/api/genres/{genre_id}").json()["name"] == "Action"
+    assert len(client.get("/api/genres/").json()) == 1
+
+    client.put(f"/api/genres/{genre_id}", json={"name": "Thriller"})
+    assert client.get(f"/api/genres/{genre_id}").json()["name"] == "Thriller"
+    assert [genre["name"] for genre in client.get("/api/genres/").json()] == ["Thriller"]
+
+    client.post("/api/genres/bulk", json=[{"name": "Comedy"}])
+    assert len(client.get("/api/genres/").json()) == 2
+
+    client.delete(f"/api/genres/{genre_id}")
+    assert client.get(f"/api/genres/{genre_id}").status_code == status.HTTP_404_NOT_FOUND
+    assert [genre["name"] for genre in client.get("/api/genres/").json()] == ["Comedy"]
+
+def test_replica_reads_are_not_cached_right_after_a_write(client, db_session, monkeypatch):
+    """Test a read from a replica inside the read-your-writes window is not cached."""
+    client.post("/api/genres/", json={"name": "Drama"})
+    db_session.info["replica"] = True
+    client.get("/api/genres/")
+    assert genre_service.cache.stats()["entries"] == 0
+
+    monkeypatch.setattr(replicas, "DB_READ_YOUR_WRITES_SECONDS", 0)
+    client.get("/api/genres/")
+    assert genre_service.cache.stats()["entries"] == 1
+
+def test_cache_stats_are_exposed(client, sample_genre_data):
+    """Test the diagnostics endpoint reports hits and misses per cache."""
+    client.post("/api/genres/", json=sample_genre_data)
+    client.get("/api/genres/")
+    client.get("/api/genres/")
+
+    stats = client.get("/api/diagnostics/cache").json()["genres"]
+    assert stats["hits"] >= 1
+    assert stats["entries"] == 1
@@ -0,0 +1,89 @@
+from fastapi import status
+
+from sqlalchemy import select
+
+from app.db.search import SEARCH_MAX_CANDIDATES, query_terms
+from app.models.cast_and_crew import cast_and_crew_search
+from app.models.country import Country
+
+
+def add_people(client):
+    return client.post("/api/cast_and_crew/bulk", json=[
+        {"first_name": "Meryl", "last_name": "Streep", "description": "Actress"},
+        {"first_name": "Anna", "last_name": "Meryton", "description": "Producer"},
+        {"first_name": "John", "last_name": "Smith", "description": "Worked with Meryl on stage"},
+        {"stage_name": "Méliès", "description": "Magician"},
+    ]).json()["succeeded"]
+
+def search(client, q, **params):
+    response = client.get("/api/cast_and_crew/search", params={"q": q, **params})
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+def test_query_terms():
+    """Test queries are reduced to lowercase word terms."""
+    assert query_terms('Meryl "Streep" OR*') == ["meryl", "streep", "or"]
+    assert query_terms("  -- ") == []
+
+def test_search_ranks_name_matches_first(client):
+    """Test name matches outrank description matches and prefixes match."""
+    add_people(client)
+    assert [person["last_name"] for person in search(client, "meryl")] == ["Streep", "Smith"]
+    prefix_matches = [person["last_name"] for person in search(client, "mer")]
+    assert set(prefix_matches[:2]) == {"Streep", "Meryton"}
+    assert prefix_matches[2:] == ["Smith"]
+    assert [person["last_name"] for person in search(client, "meryl str")] == ["Streep"]
+    assert [person["stage_name"] for person in search(client, "melies")] == ["Méliès"]
+
+def test_only_the_first_candidates_are_ranked(client, db_session):
+    """Test ranking is limited to the first matches the index yields, however many match."""
+    add_people(client)
+    ranked = cast_and_crew_search.ranked("sqlite", "mer", limit=10, candidates=2)
+    assert len(db_session.execute(select(ranked.c.id)).all()) == 2
+    ranked = cast_and_crew_search.ranked("sqlite", "mer", limit=10, candidates=100)
+    assert len(db_session.execute(select(ranked.c.id)).all()) == 3
+
+def test_search_returns_relationships_in_few_queries(client, db_session, query_counter):
+    """Test results come with their countries from one ranked query plus one load."""
+    db_session.add(Country(code="US", name="United States"))
+    db_session.commit()
+    country_id = db_session.query(Country.id).scalar()
+    client.post("/api/cast_and_crew/", json={"first_name": "Meryl", "country_ids": [country_id]})
+
+    query_counter.reset()
+    results = search(client, "meryl")
+    assert results[0]["countries"][0]["code"] == "US"
+    assert query_counter.count <= 2
+
+def test_index_follows_updates_and_deletes(client):
+    """Test the index sees creates, updates (single and bulk) and deletes."""
+    people = add_people(client)
+    streep = people[0]["id"]
+
+    client.put(f"/api/cast_and_crew/{streep}", json={"last_name": "Stone"})
+    assert search(client, "streep") == []
+    assert [person["id"] for person in search(client, "stone")] == [streep]
+
+    client.put("/api/cast_and_crew/bulk", json=[{"id": streep, "first_name": "Emma"}])
+    assert [person["id"] for person in search(client, "emma")] == [streep]
+
+    client.delete(f"/api/cast_and_crew/{streep}")
+    assert search(client, "stone") == []
+
+def test_search_validation_and_limit(client):
+    """Test a missing query is rejected and limit caps the results."""
+    add_people(client)
+    assert client.get("/api/cast_and_crew/search").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert search(client, "!!!") == []
+    assert len(search(client, "m", limit=1)) == 1
+    assert client.get("/api/genres/search", params={"q": "x"}).status_code != status.HTTP_200_OK
+
+def test_name_matches_older_than_the_cutoff_are_ranked(client):
+    """Test a name match is found behind more description-only matches than the candidate limit."""
+    client.post("/api/cast_and_crew/bulk", json=[
+        {"first_name": "Person", "last_name": str(i), "description": "Worked with smith"}
+        for i in range(SEARCH_MAX_CANDIDATES + 100)
+    ])
+    client.post("/api/cast_and_crew/", json={"first_name": "John", "last_name": "Smith"})
+    assert search(client, "smith", limit=5)[0]["last_name"] == "Smith"
+    assert search(client, "smi", limit=5)[0]["last_name"] == "Smith"
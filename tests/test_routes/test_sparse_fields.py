@@ -0,0 +1,48 @@
+from datetime import date
+
+from fastapi import status
+
+from app.models.cast_and_crew import CastAndCrew
+
+def add_people(db_session, count):
+    db_session.add_all(
+        CastAndCrew(first_name=f"First {i}", stage_name=f"Stage {i:02d}", birth_date=date(1980, 1, i + 1), description="x" * 500)
+        for i in range(count)
+    )
+    db_session.commit()
+
+def test_list_returns_only_requested_fields(client, db_session):
+    """Test the list endpoint returns just the requested columns."""
+    add_people(db_session, 3)
+    response = client.get("/api/cast_and_crew/", params={"fields": "stage_name,birth_date"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [
+        {"stage_name": f"Stage {i:02d}", "birth_date": f"1980-01-0{i + 1}"} for i in range(3)
+    ]
+
+def test_sparse_list_paginates_by_sort_field(client, db_session):
+    """Test cursors work even when the sort field is not in the fieldset."""
+    add_people(db_session, 5)
+    names, cursor = [], None
+    while True:
+        params = {"fields": "first_name", "sort": "-stage_name", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/cast_and_crew/", params=params)
+        names.extend(person["first_name"] for person in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert names == [f"First {i}" for i in reversed(range(5))]
+
+def test_sparse_detail_and_errors(client, db_session, query_counter):
+    """Test the detail endpoint and validation of unknown or missing entities."""
+    add_people(db_session, 1)
+    person_id = db_session.query(CastAndCrew.id).scalar()
+
+    query_counter.reset()
+    response = client.get(f"/api/cast_and_crew/{person_id}", params={"fields": "id,stage_name"})
+    assert response.json() == {"id": person_id, "stage_name": "Stage 00"}
+    assert query_counter.count == 1
+    assert "description" not in query_counter.statements[0]
+
+    assert client.get(f"/api/cast_and_crew/{person_id}", params={"fields": "password"}).status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get("/api/cast_and_crew/999", params={"fields": "id"}).status_code == status.HTTP_404_NOT_FOUND
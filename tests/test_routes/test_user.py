@@ -31,4 +31,21 @@ def test_get_user_by_id(client, sample_user_data):
 def test_get_user_not_found(client):
     """Test getting non-existent user returns 404."""
     response = client.get("/api/users/999")
-    assert response.status_code == status.HTTP_404_NOT_FOUND 
\ No newline at end of file
+    assert response.status_code == status.HTTP_404_NOT_FOUND 
+def test_duplicate_username_differing_in_case(client, sample_user_data):
+    """Test a username taken in another case is reported as a username conflict."""
+    client.post("/api/users/", json=sample_user_data)
+
+    duplicate = {**sample_user_data, "username": sample_user_data["username"].upper(), "email": "other@example.com"}
+    response = client.post("/api/users/register", json=duplicate)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Username already registered"
+
+def test_login_is_case_insensitive(client, sample_user_data):
+    """Test login finds the user whatever the case of the username or email."""
+    client.post("/api/users/register", json=sample_user_data)
+    for identifier in (sample_user_data["username"].upper(), sample_user_data["email"].upper()):
+        response = client.post("/api/users/login", json={
+            "identifier": identifier, "password": sample_user_data["password"],
+        })
+        assert response.status_code == status.HTTP_200_OK
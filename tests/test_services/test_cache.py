@@ -0,0 +1,58 @@
+from app.services import cache as cache_module
+from app.services.cache import CachedResponse, ResponseCache
+
+
+def test_get_returns_stored_value_and_counts_hits():
+    """Test a stored response is returned and lookups are counted."""
+    cache = ResponseCache("test_hits")
+    assert cache.get(("list", ())) is None
+    cache.set(("list", ()), CachedResponse(b"[]"))
+    assert cache.get(("list", ())).body == b"[]"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+def test_expired_entry_is_a_miss(monkeypatch):
+    """Test an entry older than the TTL is dropped on lookup."""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = ResponseCache("test_ttl", ttl_seconds=10)
+    cache.set(("detail", 1, ()), CachedResponse(b"{}"))
+    now[0] += 11
+    assert cache.get(("detail", 1, ())) is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["entries"] == 0
+
+def test_least_recently_used_entry_is_evicted():
+    """Test the entry count and byte bounds evict the least recently used entry."""
+    cache = ResponseCache("test_lru", max_entries=2, max_bytes=100)
+    cache.set(("detail", 1, ()), CachedResponse(b"a"))
+    cache.set(("detail", 2, ()), CachedResponse(b"b"))
+    cache.get(("detail", 1, ()))
+    cache.set(("detail", 3, ()), CachedResponse(b"c"))
+    assert cache.get(("detail", 2, ())) is None
+    assert cache.get(("detail", 1, ())) is not None
+
+    cache.set(("list", ()), CachedResponse(b"x" * 99))
+    assert cache.stats()["size_bytes"] <= 100
+    assert cache.stats()["evictions"] == 2
+    cache.set(("list", ("big",)), CachedResponse(b"x" * 101))
+    assert cache.get(("list", ("big",))) is None
+
+def test_invalidate_drops_lists_and_affected_details():
+    """Test a write drops every list entry but only the written ids' details."""
+    cache = ResponseCache("test_invalidate")
+    cache.set(("list", ()), CachedResponse(b"[]"))
+    cache.set(("detail", 1, ()), CachedResponse(b"{}"))
+    cache.set(("detail", 2, ()), CachedResponse(b"{}"))
+    cache.invalidate([1])
+    assert cache.get(("list", ())) is None
+    assert cache.get(("detail", 1, ())) is None
+    assert cache.get(("detail", 2, ())) is not None
+
+def test_stale_generation_is_not_stored():
+    """Test a result read before an invalidation is not cached after it."""
+    cache = ResponseCache("test_generation")
+    generation = cache.generation
+    cache.invalidate([1])
+    cache.set(("list", ()), CachedResponse(b"[]"), generation)
+    assert cache.get(("list", ())) is None
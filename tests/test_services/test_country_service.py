@@ -0,0 +1,59 @@
+import pycountry
+from fastapi import status
+
+from app.models.country import Country
+from app.services.country import CountryService, reload_countries, seed_countries
+
+
+def test_seed_countries_is_idempotent(db_session):
+    """Test seeding inserts every country once and skips existing codes later."""
+    db_session.add(Country(code="EE", name="Estonia"))
+    db_session.commit()
+
+    assert seed_countries(db_session) == len(pycountry.countries) - 1
+    assert seed_countries(db_session) == 0
+    assert db_session.query(Country).count() == len(pycountry.countries)
+
+def test_snapshot_indexes(db_session):
+    """Test the service answers lookups from the snapshot indexes."""
+    seed_countries(db_session)
+    service = CountryService(db_session)
+    countries = service.get_all_countries()
+    assert [country.name for country in countries] == sorted(country.name for country in countries)
+
+    estonia = service.get_country_by_code("ee")
+    assert estonia.name == "Estonia"
+    assert service.get_country_by_id(estonia.id) == estonia
+    assert service.get_countries_by_ids([estonia.id, -1]) == [estonia]
+
+def test_country_routes_serve_snapshot_without_queries(client, db_session, query_counter):
+    """Test list and detail requests do not touch the database once loaded."""
+    seed_countries(db_session)
+    client.get("/api/countries/")
+
+    query_counter.reset()
+    response = client.get("/api/countries/")
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == len(pycountry.countries)
+    country_id = response.json()[0]["id"]
+    assert client.get(f"/api/countries/{country_id}").json() == response.json()[0]
+    assert client.get("/api/countries/999999").status_code == status.HTTP_404_NOT_FOUND
+    assert query_counter.count == 0
+
+    not_modified = client.get("/api/countries/", headers={"If-None-Match": response.headers["ETag"]})
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+def test_reload_picks_up_table_changes(client, db_session):
+    """Test a reload replaces the snapshot after the table changed."""
+    db_session.add(Country(code="EE", name="Estonia"))
+    db_session.commit()
+    etag = client.get("/api/countries/").headers["ETag"]
+
+    db_session.add(Country(code="FI", name="Finland"))
+    db_session.commit()
+    assert len(client.get("/api/countries/").json()) == 1
+
+    reload_countries(db_session)
+    response = client.get("/api/countries/")
+    assert [country["code"] for country in response.json()] == ["EE", "FI"]
+    assert response.headers["ETag"] != etag
@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session
+
+from app.models.cast_and_crew import CastAndCrew
+from app.models.country import Country
+from app.services.cast_and_crew import CastAndCrewService
+from app.services.base_service import BaseEntityService
+
+def add_people(db_session: Session, count: int, batch: str = "A") -> None:
+    countries = [Country(code=f"{batch}{i}", name=f"Country {batch}{i}") for i in range(3)]
+    db_session.add_all(countries)
+    db_session.add_all(
+        CastAndCrew(first_name=f"Person {i}", countries=countries[: i % 3 + 1]) for i in range(count)
+    )
+    db_session.commit()
+    db_session.expunge_all()
+
+@pytest.mark.parametrize("strategy", ["selectin", "joined", "subquery"])
+def test_list_uses_fixed_number_of_queries(client, db_session, query_counter, strategy, monkeypatch):
+    """Test the list endpoint query count does not grow with the number of rows."""
+    from app.routes.cast_and_crew import cast_and_crew_service
+    monkeypatch.setitem(cast_and_crew_service.relationships["countries"], "load", strategy)
+
+    add_people(db_session, 2)
+    query_counter.reset()
+    assert len(client.get("/api/cast_and_crew/").json()) == 2
+    few_rows = query_counter.count
+
+    add_people(db_session, 25, batch="B")
+    query_counter.reset()
+    people = client.get("/api/cast_and_crew/").json()
+    assert len(people) == 27
+    assert all(person["countries"] for person in people)
+    assert query_counter.count == few_rows
+
+def test_detail_update_and_delete_do_not_lazy_load(client, db_session):
+    """Test detail, update and delete work when undeclared lazy loads raise."""
+    add_people(db_session, 1)
+    person_id = db_session.query(CastAndCrew.id).scalar()
+    country_ids = [country_id for (country_id,) in db_session.query(Country.id)]
+
+    assert client.get(f"/api/cast_and_crew/{person_id}").json()["countries"]
+    response = client.put(f"/api/cast_and_crew/{person_id}", json={"country_ids": country_ids})
+    assert len(response.json()["countries"]) == 3
+    assert client.delete(f"/api/cast_and_crew/{person_id}").status_code == 204
+
+def test_undeclared_relationship_raises_on_access(db_session):
+    """Test relationships without a declared strategy cannot be lazy loaded."""
+    add_people(db_session, 1)
+    person = CastAndCrewService().get_all(db_session)[0]
+
+    assert person.countries
+    with pytest.raises(InvalidRequestError):
+        person.countries[0].cast_and_crew
+
+def test_raise_strategy_blocks_relationship(db_session):
+    """Test a relationship declared with the raise strategy fails on access."""
+    add_people(db_session, 1)
+    service = CastAndCrewService()
+    service.relationships["countries"]["load"] = "raise"
+
+    person = service.get_all(db_session)[0]
+    with pytest.raises(InvalidRequestError):
+        person.countries
+
+def test_unknown_strategy_is_rejected():
+    """Test misconfigured load strategies fail at service construction."""
+    with pytest.raises(ValueError):
+        BaseEntityService(CastAndCrew, relationships={
+            "countries": {"model": Country, "field_name": "country_ids", "relationship_attr": "countries", "load": "eager"}
+        })
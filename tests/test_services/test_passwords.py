@@ -0,0 +1,101 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException, status
+
+from app.models.user import User
+from app.routes import user as user_routes
+from app.services import passwords, user as user_service
+from app.services.passwords import (
+    PasswordPool, build_context, calibrate_rounds, check_password, hash_password,
+)
+
+
+def test_pool_hashes_and_verifies():
+    """Test sync and async calls run on the pool and return the result."""
+    pool = PasswordPool(workers=2, max_pending=4)
+    try:
+        hashed = pool.run(hash_password, "Secret123")
+        assert pool.run(check_password, "Secret123", hashed)
+        assert not asyncio.run(pool.run_async(check_password, "Wrong123", hashed))
+        assert pool.stats()["completed"] == 3
+        assert pool.stats()["pending"] == 0
+    finally:
+        pool.shutdown()
+
+def test_saturated_pool_rejects_with_503():
+    """Test a call beyond the pending limit fails at once with Retry-After."""
+    pool = PasswordPool(workers=1, max_pending=1)
+    release = threading.Event()
+    try:
+        blocked = pool.submit(release.wait)
+        with pytest.raises(HTTPException) as error:
+            pool.submit(hash_password, "Secret123")
+        assert error.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert error.value.headers["Retry-After"] == "1"
+        assert pool.stats()["rejected"] == 1
+
+        release.set()
+        blocked.result()
+        assert pool.run(check_password, "Secret123", hash_password("Secret123"))
+    finally:
+        release.set()
+        pool.shutdown()
+
+def test_login_returns_503_when_pool_is_saturated(client, sample_user_data, monkeypatch):
+    """Test login sheds load instead of queueing when the password pool is full."""
+    client.post("/api/users/register", json=sample_user_data)
+    credentials = {"identifier": sample_user_data["username"], "password": sample_user_data["password"]}
+    assert client.post("/api/users/login", json=credentials).status_code == status.HTTP_200_OK
+
+    pool = PasswordPool(workers=1, max_pending=1)
+    release = threading.Event()
+    monkeypatch.setattr(user_service, "password_pool", pool)
+    try:
+        pool.submit(release.wait)
+        response = client.post("/api/users/login", json=credentials)
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.headers["retry-after"] == "1"
+    finally:
+        release.set()
+        pool.shutdown()
+
+def test_login_and_register_do_not_block_the_event_loop():
+    """Test the routes are coroutines, so bcrypt never holds a request thread."""
+    assert asyncio.iscoroutinefunction(user_routes.login)
+    assert asyncio.iscoroutinefunction(user_routes.register_user)
+    assert asyncio.iscoroutinefunction(user_routes.create_new_user)
+
+def test_context_rounds_and_legacy_hashes():
+    """Test the configured cost is enforced and legacy bcrypt hashes still verify."""
+    legacy_hash = build_context(["bcrypt"], 4).hash("Secret123")
+    context = build_context(["pbkdf2_sha256"], 1000)
+
+    assert context.verify("Secret123", legacy_hash)
+    assert context.needs_update(legacy_hash)
+    assert not context.needs_update(context.hash("Secret123"))
+    assert build_context(["bcrypt"], 5).needs_update(legacy_hash)
+
+def test_login_rehashes_outdated_hash(client, db_session, sample_user_data, monkeypatch):
+    """Test a successful login replaces an outdated hash in the background."""
+    client.post("/api/users/register", json=sample_user_data)
+    monkeypatch.setattr(passwords, "pwd_context", build_context(["pbkdf2_sha256"], 1000))
+    rehashes = []
+    rehash = user_service.rehash_in_background
+    monkeypatch.setattr(user_service, "rehash_in_background", lambda *args: rehashes.append(rehash(*args)))
+
+    credentials = {"identifier": sample_user_data["username"], "password": sample_user_data["password"]}
+    assert client.post("/api/users/login", json=credentials).status_code == status.HTTP_200_OK
+    rehashes[0].result(timeout=5)
+
+    db_session.expire_all()
+    stored = db_session.query(User).filter(User.username == sample_user_data["username"]).one()
+    assert stored.password.startswith("$pbkdf2-sha256$")
+    assert client.post("/api/users/login", json=credentials).status_code == status.HTTP_200_OK
+    assert rehashes[1] is None
+
+def test_calibrate_rounds_meets_target():
+    """Test calibration never goes below the minimum cost and stays near the target."""
+    assert calibrate_rounds("bcrypt", 0) == 4
+    assert 4 <= calibrate_rounds("bcrypt", 0.02, samples=1) <= 10
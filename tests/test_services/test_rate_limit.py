@@ -0,0 +1,71 @@
+import pytest
+from fastapi import HTTPException, status
+
+from app.services import rate_limit
+from app.services.rate_limit import LoginRateLimiter, SlidingWindowSketch
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_sketch_counts_within_sliding_window():
+    """Test hits are counted per key and slide out slot by slot."""
+    clock = FakeClock()
+    sketch = SlidingWindowSketch(window_seconds=60, slots=6, clock=clock)
+    assert [sketch.hit("a") for _ in range(3)] == [1, 2, 3]
+    assert sketch.hit("b") == 1
+
+    clock.now += 30
+    assert sketch.hit("a") == 4
+    clock.now += 35
+    # The first three hits are more than a window old by now.
+    assert sketch.hit("a") == 2
+    clock.now += 3600
+    assert sketch.hit("a") == 1
+
+def test_sketch_memory_is_fixed_and_never_undercounts():
+    """Test many keys share fixed storage and collisions only over-count."""
+    sketch = SlidingWindowSketch(window_seconds=60, slots=4, width=64, depth=2)
+    memory = sketch.stats()["memory_bytes"]
+    counts = {f"key-{i}": sketch.hit(f"key-{i}") for i in range(1000)}
+
+    assert sketch.stats()["memory_bytes"] == memory == (4 + 1) * 64 * 2 * 4
+    assert all(sketch.hit(key) >= 2 for key in counts)
+
+def test_limiter_rejects_per_identifier_and_per_ip():
+    """Test either limit alone is enough to reject an attempt."""
+    limiter = LoginRateLimiter(SlidingWindowSketch(window_seconds=60), per_ip=4, per_identifier=2)
+    limiter.check("10.0.0.1", "alice")
+    limiter.check("10.0.0.2", "ALICE ")
+    with pytest.raises(HTTPException) as error:
+        limiter.check("10.0.0.3", "alice")
+    assert error.value.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert error.value.headers["Retry-After"] == "60"
+
+    for name in ("bob", "carol", "dave", "erin"):
+        limiter.check("10.0.0.9", name)
+    with pytest.raises(HTTPException):
+        limiter.check("10.0.0.9", "frank")
+    assert limiter.stats()["rejected"] == 2
+
+def test_login_is_limited_before_lookup_and_hashing(client, sample_user_data, monkeypatch, query_counter):
+    """Test an over-limit login gets 429 without querying users or verifying a password."""
+    monkeypatch.setattr(rate_limit, "login_limiter", LoginRateLimiter(
+        SlidingWindowSketch(window_seconds=60), per_ip=100, per_identifier=2,
+    ))
+    client.post("/api/users/register", json=sample_user_data)
+    credentials = {"identifier": sample_user_data["username"], "password": "Wrongpassword1"}
+    for _ in range(2):
+        assert client.post("/api/users/login", json=credentials).status_code == status.HTTP_401_UNAUTHORIZED
+
+    query_counter.reset()
+    response = client.post("/api/users/login", json=credentials)
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.headers["retry-after"] == "60"
+    assert query_counter.count == 0
+    assert client.get("/api/diagnostics/rate_limit").json()["rejected"] == 1
@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+from fastapi import status
+
+from app.services.model_files import ModelStore, model_paths, open_model, prune_models, write_model
+from app.services.recommendations import build_item_neighbors, build_model, score_history
+
+
+def dense_neighbors(user_ids, movie_ids, ratings, shrinkage):
+    """Adjusted cosine over a dense user x item matrix, the slow obvious way."""
+    users, items = np.unique(user_ids), np.unique(movie_ids)
+    matrix = np.zeros((len(users), len(items)))
+    rated = np.zeros_like(matrix, dtype=bool)
+    matrix[np.searchsorted(users, user_ids), np.searchsorted(items, movie_ids)] = ratings
+    rated[np.searchsorted(users, user_ids), np.searchsorted(items, movie_ids)] = True
+    means = matrix.sum(axis=1) / rated.sum(axis=1)
+    centred = np.where(rated, matrix - means[:, None], 0)
+    norms = np.linalg.norm(centred, axis=0)
+    similarity = centred.T @ centred / np.maximum(np.outer(norms, norms), 1e-12)
+    support = (centred != 0).T.astype(float) @ (centred != 0).astype(float)
+    similarity *= support / (support + shrinkage)
+    np.fill_diagonal(similarity, 0)
+    return similarity
+
+def random_ratings(seed, users=40, movies=25, count=400):
+    rng = np.random.default_rng(seed)
+    pairs = np.unique(np.stack([rng.integers(1, users, count), rng.integers(100, 100 + movies, count)]), axis=1)
+    pairs = pairs[:, rng.permutation(pairs.shape[1])]
+    return pairs[0], pairs[1], rng.integers(1, 6, pairs.shape[1])
+
+@pytest.mark.parametrize("block_cells", [1, 64, 1 << 20])
+def test_blocked_build_matches_dense_similarity(block_cells):
+    """Test the blocked sparse build gives the dense adjusted cosine top-k whatever the block size."""
+    user_ids, movie_ids, ratings = random_ratings(block_cells)
+    arrays = build_item_neighbors(user_ids, movie_ids, ratings, neighbors=5, shrinkage=3,
+                                  max_user_ratings=0, block_cells=block_cells)
+    expected = dense_neighbors(user_ids, movie_ids, ratings, shrinkage=3)
+    assert arrays["movie_ids"].tolist() == np.unique(movie_ids).tolist()
+    for item, (neighbors, similarities) in enumerate(zip(arrays["neighbors"], arrays["similarities"])):
+        best = np.sort(expected[item][expected[item] > 0])[::-1][:5]
+        assert np.allclose(similarities[:len(best)], best, atol=1e-6)
+        assert (neighbors[len(best):] == -1).all()
+        valid = neighbors >= 0
+        assert np.allclose(expected[item, neighbors[valid]], similarities[valid], atol=1e-6)
+
+def test_only_newest_user_ratings_count():
+    """Test a user's oldest ratings beyond the cap are left out of the build."""
+    # User 1 rated movies 10, 11 and 12 in that order; with a cap of two, 10 drops out.
+    user_ids, movie_ids, ratings = np.array([1, 1, 1, 2, 2]), np.array([10, 11, 12, 11, 12]), np.array([5, 1, 5, 1, 5])
+    capped = build_item_neighbors(user_ids, movie_ids, ratings, neighbors=2, shrinkage=0, max_user_ratings=2)
+    assert capped["neighbors"][0].tolist() == [-1, -1]
+    full = build_item_neighbors(user_ids, movie_ids, ratings, neighbors=2, shrinkage=0, max_user_ratings=0)
+    assert full["neighbors"][0].tolist() == [2, -1]
+
+def test_model_files_are_versioned_and_mapped(tmp_path):
+    """Test arrays round-trip through a mapped file and the store follows the newest version."""
+    store = ModelStore("test", directory=str(tmp_path), check_seconds=0)
+    assert store.current() is None
+    first = write_model("test", {"ids": np.arange(5, dtype=np.int64), "empty": np.zeros((0, 3), np.float32)},
+                        {"n": 5}, directory=str(tmp_path))
+    model = store.current()
+    assert isinstance(model["ids"], np.memmap) or isinstance(model["ids"].base, np.memmap)
+    assert model["ids"].tolist() == [0, 1, 2, 3, 4] and model["empty"].shape == (0, 3)
+    assert model.meta == {"n": 5}
+
+    write_model("test", {"ids": np.arange(3, dtype=np.int64)}, {"n": 3}, directory=str(tmp_path))
+    assert store.current()["ids"].tolist() == [0, 1, 2]
+    assert prune_models("test", keep=1, directory=str(tmp_path)) == [first]
+    assert len(model_paths("test", str(tmp_path))) == 1
+    assert store.stats()["loads"] == 2
+
+    (tmp_path / "test-99999999.arrays").write_bytes(b"garbage")
+    assert store.current()["ids"].tolist() == [0, 1, 2]
+    assert store.stats()["load_errors"] == 1
+    with pytest.raises(ValueError):
+        open_model(tmp_path / "test-99999999.arrays")
+
+def test_score_history_excludes_reviewed_movies():
+    """Test liked movies lift their neighbours, disliked ones sink them, and seen movies are left out."""
+    arrays = {
+        "movie_ids": np.array([10, 20, 30, 40]),
+        "neighbors": np.array([[1, 2], [0, -1], [0, 3], [2, -1]], dtype=np.int32),
+        "similarities": np.array([[0.9, 0.5], [0.9, 0], [0.5, 0.4], [0.4, 0]], dtype=np.float32),
+    }
+    model = type("Model", (), {"__getitem__": lambda self, name: arrays[name]})()
+    assert [id for id, _ in score_history(model, [10], [5], 10)] == [20, 30]
+    assert score_history(model, [10, 20], [5, 4], 1)[0][0] == 30
+    assert score_history(model, [10], [1], 10) == []
+    assert score_history(model, [99], [5], 10) == []
+
+def test_recommendations_endpoint(client, db_session, new_user):
+    """Test recommendations come from the newest model and skip movies the user reviewed."""
+    fans = [new_user() for _ in range(3)]
+    users = [user_id for user_id, _ in fans]
+    movies = [client.post("/api/movies/", json={"title": title}).json()["id"] for title in ("Alien", "Aliens", "Cats")]
+    recommendations_path = f"/api/users/{users[0]}/recommendations"
+    assert client.get(recommendations_path).status_code == status.HTTP_401_UNAUTHORIZED
+    assert client.get(recommendations_path, headers=fans[1][1]).status_code == status.HTTP_403_FORBIDDEN
+    assert client.get(recommendations_path, headers=fans[0][1]).status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    # Two fans love both Alien films and hate Cats; the third has only seen Alien.
+    for _, headers in fans[:2]:
+        for movie_id, rating in zip(movies, (5, 5, 1)):
+            client.post("/api/reviews/", json={"movie_id": movie_id, "rating": rating}, headers=headers)
+    client.post("/api/reviews/", json={"movie_id": movies[0], "rating": 5}, headers=fans[2][1])
+    model = build_model(db_session, shrinkage=0)
+    assert model.meta["ratings"] == 7
+
+    response = client.get(f"/api/users/{users[2]}/recommendations", headers=fans[2][1])
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["movie"]["title"] for item in response.json()] == ["Aliens"]
+    assert response.json()[0]["score"] > 0
+    assert client.get(recommendations_path, headers=fans[0][1]).json() == []
+    assert client.get("/api/diagnostics/models").json()["item_cf"]["version"] == model.version
@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.cast_and_crew import CastAndCrew
+from app.models.country import Country
+from app.services.cast_and_crew import CastAndCrewService
+
+@pytest.fixture
+def country_ids(db_session: Session):
+    """Five countries, returned by id in code order."""
+    db_session.add_all(Country(code=code, name=code) for code in ["AA", "BB", "CC", "DD", "EE"])
+    db_session.commit()
+    return [country.id for country in db_session.query(Country).order_by(Country.code)]
+
+@pytest.fixture
+def person_id(db_session: Session, country_ids):
+    """A person linked to the first three countries."""
+    person = CastAndCrew(first_name="Linked", countries=db_session.query(Country).filter(Country.id.in_(country_ids[:3])).all())
+    db_session.add(person)
+    db_session.commit()
+    return person.id
+
+def association_writes(query_counter):
+    return [
+        statement.split()[0] for statement in query_counter.statements
+        if "cast_and_crew_countries" in statement and not statement.startswith("SELECT")
+    ]
+
+def linked_codes(client, person_id):
+    return sorted(country["code"] for country in client.get(f"/api/cast_and_crew/{person_id}").json()["countries"])
+
+def test_replacing_list_writes_only_the_difference(client, person_id, country_ids, query_counter):
+    """Test swapping one country issues one insert and one delete."""
+    query_counter.reset()
+    response = client.put(f"/api/cast_and_crew/{person_id}", json={"country_ids": country_ids[1:4]})
+    assert sorted(country["code"] for country in response.json()["countries"]) == ["BB", "CC", "DD"]
+    assert association_writes(query_counter) == ["DELETE", "INSERT"]
+
+def test_unchanged_list_writes_nothing(client, person_id, country_ids, query_counter):
+    """Test resending the same ids leaves the association table untouched."""
+    query_counter.reset()
+    client.put(f"/api/cast_and_crew/{person_id}", json={"country_ids": list(reversed(country_ids[:3]))})
+    assert association_writes(query_counter) == []
+
+def test_add_and_remove_ids(client, person_id, country_ids):
+    """Test PATCH-style add/remove lists without resending the full list."""
+    response = client.put(f"/api/cast_and_crew/{person_id}", json={
+        "add_country_ids": [country_ids[4], 999],
+        "remove_country_ids": [country_ids[0]],
+    })
+    assert response.status_code == 200
+    assert linked_codes(client, person_id) == ["BB", "CC", "EE"]
+
+def test_service_update_diffs_unloaded_collection(db_session: Session, person_id, country_ids, monkeypatch):
+    """Test the diff falls back to the association table when the collection is not loaded."""
+    service = CastAndCrewService()
+    monkeypatch.setitem(service.relationships["countries"], "load", "raise")
+
+    service.update(db_session, person_id, {"remove_country_ids": country_ids[:2]})
+    db_session.expire_all()
+    assert [country.code for country in db_session.get(CastAndCrew, person_id).countries] == ["CC"]
+
+def test_bulk_update_diffs_links(client, person_id, country_ids, query_counter):
+    """Test bulk updates apply add/remove lists per item."""
+    query_counter.reset()
+    client.put("/api/cast_and_crew/bulk", json=[{"id": person_id, "add_country_ids": [country_ids[3]]}])
+    assert association_writes(query_counter) == ["INSERT"]
+    assert linked_codes(client, person_id) == ["AA", "BB", "CC", "DD"]
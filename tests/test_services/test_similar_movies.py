@@ -0,0 +1,186 @@
+import numpy as np
+import pytest
+from fastapi import status
+
+from app.models.country import Country
+from app.services import similar_movies
+from app.services.similar_movies import (
+    COUNTRY, FEATURE_WEIGHTS, GENRE, PERSON, ROLE, Features, MovieVectors, SimilarMoviesIndex, similar_movies_index,
+    token_keys,
+)
+
+
+def random_tokens(rng, movie_id):
+    """Tokens of one synthetic movie as {key: tf}."""
+    tokens = {int(token_keys(GENRE, np.array([genre]))[0]): 1.0 for genre in rng.choice(6, rng.integers(0, 3), replace=False)}
+    for person in rng.choice(30, rng.integers(0, 5), replace=False):
+        tokens[int(token_keys(PERSON, np.array([person]))[0])] = 1.0
+        tokens[int(token_keys(ROLE, np.array([person]), np.array([rng.integers(0, 3)]))[0])] = 1.0
+    for country in rng.choice(5, rng.integers(0, 2), replace=False):
+        tokens[int(token_keys(COUNTRY, np.array([country]))[0])] = 1 + np.log(rng.integers(1, 4))
+    return tokens
+
+def features_of(movies):
+    """Features for {movie_id: {key: tf}}."""
+    entries = [(movie_id, key, tf) for movie_id, tokens in movies.items() for key, tf in tokens.items()]
+    token_movies, keys, tf = (np.array(column) for column in zip(*entries)) if entries else (np.empty(0, np.int64),) * 3
+    return Features(np.array(sorted(movies), dtype=np.int64), token_movies.astype(np.int64), keys.astype(np.int64),
+                    tf.astype(float), np.empty((0, 2), dtype=np.int64))
+
+def expected_similarity(movies, idf):
+    """Cosine similarity of every pair of movies, the dense obvious way."""
+    ids = sorted(movies)
+    vocabulary = sorted({key for tokens in movies.values() for key in tokens})
+    matrix = np.zeros((len(ids), len(vocabulary)))
+    for row, id in enumerate(ids):
+        for key, tf in movies[id].items():
+            matrix[row, vocabulary.index(key)] = FEATURE_WEIGHTS[key & 3] * tf * idf(key)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms > 0, norms, 1)
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0)
+    return ids, similarity
+
+def assert_neighbors_exact(vectors, movies, idf, k):
+    ids, similarity = expected_similarity(movies, idf)
+    for row, id in enumerate(ids):
+        listed = vectors.similar(id, k)
+        best = np.sort(similarity[row][similarity[row] > 1e-6])[::-1][:k]
+        assert np.allclose([score for _, score in listed], best, atol=1e-5), id
+        for other, score in listed:
+            assert similarity[row, ids.index(other)] == pytest.approx(score, abs=1e-5)
+
+def build_idf(movies):
+    """Document frequencies as of now; unseen tokens count as unique."""
+    count, frequency = len(movies), {}
+    for tokens in movies.values():
+        for key in tokens:
+            frequency[key] = frequency.get(key, 0) + 1
+    return lambda key: np.log(count / frequency.get(key, 1))
+
+@pytest.mark.parametrize("dense_features", [0, 3, 1000])
+def test_build_matches_dense_tfidf(dense_features):
+    """Test the neighbour lists equal brute-force TF-IDF cosine whichever tokens are dense."""
+    rng = np.random.default_rng(dense_features)
+    movies = {id: random_tokens(rng, id) for id in range(10, 400, 10)}
+    vectors = MovieVectors(features_of(movies), neighbors=5, dense_features=dense_features, block_cells=200)
+    assert_neighbors_exact(vectors, movies, build_idf(movies), 5)
+
+@pytest.mark.parametrize("dense_features", [0, 4])
+def test_incremental_updates_stay_exact(dense_features):
+    """Test patched vectors and merged lists match a brute force over the current movies."""
+    rng = np.random.default_rng(7 + dense_features)
+    movies = {id: random_tokens(rng, id) for id in range(1, 41)}
+    idf = build_idf(movies)
+    vectors = MovieVectors(features_of(movies), neighbors=4, dense_features=dense_features, block_cells=300)
+    next_id = 41
+    for _ in range(25):
+        changed = {int(id) for id in rng.choice(sorted(movies), 3, replace=False)}
+        for id in list(changed):
+            if rng.random() < 0.2:
+                del movies[id]
+            else:
+                movies[id] = random_tokens(rng, id)
+        if rng.random() < 0.5:
+            movies[next_id] = random_tokens(rng, next_id)
+            changed.add(next_id)
+            next_id += 1
+        vectors.update(changed, features_of({id: movies[id] for id in changed if id in movies}))
+        assert_neighbors_exact(vectors, movies, idf, 4)
+    assert vectors.reranked < 25 * len(movies)
+
+def test_builds_run_in_the_background_and_replay_writes(monkeypatch):
+    """Test writes made while a build reads its snapshot are patched in after
+    the swap, and a rebuild past max_patches runs while the old index answers."""
+    rng = np.random.default_rng(3)
+    movies = {id: random_tokens(rng, id) for id in range(1, 31)}
+    snapshots = []
+
+    def load_features(db, movie_ids=None):
+        if movie_ids is not None:
+            return features_of({id: movies[id] for id in movie_ids if id in movies})
+        snapshots.append(dict(movies))
+        if len(snapshots) == 1:
+            # Committed while the snapshot is being read.
+            movies[5] = random_tokens(rng, 5)
+            index.mark_movies_stale("update", [5])
+        return features_of(snapshots[-1])
+
+    monkeypatch.setattr(similar_movies, "load_features", load_features)
+    db = type("Session", (), {"get_bind": lambda self: None})()
+    index = SimilarMoviesIndex(neighbors=4, dense_features=3, block_cells=300, max_patches=3)
+    index.ensure_current(db)
+    assert index.similar(1, 4) is None
+    index.wait()
+    index.ensure_current(db)
+    assert_neighbors_exact(index, movies, build_idf(snapshots[0]), 4)
+
+    changed = [7, 8, 9, 10]
+    movies.update({id: random_tokens(rng, id) for id in changed})
+    index.mark_movies_stale("update", changed)
+    index.ensure_current(db)
+    assert index.ready
+    index.wait()
+    index.ensure_current(db)
+    assert index.stats()["builds"] == 2
+    assert_neighbors_exact(index, movies, build_idf(movies), 4)
+
+def test_similar_movies_endpoint(client, db_session):
+    """Test "more like this" ranks shared rare tokens first and follows credit and genre writes."""
+    db_session.add(Country(code="FR", name="France"))
+    db_session.commit()
+    france = db_session.query(Country.id).filter_by(code="FR").scalar()
+    horror, comedy = (client.post("/api/genres/", json={"name": name}).json()["id"] for name in ("Horror", "Comedy"))
+    director = client.post("/api/positions/", json={"name": "Director"}).json()["id"]
+    scott, cameron, tati = (
+        client.post("/api/cast_and_crew/", json={"first_name": name, **extra}).json()["id"]
+        for name, extra in (("Ridley", {}), ("James", {}), ("Jacques", {"country_ids": [france]}))
+    )
+    alien, aliens, blade_runner, playtime = (
+        client.post("/api/movies/", json={"title": title, "genre_ids": genres}).json()["id"]
+        for title, genres in (("Alien", [horror]), ("Aliens", [horror]), ("Blade Runner", []), ("Playtime", [comedy]))
+    )
+
+    def credit(movie_id, person_id):
+        response = client.post("/api/movie_credits/", json={
+            "movie_id": movie_id, "cast_and_crew_id": person_id, "position_id": director,
+        })
+        assert response.status_code == status.HTTP_201_CREATED
+        return response.json()["id"]
+
+    def similar(movie_id):
+        response = client.get(f"/api/movies/{movie_id}/similar")
+        assert response.status_code == status.HTTP_200_OK
+        return [item["movie"]["title"] for item in response.json()]
+
+    # The first lookup starts the build.
+    response = client.get(f"/api/movies/{alien}/similar")
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    similar_movies_index.wait()
+    credit(alien, scott)
+    credit(blade_runner, scott)
+    credit(aliens, cameron)
+    assert similar(alien) == ["Blade Runner", "Aliens"]
+    assert similar(playtime) == []
+
+    # James Cameron also directs Alien now; Aliens shares a genre and a director with it.
+    cameron_credit = credit(alien, cameron)
+    assert similar(alien) == ["Aliens", "Blade Runner"]
+    client.delete(f"/api/movie_credits/{cameron_credit}")
+    assert similar(alien) == ["Blade Runner", "Aliens"]
+
+    # Jacques Tati directs Playtime; a new movie of his from France is its only neighbour.
+    credit(playtime, tati)
+    mon_oncle = client.post("/api/movies/", json={"title": "Mon Oncle", "genre_ids": [comedy]}).json()["id"]
+    credit(mon_oncle, tati)
+    assert similar(playtime) == ["Mon Oncle"]
+    client.put(f"/api/movies/{mon_oncle}", json={"genre_ids": [horror]})
+    assert similar(mon_oncle) == ["Playtime", "Alien", "Aliens"]
+
+    client.delete(f"/api/movies/{blade_runner}")
+    assert sorted(similar(alien)) == ["Aliens", "Mon Oncle"]
+    assert client.get(f"/api/movies/{blade_runner}/similar").status_code == status.HTTP_404_NOT_FOUND
+
+    stats = client.get("/api/diagnostics/similar_movies").json()
+    assert (stats["builds"], stats["movies"]) == (1, 4)
+    assert stats["refreshes"] >= 5
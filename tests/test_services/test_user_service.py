@@ -1,5 +1,8 @@
+import pytest
+from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
+from app.services import user as user_service
 from app.services.user import create_user, get_user_by_id, get_user_by_email
 from app.schemas.user import UserCreate
 
@@ -38,4 +41,27 @@ def test_get_user_by_id_not_found(db_session: Session):
 def test_get_user_by_email_not_found(db_session: Session):
     """Test getting non-existent user by email returns None."""
     user = get_user_by_email(db_session, "nonexistent@example.com")
-    assert user is None 
\ No newline at end of file
+    assert user is None 
+def test_registration_conflict_checked_before_hashing(db_session: Session, sample_user_data, monkeypatch):
+    """Test a taken email is rejected by the pre-check without hashing the password."""
+    create_user(db_session, UserCreate(**sample_user_data))
+    hashed = []
+    monkeypatch.setattr(user_service, "get_password_hash", lambda password: hashed.append(password))
+
+    duplicate = UserCreate(**{**sample_user_data, "username": "another", "email": "TEST@example.com"})
+    with pytest.raises(HTTPException) as error:
+        create_user(db_session, duplicate)
+    assert error.value.detail == "Email already registered"
+    assert hashed == []
+
+def test_unique_index_maps_race_to_conflict(db_session: Session, sample_user_data, monkeypatch):
+    """Test a duplicate that slips past the pre-check is mapped from the IntegrityError."""
+    create_user(db_session, UserCreate(**sample_user_data))
+    monkeypatch.setattr(user_service, "find_registration_conflict", lambda *args: None)
+
+    duplicate = UserCreate(**{**sample_user_data, "email": "other@example.com"})
+    with pytest.raises(HTTPException) as error:
+        create_user(db_session, duplicate)
+    assert error.value.detail == "Username already registered"
+    # The session was rolled back and stays usable.
+    assert get_user_by_email(db_session, sample_user_data["email"]) is not None
@@ -11,9 +11,19 @@ export abstract class BaseEntityService<TInput, TOutput> extends BaseService {
     errors?: string[];
   }> {
     try {
-      const response = await BaseService.axios.get<TOutput[]>(this.resourceUrl);
+      // List endpoints are cursor-paginated; follow X-Next-Cursor until the last page.
+      const data: TOutput[] = [];
+      let cursor: string | undefined;
+      let response;
+      do {
+        response = await BaseService.axios.get<TOutput[]>(this.resourceUrl, {
+          params: { limit: 1000, cursor },
+        });
+        data.push(...response.data);
+        cursor = response.headers['x-next-cursor'];
+      } while (cursor);
       return {
-        data: response.data,
+        data,
         status: response.status.toString(),
         statusText: response.statusText,
       };